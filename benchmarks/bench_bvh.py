@@ -0,0 +1,50 @@
+#!/usr/bin/env python
+
+"""Benchmark for ray casting and occlusion queries against many line segments.
+
+Compares the SegmentBVH against linear scans with the vectorized kernels and with check_intersect_lineseg_lineseg on random short segments.
+
+	$ python -m benchmarks.bench_bvh
+"""
+
+import random
+import timeit
+
+from py2d.Math import SegmentBVH, Vector, check_intersect_lineseg_lineseg, intersect_segments_ray
+
+def random_segments(n, size):
+	segs = []
+	for i in range(n):
+		a = Vector(random.uniform(0, size), random.uniform(0, size))
+		segs.append((a, a + Vector(random.uniform(-5, 5), random.uniform(-5, 5))))
+	return segs
+
+def per_query(f, queries, repeat=3):
+	"""Get the best time per query in microseconds"""
+	return min(timeit.repeat(lambda: [f(p1, p2) for p1, p2 in queries], number=1, repeat=repeat)) / len(queries) * 1e6
+
+def main(queries=200):
+	random.seed(42)
+
+	print("%8s %10s %18s %18s %18s %18s" % ("segments", "build [s]", "first linear [us]", "first bvh [us]", "any linear [us]", "any bvh [us]"))
+	for n in (10000, 30000, 100000):
+		size = (n * 100) ** 0.5
+		segs = random_segments(n, size)
+
+		rays = [ (Vector(random.uniform(0, size), random.uniform(0, size)), Vector(random.uniform(0, size), random.uniform(0, size))) for i in range(queries) ]
+
+		t_build = min(timeit.repeat(lambda: SegmentBVH(segs), number=1, repeat=1))
+		bvh = SegmentBVH(segs)
+		arr = bvh.segments
+
+		t_first_linear = per_query(lambda p1, p2: intersect_segments_ray(arr, p1, p2, nearest=True), rays)
+		t_first_bvh = per_query(bvh.first_hit, rays)
+
+		# the pure Python scan is slow, only use a few queries for it
+		t_any_linear = per_query(lambda p1, p2: any(check_intersect_lineseg_lineseg(p1, p2, a, b) for a, b in segs), rays[:5], repeat=1)
+		t_any_bvh = per_query(bvh.any_hit, rays)
+
+		print("%8d %10.2f %18.1f %18.1f %18.1f %18.1f" % (n, t_build, t_first_linear, t_first_bvh, t_any_linear, t_any_bvh))
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,36 @@
+#!/usr/bin/env python
+
+"""Micro-benchmark for repeated point-in-polygon queries.
+
+Compares Polygon.contains_point with a PreparedPolygon and the batched Polygon.contains_points on regular polygons of increasing size.
+
+	$ python -m benchmarks.bench_contains
+"""
+
+import random
+import timeit
+
+from py2d.Math import Polygon, Vector, VectorArray
+
+def main(queries=2000):
+	random.seed(42)
+	points = [Vector(random.uniform(-120, 120), random.uniform(-120, 120)) for i in range(queries)]
+
+	print("%d queries" % queries)
+	print("%8s %16s %16s %16s %16s" % ("points", "polygon [ms]", "prepare [ms]", "prepared [ms]", "batched [ms]"))
+	for n in (8, 64, 512):
+		poly = Polygon.regular(Vector(0, 0), 100, n)
+
+		t_poly = min(timeit.repeat(lambda: [poly.contains_point(p) for p in points], number=1, repeat=3))
+		t_prepare = min(timeit.repeat(lambda: Polygon.from_pointlist(poly.points).prepare(), number=1, repeat=3))
+
+		prepared = poly.prepare()
+		t_prepared = min(timeit.repeat(lambda: [prepared.contains_point(p) for p in points], number=1, repeat=3))
+
+		batch = VectorArray.from_vectors(points)
+		t_batched = min(timeit.repeat(lambda: poly.contains_points(batch), number=1, repeat=3))
+
+		print("%8d %16.2f %16.2f %16.2f %16.2f" % (n, t_poly * 1000, t_prepare * 1000, t_prepared * 1000, t_batched * 1000))
+
+if __name__ == "__main__":
+	main()
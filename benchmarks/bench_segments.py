@@ -0,0 +1,42 @@
+#!/usr/bin/env python
+
+"""Benchmark for finding all intersections in a set of line segments.
+
+Times intersect_segments on random short segments, on stacked segments that overlap in x only, and on long parallel
+diagonal walls without any intersections, whose bounding boxes all overlap so that they are left to the sweep.
+
+	$ python -m benchmarks.bench_segments
+"""
+
+import timeit
+
+import numpy
+
+from py2d.Math import intersect_segments
+
+def random_segments(n, rng):
+	starts = rng.uniform(0, n ** 0.5 * 5, (n, 2))
+	return numpy.hstack((starts, starts + rng.uniform(-5, 5, (n, 2))))
+
+def stacked_segments(n, rng):
+	y = numpy.arange(n, dtype=numpy.float64)
+	return numpy.column_stack((numpy.zeros(n), y, numpy.full(n, 100.0), y + 0.5))
+
+def diagonal_walls(n, rng):
+	y = numpy.arange(n, dtype=numpy.float64)
+	return numpy.column_stack((numpy.zeros(n), y, numpy.full(n, float(n)), y + n))
+
+def main():
+	rng = numpy.random.default_rng(42)
+
+	print("%16s %8s %14s %10s" % ("input", "segments", "intersections", "time [s]"))
+	for name, f in (("random short", random_segments), ("stacked", stacked_segments), ("diagonal walls", diagonal_walls)):
+		for n in (2000, 10000, 50000):
+			segs = f(n, rng)
+			k = len(intersect_segments(segs)[0])
+			t = min(timeit.repeat(lambda: intersect_segments(segs), number=1, repeat=3))
+
+			print("%16s %8d %14d %10.3f" % (name, n, k, t))
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,38 @@
+#!/usr/bin/env python
+
+"""Benchmark for merging many polygons at once.
+
+Compares Polygon.union_all in a single process with pools of worker processes, on a grid of overlapping tiles that merge
+into one polygon and on disjoint building footprints that only need to be swept one by one.
+
+	$ python -m benchmarks.bench_union
+"""
+
+import os
+import random
+import timeit
+
+from py2d.Math import Polygon, Vector
+
+def overlapping_tiles(n):
+	side = int(n ** 0.5)
+	return [ Polygon.from_tuples([(x, y), (x + 1.5, y), (x + 1.5, y + 1.5), (x, y + 1.5)]) for x in range(side) for y in range(side) ]
+
+def disjoint_footprints(n):
+	side = int(n ** 0.5)
+	return [ Polygon.regular(Vector(x * 10 + random.uniform(-1, 1), y * 10 + random.uniform(-1, 1)), 3, random.randint(4, 12)) for x in range(side) for y in range(side) ]
+
+def main(n=10000):
+	random.seed(42)
+
+	counts = [ p for p in (2, 4) if p <= (os.cpu_count() or 1) ] or [2]
+	print("%d polygons, %d CPUs" % (n, os.cpu_count() or 1))
+	print("%20s %12s %s" % ("input", "serial [s]", " ".join("%5d processes [s]" % p for p in counts)))
+	for name, polys in (("overlapping tiles", overlapping_tiles(n)), ("disjoint footprints", disjoint_footprints(n))):
+		t_serial = min(timeit.repeat(lambda: Polygon.union_all(polys), number=1, repeat=1))
+		t_pools = [ min(timeit.repeat(lambda: Polygon.union_all(polys, processes=p), number=1, repeat=1)) for p in counts ]
+
+		print("%20s %12.2f %s" % (name, t_serial, " ".join("%17.2f" % t for t in t_pools)))
+
+if __name__ == "__main__":
+	main()
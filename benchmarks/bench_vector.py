@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+
+"""Micro-benchmark for Vector allocation and hashing.
+
+Compares the slotted Vector with a copy of the previous dict-based implementation that hashed via string formatting.
+
+	$ python -m benchmarks.bench_vector
+"""
+
+import random
+import timeit
+import tracemalloc
+
+from py2d.Math import Vector, EPSILON
+
+class LegacyVector(object):
+	"""The dict-based Vector with a string hash, as it was before slotting"""
+
+	def __init__(self, x, y):
+		self.x = x
+		self.y = y
+
+	def __sub__(self, b):
+		return LegacyVector(self.x - b.x, self.y - b.y)
+
+	def __eq__(self, other):
+		if not isinstance(other, LegacyVector): return False
+		d = self - other
+		return abs(d.x) < EPSILON and abs(d.y) < EPSILON
+
+	def __hash__(self):
+		return hash("%.4f %.4f" % (self.x, self.y))
+
+
+def measure_allocation(cls, coords):
+	"""Return the number of bytes allocated per instance when creating instances of cls"""
+	tracemalloc.start()
+	before = tracemalloc.take_snapshot()
+	vectors = [cls(x, y) for x, y in coords]
+	after = tracemalloc.take_snapshot()
+	tracemalloc.stop()
+
+	size = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+
+	# subtract the size of the list holding the vectors
+	size -= len(vectors) * 8
+	return float(size) / len(vectors)
+
+def measure(cls, coords, repeat=5):
+	vectors = [cls(x, y) for x, y in coords]
+
+	t_alloc = min(timeit.repeat(lambda: [cls(x, y) for x, y in coords], number=1, repeat=repeat))
+	t_hash = min(timeit.repeat(lambda: [hash(v) for v in vectors], number=1, repeat=repeat))
+	t_set = min(timeit.repeat(lambda: set(vectors), number=1, repeat=repeat))
+	t_eq = min(timeit.repeat(lambda: [a == b for a, b in zip(vectors, vectors[1:])], number=1, repeat=repeat))
+
+	return measure_allocation(cls, coords), t_alloc, t_hash, t_set, t_eq
+
+def main(n=100000):
+	random.seed(42)
+	coords = [(random.uniform(-1000, 1000), random.uniform(-1000, 1000)) for i in range(n)]
+
+	print("%d vectors" % n)
+	print("%-14s %12s %12s %12s %12s %12s" % ("", "bytes/vec", "alloc [ms]", "hash [ms]", "set [ms]", "eq [ms]"))
+	for name, cls in (("before", LegacyVector), ("after", Vector)):
+		bytes_per, t_alloc, t_hash, t_set, t_eq = measure(cls, coords)
+		print("%-14s %12.1f %12.2f %12.2f %12.2f %12.2f" % (name, bytes_per, t_alloc * 1000, t_hash * 1000, t_set * 1000, t_eq * 1000))
+
+if __name__ == "__main__":
+	main()
@@ -25,7 +25,7 @@ class Draw(Example):
 
 	def update(self, time_elapsed):
 		if self.runner.keys[K_BACKSPACE] and self.poly.points:
-			del(self.poly.points[len(self.poly.points)-1])
+			del self.poly[-1]
 			self.runner.keys[K_BACKSPACE] = False
 
 	def render(self):
@@ -148,7 +148,7 @@ class Offset(Example):
 
 	def update(self, time_elapsed):
 		if self.runner.keys[K_BACKSPACE] and self.poly.points:
-			del(self.poly.points[len(self.poly.points)-1])
+			del self.poly[-1]
 			self.runner.keys[K_BACKSPACE] = False
 			self.update_offset()
 
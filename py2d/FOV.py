@@ -3,6 +3,7 @@
 """Calculation of polygonal Field of View (FOV)"""
 
 import functools
+import numpy
 import py2d.Math
 
 class Vision:
@@ -54,6 +55,9 @@ class Vision:
 		# convert obstructor line strips to lists of line segments
 		self.obs_segs = flatten_list([ list(zip(strip, strip[1:])) for strip in obstructors ])
 
+		# index the obstructor segments for ray casting and visibility tests
+		self.obs_bvh = py2d.Math.SegmentBVH(self.obs_segs)
+
 		self.cached_vision = None
 		self.cached_position = None
 		self.cached_radius = None
@@ -90,6 +94,9 @@ class Vision:
 
 		radius_squared = radius * radius
 
+		# the boundary is tested against many points, prepare it for fast containment tests
+		prepared_boundary = boundary.prepare()
+
 
 		closest_points = lambda points, reference: sorted(points, key=lambda p: (p - reference).get_length_squared())
 
@@ -99,8 +106,10 @@ class Vision:
 
 
 		def segment_in_obs(seg):
-			for line_segment in self.obs_segs:
-				if sub_segment(seg, line_segment):
+			# only obstructors within 0.01 of both end points can contain the segment
+			a, b = seg
+			for k in self.obs_bvh.query_box(min(a.x, b.x) - 0.01, min(a.y, b.y) - 0.01, max(a.x, b.x) + 0.01, max(a.y, b.y) + 0.01):
+				if sub_segment(seg, self.obs_segs[k]):
 					return True
 			return False
 
@@ -109,19 +118,14 @@ class Vision:
 
 			if p not in bpoints:
 				if (eye - p).get_length_squared() > radius_squared: return False
-				if not boundary.contains_point(p): return False
-
-			for line_segment in obs_segs:
-				if py2d.Math.check_intersect_lineseg_lineseg( eye, p, line_segment[0], line_segment[1]):
-					if line_segment[0] != p and line_segment[1] != p:
-						return False
-
-			return True
+				if not prepared_boundary.contains_point(p): return False
 
-		def lineseg_in_radius(seg):
-			return py2d.Math.distance_point_lineseg_squared(eye, seg[0], seg[1]) <= radius_squared
+			# obstructors that only touch p with one of their end points do not hide it
+			return not self.obs_bvh.any_hit(eye, p, skip=p)
 
-		obs_segs = filter(lineseg_in_radius, self.obs_segs)
+		# obstructor segments within the radius, computed for all segments at once
+		in_radius = py2d.Math.distance_points_segments_squared(eye, self.obs_bvh.segments) <= radius_squared
+		obs_segs = [ self.obs_segs[k] for k in numpy.flatnonzero(in_radius).tolist() ]
 
 		# add all obstruction points and boundary points directly visible from the eye
 		visible_points = list(filter(check_visibility, set(self.obs_points + boundary.points )))
@@ -150,22 +154,46 @@ class Vision:
 		poly.add_points(visible_points)
 		poly.sort_around(eye)
 
+		def nearest_intersection(c):
+			"""Intersect visible point with obstructors and boundary polygon and get the closest intersection behind it"""
+			intersections = set(py2d.Math.intersect_linesegs_ray(obs_segs, eye, c) + py2d.Math.intersect_poly_ray(boundary.points, eye, c))
+			intersections = [ip for ip in intersections if ip != c and prepared_boundary.contains_point(ip)]
+
+			if not intersections: return None
+			return min(intersections, key=lambda p: (p - eye).length_squared)
+
+		# cast rays through all visible points, keeping only the nearest hit behind every point
+		targets = poly.as_vector_array()
+		t_min = 1 + py2d.Math.EPSILON / numpy.maximum((targets - eye).lengths, py2d.Math.EPSILON)
+
+		hit_indices, hit_ts, hit_points = py2d.Math.intersect_segments_rays(py2d.Math.poly_segment_array(boundary), eye, targets, nearest=True, t_min=t_min)
+
+		ray_hits = []
+		for k, (c, t) in enumerate(zip(poly.points, t_min.tolist())):
+			hit = self.obs_bvh.first_hit(eye, c, t_min=t)
+			if hit and hit[1] <= hit_ts[k]:
+				ray_hits.append(hit[2])
+			else:
+				ray_hits.append(hit_points[k] if hit_indices[k] >= 0 else None)
+
+		# every iteration of the loop below handles the next of the points the rays were cast through
+		k = 0
+
 		i = 0
 		while i < len(poly.points):
 			p = poly.points[i-1]
 			c = poly.points[i]
 			n = poly.points[ (i+1) % len(poly.points) ]
 
-			# intersect visible point with obstructors and boundary polygon
-			intersections = set(py2d.Math.intersect_linesegs_ray(obs_segs, eye, c) + py2d.Math.intersect_poly_ray(boundary.points, eye, c))
-
-			intersections = [ip for ip in intersections if ip != c and boundary.contains_point(ip)]
-
+			intersection = ray_hits[k]
+			k += 1
 
-			if self.debug: self.debug_points.extend([(pt, 0x00FF00) for pt in intersections])
-			if intersections:
+			# the nearest hit can only be outside of the boundary if the boundary is not star-shaped around the eye
+			if intersection and not prepared_boundary.contains_point(intersection):
+				intersection = nearest_intersection(c)
 
-				intersection = min(intersections, key=lambda p: (p - eye).length_squared)
+			if self.debug and intersection: self.debug_points.append((intersection, 0x00FF00))
+			if intersection:
 
 				#if self.debug: self.debug_linesegs.append((0xFF00FF, [eye, intersection]))
 
@@ -203,7 +231,7 @@ class Vision:
 
 
 		# handle border case where polypoint at 0 is wrongfully inserted before because poly was not finished at -1
-		if segment_in_obs((poly.points[-1], poly.points[1])):
+		if len(poly.points) > 2 and segment_in_obs((poly.points[-1], poly.points[1])):
 			poly.points[0], poly.points[1] = poly.points[1], poly.points[0]
 
 
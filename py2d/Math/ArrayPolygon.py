@@ -0,0 +1,310 @@
+# cython: language_level=3
+
+"""Polygons backed by a contiguous point buffer"""
+
+import numpy
+
+try:
+	from collections.abc import MutableSequence
+except ImportError:
+	from collections import MutableSequence
+
+from py2d.Math.Vector import *
+from py2d.Math.VectorArray import *
+from py2d.Math.Polygon import Polygon
+
+class ArrayPolygon(Polygon):
+	"""Class for 2D Polygons that store their points in a contiguous float64 Nx2 buffer.
+
+	An ArrayPolygon can be used everywhere a Polygon can be used. In addition, its points can be handed to NumPy,
+	rendering or physics libraries without conversion:
+
+		- poly.data is a zero-copy Nx2 NumPy view of the points
+		- poly.as_vector_array() wraps that view in a VectorArray without copying
+		- numpy.asarray(poly) exposes the buffer directly. For the buffer protocol, use memoryview(poly.data)
+
+	poly.points is a list-like view that reads and writes Vectors from and to the buffer, so existing code working on
+	lists of Vectors keeps working. Note that the Vectors it hands out are copies: modifying them will not change the polygon,
+	assign them back with poly[i] = v instead.
+
+	Views obtained from poly.data stay valid until the polygon grows beyond its current capacity.
+	"""
+
+	def __init__(self, points=None):
+		"""Create a new ArrayPolygon object
+
+		@type points: VectorArray
+		@param points: Optional initial points. Anything accepted by as_vector_array will do. NumPy arrays and VectorArrays are used without copying.
+		"""
+		self._cache = {}
+		self._buf = numpy.empty((0, 2))
+		self._n = 0
+
+		if points is not None: self.set_points(points)
+
+	@staticmethod
+	def regular(center, radius, points):
+		"""Create a regular polygon. See L{Polygon.regular}."""
+		phi = numpy.arange(points) * (2 * numpy.pi / points)
+		return ArrayPolygon(numpy.column_stack((center.x + radius * numpy.cos(phi), center.y + radius * numpy.sin(phi))))
+
+	@staticmethod
+	def from_pointlist(points):
+		"""Create an array polygon from a list of points
+
+		@type points: List
+		@param points: List of Vectors that make up the polygon
+		"""
+		return ArrayPolygon(VectorArray.from_vectors(points))
+
+	@staticmethod
+	def from_tuples(tuples):
+		"""Create an array polygon from 2-tuples
+
+		@type tuples: List
+		@param tuples: List of tuples of x,y coordinates
+		"""
+		return ArrayPolygon(VectorArray.from_tuples(tuples))
+
+	@staticmethod
+	def from_vector_array(points):
+		"""Create an array polygon that uses the buffer of a VectorArray without copying
+
+		@type points: VectorArray
+		@param points: VectorArray of the polygon points
+		"""
+		return ArrayPolygon(points)
+
+	def get_points(self):
+		return PointView(self)
+
+	def set_points(self, points):
+		if isinstance(points, PointView): points = points.polygon.data.copy()
+		data = as_vector_array(points).data
+
+		self._buf = data
+		self._n = data.shape[0]
+		self._cache.clear()
+
+	def get_data(self):
+		"""Get a zero-copy Nx2 NumPy view of the points"""
+		return self._buf[:self._n]
+
+	def _reserve(self, n):
+		"""Make sure the buffer can hold at least n points, growing it geometrically"""
+		if n > self._buf.shape[0]:
+			buf = numpy.empty((max(n, 2 * self._buf.shape[0], 8), 2))
+			buf[:self._n] = self._buf[:self._n]
+			self._buf = buf
+
+	def add_point(self, point):
+		"""Add a new point at the end of the polygon
+
+		@type point: Vector
+		@param point: The new Vector to add to the polygon
+		"""
+		self._reserve(self._n + 1)
+		self._buf[self._n] = (point.x, point.y)
+		self._n += 1
+		self._cache.clear()
+
+	def add_points(self, points):
+		"""Add multiple new points to the end of the polygon
+
+		@type points: List
+		@param points: A list of Vectors or anything else accepted by as_vector_array
+		"""
+		data = as_vector_array(points).data
+		n = data.shape[0]
+
+		self._reserve(self._n + n)
+		self._buf[self._n:self._n + n] = data
+		self._n += n
+		self._cache.clear()
+
+	def insert_point(self, i, point):
+		"""Insert a new point before index i"""
+		if i < 0: i += self._n
+		i = min(max(i, 0), self._n)
+
+		self._reserve(self._n + 1)
+		self._buf[i + 1:self._n + 1] = self._buf[i:self._n].copy()
+		self._buf[i] = (point.x, point.y)
+		self._n += 1
+		self._cache.clear()
+
+	def clone(self):
+		"""Return a copy of the polygon that does not share its buffer"""
+		poly = ArrayPolygon(self.data.copy())
+		poly._cache.update(self._cache)
+		return poly
+
+	def flip(self):
+		"""Reverses the orientation of the polygon"""
+		bounds = self._cache.get('bounds')
+
+		data = self.data
+		data[:] = data[::-1].copy()
+
+		self._cache.clear()
+		if bounds is not None: self._cache['bounds'] = bounds
+
+		return self
+
+	def as_tuple_list(self):
+		return [(x, y) for x, y in self.data.tolist()]
+
+	def as_vector_array(self):
+		"""Get the points of the polygon as a VectorArray sharing the buffer of the polygon"""
+		return VectorArray(self.data)
+
+	def get_bounds(self):
+		"""Get the axis-aligned bounding box of the polygon as a tuple (left, top, right, bottom)"""
+		bounds = self._cache.get('bounds')
+		if bounds is None:
+			data = self.data
+			(left, top), (right, bottom) = data.min(axis=0).tolist(), data.max(axis=0).tolist()
+			bounds = self._cache['bounds'] = (left, top, right, bottom)
+		return bounds
+
+	def get_centerpoint(self):
+		"""Get the mean of the polygon points"""
+		x, y = self.data.mean(axis=0).tolist()
+		return Vector(x, y)
+
+	def _get_area_centroid(self):
+		"""Compute signed area and area centroid of the polygon in a single vectorized pass"""
+		ac = self._cache.get('area_centroid')
+		if ac is None:
+			cur = self.data
+			prv = numpy.roll(cur, 1, axis=0)
+
+			cross = prv[:, 0] * cur[:, 1] - cur[:, 0] * prv[:, 1]
+			a = 0.5 * float(cross.sum())
+
+			if a != 0:
+				cx, cy = (((prv + cur) * cross[:, numpy.newaxis]).sum(axis=0) / (6 * a)).tolist()
+				centroid = Vector(cx, cy)
+			else:
+				centroid = self.get_centerpoint()
+
+			ac = self._cache['area_centroid'] = (a, centroid)
+		return ac
+
+	def __getitem__(self, key):
+		return self.get_points()[key]
+
+	def __setitem__(self, key, value):
+		self.get_points()[key] = value
+
+	def __delitem__(self, key):
+		del self.get_points()[key]
+
+	def __len__(self):
+		return self._n
+
+	def __array__(self, dtype=None, copy=None):
+		data = self.data
+		if dtype is not None and data.dtype != dtype:
+			if copy is False: raise ValueError("Cannot convert to %s without copying" % numpy.dtype(dtype))
+			return data.astype(dtype)
+		return data.copy() if copy else data
+
+	def __getstate__(self):
+		return {'points': self.data.copy()}
+
+	def __setstate__(self, state):
+		self.__init__(state['points'])
+
+	points = property(get_points, set_points)
+	data = property(get_data)
+
+
+class PointView(MutableSequence):
+	"""List-like view of the points of an ArrayPolygon.
+
+	Reading items will create Vectors, writing items will store their coordinates in the polygon buffer.
+	Slicing will return plain lists of Vectors.
+	"""
+
+	__slots__ = ('polygon',)
+
+	def __init__(self, polygon):
+		self.polygon = polygon
+
+	def __len__(self):
+		return self.polygon._n
+
+	def __getitem__(self, key):
+		data = self.polygon.data
+		if isinstance(key, slice):
+			return [Vector(x, y) for x, y in data[key].tolist()]
+
+		x, y = data[key].tolist()
+		return Vector(x, y)
+
+	def __setitem__(self, key, value):
+		poly = self.polygon
+		if isinstance(key, slice):
+			values = as_vector_array(list(value)).data
+			if len(range(*key.indices(poly._n))) == values.shape[0]:
+				poly.data[key] = values
+			else:
+				# slice assignment that changes the length of the polygon
+				pts = list(self)
+				pts[key] = [Vector(x, y) for x, y in values.tolist()]
+				poly.set_points(pts)
+		else:
+			poly.data[key] = (value.x, value.y)
+
+		poly._cache.clear()
+
+	def __delitem__(self, key):
+		poly = self.polygon
+		keep = numpy.ones(poly._n, dtype=bool)
+		keep[key] = False
+
+		n = int(keep.sum())
+		poly._buf[:n] = poly.data[keep]
+		poly._n = n
+		poly._cache.clear()
+
+	def insert(self, i, value):
+		self.polygon.insert_point(i, value)
+
+	def append(self, value):
+		self.polygon.add_point(value)
+
+	def extend(self, values):
+		self.polygon.add_points(list(values))
+
+	def reverse(self):
+		self.polygon.flip()
+
+	def sort(self, key=None, reverse=False):
+		pts = sorted(self, key=key, reverse=reverse)
+		self.polygon.data[:] = as_vector_array(pts).data
+		self.polygon._cache.clear()
+
+	def __iter__(self):
+		return iter(self[:])
+
+	def __eq__(self, other):
+		try:
+			return self[:] == list(other)
+		except TypeError:
+			return False
+
+	def __ne__(self, other):
+		return not self.__eq__(other)
+
+	def __add__(self, other):
+		return self[:] + list(other)
+
+	def __radd__(self, other):
+		return list(other) + self[:]
+
+	def __repr__(self):
+		return repr(self[:])
+
+	__hash__ = None
@@ -0,0 +1,642 @@
+# cython: language_level=3
+
+"""Boolean operations on polygons with holes by a plane sweep"""
+
+import heapq
+import math
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy
+
+from py2d.Math.Vector import *
+from py2d.Math.VectorArray import *
+from py2d.Math.Operations import orientation_determinant
+from py2d.Math.RTree import _str_order
+
+def polygon_boolean(subject, clipping, operation, fill_rule="evenodd"):
+	"""Perform a boolean operation on two sets of polygons.
+
+	Both operands are lists of rings. By default, the inside of an operand is given by the even-odd rule, so rings inside of
+	other rings are holes, and the orientation of the rings does not matter. Edges are split at their intersections during a
+	single sweep over all edges, so the running time is O((n + k) log n) for n edges with k intersections. Touching and
+	overlapping edges are handled exactly, also within the same operand.
+
+	The sweep counts winding numbers, which are positive inside of counter-clockwise rings, see L{py2d.Math.Polygon.is_clockwise}.
+	The fill rule decides which winding numbers are inside of an operand:
+
+		- "evenodd": odd winding numbers
+		- "nonzero": winding numbers other than 0
+		- "positive": winding numbers above 0
+
+	Reference:
+	Francisco Martinez, Carlos Ogayar, Juan R. Jimenez, Antonio J. Rueda. A simple algorithm for Boolean operations on polygons.
+	Advances in Engineering Software 64, pp 11-19, 2013
+
+	@type subject: List
+	@param subject: The rings of the first operand, each of which may be anything accepted by as_vector_array
+
+	@type clipping: List
+	@param clipping: The rings of the second operand, each of which may be anything accepted by as_vector_array
+
+	@type operation: char
+	@param operation: The operation to perform. Either 'u' for union, 'i' for intersection, 'd' for difference or 'x' for exclusive or.
+
+	@type fill_rule: str
+	@param fill_rule: Either "evenodd", "nonzero" or "positive"
+
+	@return: A list of tuples (outline, holes) of the resulting islands. outline is a list of Vectors in counter-clockwise order
+	and holes is a list of clockwise lists of Vectors, see L{py2d.Math.Polygon.is_clockwise}.
+	"""
+
+	if operation not in ('u', 'i', 'd', 'x'): raise ValueError("Operation must be 'u', 'i', 'd' or 'x'!")
+	if fill_rule not in ("evenodd", "nonzero", "positive"): raise ValueError("Unknown fill rule: %s" % fill_rule)
+
+	return _boolean_sweep(subject, clipping, operation, _inside_test(operation, fill_rule))
+
+def _boolean_sweep(subject, clipping, operation, inside):
+	"""Perform a boolean operation on two sets of rings, see L{polygon_boolean}.
+
+	inside is a function that checks if a region with the winding numbers (subject, clipping) is part of the result. operation
+	only decides when the sweep can stop early, so for 'i' and 'd', the result must be inside of the subject.
+	"""
+
+	queue = []
+	contour_id = [0]
+
+	def add_rings(rings, is_subject):
+		bounds = [float('inf'), float('inf'), float('-inf'), float('-inf')]
+		for ring in rings:
+			pts = [ Vector(x, y) for x, y in as_vector_array(ring).data.tolist() ]
+			contour_id[0] += 1
+
+			for a, b in zip(pts, pts[1:] + pts[:1]):
+				if _same(a, b): continue
+
+				# crossing an edge that runs from right to left upwards enters a counter-clockwise ring
+				forward = (a.x, a.y) < (b.x, b.y)
+				line = (a, b) if forward else (b, a)
+				wind = -1 if forward else 1
+				wind = (wind, 0) if is_subject else (0, wind)
+
+				e1 = _SweepEvent(a, forward, None, line, is_subject, contour_id[0], wind)
+				e2 = _SweepEvent(b, not forward, e1, line, is_subject, contour_id[0], wind)
+				e1.other = e2
+
+				queue.append((a.x, a.y, e1))
+				queue.append((b.x, b.y, e2))
+
+				bounds[0], bounds[1] = min(bounds[0], a.x), min(bounds[1], a.y)
+				bounds[2], bounds[3] = max(bounds[2], a.x), max(bounds[3], a.y)
+		return bounds
+
+	sbox = add_rings(subject, True)
+	n_subject = len(queue)
+	cbox = add_rings(clipping, False)
+
+	disjoint = sbox[0] > cbox[2] or cbox[0] > sbox[2] or sbox[1] > cbox[3] or cbox[1] > sbox[3]
+	if disjoint or not n_subject or len(queue) == n_subject:
+		# the operands do not interact, so the clipping edges can only matter for union and exclusive or
+		if operation == 'i': return []
+		if operation == 'd': del queue[n_subject:]
+
+	heapq.heapify(queue)
+	events = _subdivide(queue, inside, operation, sbox, cbox)
+
+	return _connect_edges(events)
+
+def polygon_union_all(operands, processes=None):
+	"""Get the union of many operands.
+
+	The operands are put in the Sort-Tile-Recursive order of their bounding boxes, see L{py2d.Math.RTree.RTree}, and merged
+	pairwise in a balanced tree, so that merged operands are close to each other and of about the same size. Islands that
+	do not overlap the bounding box of any island of the other operand are passed on without sweeping them again.
+
+	Reference:
+	Martin Davis. Fast polygon merging in JTS using Cascaded Union. 2007
+
+	@type operands: List
+	@param operands: The operands to merge, each of which is a list of rings as for L{polygon_boolean}
+
+	@type processes: int
+	@param processes: If given, the sweeps of every level of the tree, which are independent of each other, are run in a pool of
+	this many worker processes. Only the rings that are swept are sent to the workers, groups that do not overlap are joined
+	without sweeping. See benchmarks/bench_union.py.
+
+	@return: A list of tuples (outline, holes) as for L{polygon_boolean}
+	"""
+
+	items = []
+	for rings in operands:
+		rings = [ as_vector_array(r).data for r in rings ]
+		rings = [ r for r in rings if len(r) ]
+		if not rings: continue
+
+		pts = numpy.concatenate(rings)
+		items.append(( tuple(pts.min(axis=0).tolist() + pts.max(axis=0).tolist()), rings, True ))
+
+	if not items: return []
+
+	order = _str_order(numpy.array([ it[0] for it in items ], dtype=numpy.float64), 16)
+	groups = [ [items[i]] for i in order.tolist() ]
+
+	if processes is not None and processes > 1 and len(groups) > 1:
+		with ProcessPoolExecutor(processes) as pool:
+			merged = _union_tree(groups, lambda jobs: pool.map(_sweep_union, jobs, chunksize=int(math.ceil(len(jobs) / (4.0 * processes)))))
+	else:
+		merged = _union_tree(groups, lambda jobs: map(_sweep_union, jobs))
+
+	return [ ([ Vector(x, y) for x, y in rings[0].tolist() ], [ [ Vector(x, y) for x, y in h.tolist() ] for h in rings[1:] ]) for box, rings, raw in merged ]
+
+def _union_tree(groups, sweep):
+	"""Merge groups of islands pairwise in a balanced tree.
+
+	An island is a tuple (box, rings, raw), where rings are Nx2 arrays and raw islands are input operands that have not been swept yet.
+	All sweeps of one level of the tree are independent, so they are passed to sweep together, which may run them in parallel.
+
+	@type sweep: function
+	@param sweep: A function like map(_sweep_union, jobs) that performs the sweeps of a list of jobs (subject, clipping)
+
+	@return: The merged group, which has no raw islands
+	"""
+
+	while len(groups) > 1:
+		pairs = list(zip(groups[::2], groups[1::2]))
+		plans = [ _overlapping_islands(a, b) for a, b in pairs ]
+
+		# only the pairs that overlap are swept, the others are simply joined
+		jobs = [ ([ r for i in ia for r in a[i][1] ], [ r for i in ib for r in b[i][1] ]) for (a, b), (ia, ib) in zip(pairs, plans) if ia ]
+		swept = iter(list(sweep(jobs)) if jobs else [])
+
+		merged = []
+		for (a, b), (ia, ib) in zip(pairs, plans):
+			if not ia:
+				merged.append(a + b)
+				continue
+
+			ia, ib = set(ia), set(ib)
+			merged.append([ it for i, it in enumerate(a) if i not in ia ] + [ it for i, it in enumerate(b) if i not in ib ] + next(swept))
+
+		if len(groups) % 2: merged.append(groups[-1])
+		groups = merged
+
+	# input operands that did not overlap any other one still need to be swept on their own
+	raw = [ item for item in groups[0] if item[2] ]
+	swept = iter(list(sweep([ (item[1], []) for item in raw ])) if raw else [])
+	return [ it for item in groups[0] for it in (next(swept) if item[2] else [item]) ]
+
+def _overlapping_islands(a, b):
+	"""Get the indices of the islands of two groups that overlap an island of the other group
+
+	@return: A tuple (ia, ib) of index lists, which are empty if the groups do not overlap
+	"""
+
+	box_a = numpy.array([ it[0] for it in a ], dtype=numpy.float64)
+	box_b = numpy.array([ it[0] for it in b ], dtype=numpy.float64)
+
+	# islands overlapping the bounding box of the other group, then those overlapping one of its islands
+	ca = numpy.flatnonzero(_overlaps(box_a, numpy.concatenate((box_b[:, :2].min(axis=0), box_b[:, 2:].max(axis=0)))))
+	cb = numpy.flatnonzero(_overlaps(box_b, numpy.concatenate((box_a[:, :2].min(axis=0), box_a[:, 2:].max(axis=0)))))
+	if not len(ca) or not len(cb): return [], []
+
+	hit = _overlaps(box_a[ca, None, :], box_b[None, cb, :])
+	return ca[hit.any(axis=1)].tolist(), cb[hit.any(axis=0)].tolist()
+
+def _sweep_union(job):
+	"""Get the union of the rings (subject, clipping) as islands for L{_union_tree}. Runs in worker processes."""
+	subject, clipping = job
+	return _islands(polygon_boolean(subject, clipping, 'u'))
+
+def _overlaps(boxes, box):
+	"""Check which of the boxes (left, top, right, bottom) overlap or touch box"""
+	return (boxes[..., 0] <= box[..., 2]) & (box[..., 0] <= boxes[..., 2]) & (boxes[..., 1] <= box[..., 3]) & (box[..., 1] <= boxes[..., 3])
+
+def _islands(result):
+	"""Make islands for L{_union_tree} from the result of L{polygon_boolean}"""
+
+	out = []
+	for outline, holes in result:
+		rings = [ numpy.array([ (p.x, p.y) for p in ring ], dtype=numpy.float64) for ring in [outline] + holes ]
+		out.append(( tuple(rings[0].min(axis=0).tolist() + rings[0].max(axis=0).tolist()), rings, False ))
+	return out
+
+
+class _SweepEvent(object):
+	"""An end point of an edge in the sweep"""
+
+	__slots__ = ('p', 'left', 'other', 'line', 'is_subject', 'contour_id', 'wind', 'below', 'above', 'prev_in_result', 'result_transition')
+
+	def __init__(self, p, left, other, line, is_subject, contour_id, wind):
+		self.p = p
+		self.left = left
+		self.other = other
+		self.is_subject = is_subject
+		self.contour_id = contour_id
+
+		# the end points of the input edge from left to right. the parts of a split edge are tested against the
+		# input edge, since the rounded split points are usually not exactly on it.
+		self.line = line
+
+		# the change of the winding numbers of (subject, clipping) from below to above the edge. overlapping edges are
+		# merged into one of them by adding up their changes, the other ones are kept with no change.
+		self.wind = wind
+
+		# the winding numbers of the regions below and above the edge
+		self.below = (0, 0)
+		self.above = (0, 0)
+
+		# the closest edge below that is part of the result, and +1 if the result is above this edge, -1 if it is below, 0 if the edge is not part of the result
+		self.prev_in_result = None
+		self.result_transition = 0
+
+	def __lt__(self, other):
+		# only called by the event queue for events at the same point
+		return _compare_events(self, other) < 0
+
+	def side(self, p):
+		"""Get a positive value if p is above the edge, negative if below and 0 if it is on the line of the edge"""
+		return orientation_determinant(self.line[0], self.line[1], p)
+
+	def is_below(self, p):
+		return self.side(p) > 0
+
+	def is_vertical(self):
+		return self.p.x == self.other.p.x
+
+	def __repr__(self):
+		return "_SweepEvent(%s, %s, %s)" % (self.p, self.other.p, "left" if self.left else "right")
+
+
+def _same(a, b):
+	"""Check if two points are exactly the same"""
+	return a.x == b.x and a.y == b.y
+
+def _collinear(e1, e2):
+	"""Check if the edges of two events are on the same line"""
+	return e1.line is e2.line or (e1.side(e2.line[0]) == 0 and e1.side(e2.line[1]) == 0)
+
+def _compare_events(e1, e2):
+	"""Order events from left to right, then bottom to top"""
+
+	p1, p2 = e1.p, e2.p
+	if p1.x != p2.x: return 1 if p1.x > p2.x else -1
+	if p1.y != p2.y: return 1 if p1.y > p2.y else -1
+
+	# right end points are processed first
+	if e1.left != e2.left: return 1 if e1.left else -1
+
+	# the event of the lower edge is processed first
+	if not _collinear(e1, e2): return -1 if e1.is_below(e2.other.p) else 1
+
+	return 1 if (not e1.is_subject and e2.is_subject) else -1
+
+def _compare_segments(le1, le2):
+	"""Order the edges of two left events in the sweep status from bottom to top"""
+
+	if le1 is le2: return 0
+
+	if not _collinear(le1, le2):
+		if _same(le1.p, le2.p): return -1 if le1.is_below(le2.other.p) else 1
+		if le1.p.x == le2.p.x:
+			# a vertical edge is above the edges that start on it, it will be split there right away
+			if le1.is_vertical() and le1.p.y < le2.p.y < le1.other.p.y: return 1
+			if le2.is_vertical() and le2.p.y < le1.p.y < le2.other.p.y: return -1
+			return -1 if le1.p.y < le2.p.y else 1
+
+		# compare at the left end point of the edge that was inserted later, or at its right end point if the left one is on the other edge
+		if _compare_events(le1, le2) > 0:
+			p = le1.other.p if le2.side(le1.p) == 0 else le1.p
+			return 1 if le2.is_below(p) else -1
+
+		p = le2.other.p if le1.side(le2.p) == 0 else le2.p
+		return -1 if le1.is_below(p) else 1
+
+	if le1.is_subject != le2.is_subject: return -1 if le1.is_subject else 1
+
+	if _same(le1.p, le2.p):
+		if _same(le1.other.p, le2.other.p): return 0
+		return 1 if le1.contour_id > le2.contour_id else -1
+
+	return 1 if _compare_events(le1, le2) > 0 else -1
+
+def _inside_test(operation, fill_rule):
+	"""Get a function that checks if a region with the winding numbers (subject, clipping) is part of the result"""
+
+	if fill_rule == "evenodd": filled = lambda w: w % 2 == 1
+	elif fill_rule == "nonzero": filled = lambda w: w != 0
+	else: filled = lambda w: w > 0
+
+	if operation == 'u': return lambda w: filled(w[0]) or filled(w[1])
+	if operation == 'i': return lambda w: filled(w[0]) and filled(w[1])
+	if operation == 'd': return lambda w: filled(w[0]) and not filled(w[1])
+	return lambda w: filled(w[0]) != filled(w[1])
+
+def _compute_fields(e, prev, inside):
+	"""Compute the winding numbers and result flags of a left event from the edge below it"""
+
+	if prev is None:
+		e.below = (0, 0)
+		e.prev_in_result = None
+
+	else:
+		e.below = prev.above
+		e.prev_in_result = prev.prev_in_result if (not prev.result_transition or prev.is_vertical()) else prev
+
+	e.above = (e.below[0] + e.wind[0], e.below[1] + e.wind[1])
+
+	inside_below, inside_above = inside(e.below), inside(e.above)
+	if inside_below == inside_above: e.result_transition = 0
+	else: e.result_transition = 1 if inside_above else -1
+
+def _intersection(e1, e2):
+	"""Intersect the edges of two left events.
+
+	@return: A list of no, one or two intersection points. Two points are returned for overlapping edges. End points are returned exactly.
+	"""
+
+	a1, a2, b1, b2 = e1.p, e1.other.p, e2.p, e2.other.p
+
+	if _collinear(e1, e2):
+		# collinear edges overlap between the later left and the earlier right end point
+		start = b1 if (b1.x, b1.y) > (a1.x, a1.y) else a1
+		end = b2 if (b2.x, b2.y) < (a2.x, a2.y) else a2
+
+		if (start.x, start.y) > (end.x, end.y): return []
+		if _same(start, end): return [start]
+		return [start, end]
+
+	o1, o2 = e1.side(b1), e1.side(b2)
+	if (o1 > 0 and o2 > 0) or (o1 < 0 and o2 < 0): return []
+
+	o3, o4 = e2.side(a1), e2.side(a2)
+	if (o3 > 0 and o4 > 0) or (o3 < 0 and o4 < 0): return []
+
+	if o1 == 0: return [b1]
+	if o2 == 0: return [b2]
+	if o3 == 0: return [a1]
+	if o4 == 0: return [a2]
+
+	# intersect the input edges so that rounding errors do not add up when edges are split repeatedly
+	(c1, c2), (d1, d2) = e1.line, e2.line
+	vcx, vcy = c2.x - c1.x, c2.y - c1.y
+	vdx, vdy = d2.x - d1.x, d2.y - d1.y
+	t = ((d1.x - c1.x) * vdy - (d1.y - c1.y) * vdx) / (vcx * vdy - vcy * vdx)
+
+	# keep the rounded point within the bounding boxes of both edges
+	x = min(max(c1.x + t * vcx, a1.x, b1.x), a2.x, b2.x)
+	y = min(max(c1.y + t * vcy, min(a1.y, a2.y), min(b1.y, b2.y)), max(a1.y, a2.y), max(b1.y, b2.y))
+
+	# snap to an end point that the edges only miss by rounding, so no slivers are split off
+	tol = 1e-14 * max(1.0, abs(x), abs(y))
+	for p in (a1, a2, b1, b2):
+		if abs(p.x - x) <= tol and abs(p.y - y) <= tol: return [p]
+
+	return [Vector(x, y)]
+
+def _divide_segment(e, p, queue):
+	"""Split the edge of the left event e at the point p"""
+
+	r = _SweepEvent(p, False, e, e.line, e.is_subject, e.contour_id, e.wind)
+	l = _SweepEvent(p, True, e.other, e.line, e.is_subject, e.contour_id, e.wind)
+
+	# rounding may have moved p past the right end point
+	if _compare_events(l, e.other) > 0:
+		e.other.left = True
+		l.left = False
+
+	e.other.other = l
+	e.other = r
+
+	heapq.heappush(queue, (p.x, p.y, l))
+	heapq.heappush(queue, (p.x, p.y, r))
+
+def _possible_intersection(e1, e2, queue):
+	"""Split two neighboring edges at their intersections.
+
+	@return: 0 if nothing was done, 1 for a crossing, 2 if the edges share their left end point and overlap, 3 for other overlaps
+	"""
+
+	inter = _intersection(e1, e2)
+	if not inter: return 0
+
+	if len(inter) == 1:
+		p = inter[0]
+		if _same(e1.p, e2.p) or _same(e1.other.p, e2.other.p): return 0
+
+		if not _same(e1.p, p) and not _same(e1.other.p, p): _divide_segment(e1, p, queue)
+		if not _same(e2.p, p) and not _same(e2.other.p, p): _divide_segment(e2, p, queue)
+		return 1
+
+	events = []
+	left_coincide = _same(e1.p, e2.p)
+	right_coincide = _same(e1.other.p, e2.other.p)
+
+	if not left_coincide: events.extend((e2, e1) if _compare_events(e1, e2) > 0 else (e1, e2))
+	if not right_coincide: events.extend((e2.other, e1.other) if _compare_events(e1.other, e2.other) > 0 else (e1.other, e2.other))
+
+	# edges from the same point are merged by the sweep, which sees all of them
+	if left_coincide: return 2
+
+	if right_coincide:
+		_divide_segment(events[0], events[1].p, queue)
+		return 3
+
+	if events[0] is not events[3].other:
+		# the edges overlap partially
+		_divide_segment(events[0], events[1].p, queue)
+		_divide_segment(events[1], events[2].p, queue)
+		return 3
+
+	# one edge contains the other one
+	_divide_segment(events[0], events[1].p, queue)
+	_divide_segment(events[3].other, events[2].p, queue)
+	return 3
+
+def _subdivide(queue, inside, operation, sbox, cbox):
+	"""Run the sweep, splitting the edges at all intersections and computing their result flags.
+
+	@return: The list of processed events in sweep order
+	"""
+
+	status = []
+	events = []
+
+	def find(e):
+		lo, hi = 0, len(status)
+		while lo < hi:
+			mid = (lo + hi) // 2
+			if _compare_segments(status[mid], e) < 0: lo = mid + 1
+			else: hi = mid
+
+		# fall back to a linear search if rounding has disturbed the order
+		if lo < len(status) and status[lo] is e: return lo
+		return status.index(e)
+
+	def merge_overlaps(k):
+		"""Cut the collinear edges from the point of status[k] to the same length and let the lowest one carry their winding"""
+		e = status[k]
+		lo = hi = k
+		while lo > 0 and _same(status[lo - 1].p, e.p) and _collinear(status[lo - 1], e): lo -= 1
+		while hi + 1 < len(status) and _same(status[hi + 1].p, e.p) and _collinear(status[hi + 1], e): hi += 1
+
+		bundle = status[lo:hi + 1]
+		end = min(( b.other.p for b in bundle ), key=lambda p: (p.x, p.y))
+
+		ws = wc = 0
+		for b in bundle:
+			if not _same(b.other.p, end): _divide_segment(b, end, queue)
+			ws, wc = ws + b.wind[0], wc + b.wind[1]
+			b.wind = (0, 0)
+		bundle[0].wind = (ws, wc)
+
+		prev = status[lo - 1] if lo > 0 else None
+		for b in bundle:
+			_compute_fields(b, prev, inside)
+			prev = b
+
+	right_bound = min(sbox[2], cbox[2])
+
+	while queue:
+		e = heapq.heappop(queue)[2]
+		events.append(e)
+
+		# nothing right of the operands can be part of the result
+		if (operation == 'i' and e.p.x > right_bound) or (operation == 'd' and e.p.x > sbox[2]): break
+
+		if e.left:
+			lo, hi = 0, len(status)
+			while lo < hi:
+				mid = (lo + hi) // 2
+				if _compare_segments(status[mid], e) < 0: lo = mid + 1
+				else: hi = mid
+
+			status.insert(lo, e)
+			prev = status[lo - 1] if lo > 0 else None
+			nxt = status[lo + 1] if lo + 1 < len(status) else None
+
+			_compute_fields(e, prev, inside)
+			ends = [nb.other if nb is not None else None for nb in (prev, nxt)]
+
+			overlap = nxt is not None and _possible_intersection(e, nxt, queue) == 2
+			overlap = (prev is not None and _possible_intersection(prev, e, queue) == 2) or overlap
+			if overlap: merge_overlaps(lo)
+
+			# a neighbour passing through the point of e was split there, so the order of e against it
+			# was decided by rounding. process e again once the left part of the neighbour is removed.
+			if any(nb is not None and nb.other is not end and _same(nb.other.p, e.p) for nb, end in zip((prev, nxt), ends)):
+				del status[status.index(e)]
+				events.pop()
+				heapq.heappush(queue, (e.p.x, e.p.y, e))
+
+		else:
+			try:
+				k = find(e.other)
+			except ValueError:
+				continue
+
+			prev = status[k - 1] if k > 0 else None
+			nxt = status[k + 1] if k + 1 < len(status) else None
+			del status[k]
+
+			if prev is not None and nxt is not None: _possible_intersection(prev, nxt, queue)
+
+	return events
+
+def _connect_edges(events):
+	"""Connect the result edges to rings and assign the holes to their islands"""
+
+	# orient the result edges so that the result is on their left
+	edges = []
+	outgoing = {}
+	for e in events:
+		if not e.left or e.result_transition == 0 or _same(e.p, e.other.p): continue
+
+		a, b = (e.p, e.other.p) if e.result_transition > 0 else (e.other.p, e.p)
+		outgoing.setdefault((a.x, a.y), []).append(len(edges))
+		edges.append((a, b, e))
+
+	used = [False] * len(edges)
+	ring_of = {}
+	rings = []
+
+	for start in range(len(edges)):
+		if used[start]: continue
+
+		ring = []
+		k = start
+		while not used[k]:
+			used[k] = True
+			a, b, e = edges[k]
+			ring.append(a)
+			ring_of[e] = len(rings)
+
+			# continue with the first unused edge clockwise from the way back
+			back = math.atan2(a.y - b.y, a.x - b.x)
+			best, best_turn = None, None
+			for j in outgoing[(b.x, b.y)]:
+				if used[j]: continue
+				c = edges[j][1]
+				turn = (back - math.atan2(c.y - b.y, c.x - b.x)) % (2 * math.pi)
+				if turn == 0: turn = 2 * math.pi
+				if best is None or turn < best_turn: best, best_turn = j, turn
+
+			if best is None: break
+			k = best
+
+		rings.append(ring)
+
+	area = [ _signed_area(r) for r in rings ]
+
+	# the sweep finds the first edge of every ring before any ring above it. the closest result edge below that edge
+	# belongs to the island of a hole, or to another hole of the same island.
+	parent = {}
+	islands = []
+	for e in events:
+		r = ring_of.get(e)
+		if r is None or r in parent: continue
+
+		if area[r] > 0:
+			parent[r] = r
+			islands.append(r)
+			continue
+
+		below = e.prev_in_result
+		while below is not None and below not in ring_of: below = below.prev_in_result
+		parent[r] = parent.get(ring_of[below]) if below is not None else None
+
+	holes = dict((r, []) for r in islands)
+	for r, p in parent.items():
+		if p is not None and p != r: holes[p].append(r)
+
+	out = []
+	for r in islands:
+		outline = _simplify_ring(rings[r])
+		if len(outline) < 3: continue
+
+		# islands are returned counter-clockwise and holes clockwise in the sense of Polygon.is_clockwise
+		outline.reverse()
+		out.append((outline, [ h[::-1] for h in (_simplify_ring(rings[h]) for h in sorted(holes[r])) if len(h) >= 3 ]))
+
+	return out
+
+def _signed_area(ring):
+	"""Get twice the signed area of a list of points"""
+	return sum(a.x * b.y - b.x * a.y for a, b in zip(ring, ring[1:] + ring[:1]))
+
+def _straight(a, b, c):
+	"""Check if b is on the line segment between a and c"""
+	return orientation_determinant(a, b, c) == 0 and (a.x - b.x) * (c.x - b.x) + (a.y - b.y) * (c.y - b.y) < 0
+
+def _simplify_ring(ring):
+	"""Remove the vertices of a ring that are on a straight line between their neighbors"""
+
+	out = []
+	for p in ring:
+		while len(out) >= 2 and _straight(out[-2], out[-1], p): out.pop()
+		out.append(p)
+
+	while len(out) >= 3:
+		if _straight(out[-2], out[-1], out[0]): out.pop()
+		elif _straight(out[-1], out[0], out[1]): out.pop(0)
+		else: break
+
+	return out
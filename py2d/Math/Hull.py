@@ -0,0 +1,325 @@
+# cython: language_level=3
+
+"""Convex hulls and rotating calipers"""
+
+import math
+
+import numpy
+
+from py2d.Math.Vector import *
+from py2d.Math.VectorArray import *
+from py2d.Math.Operations import orientation_determinant, point_orientations
+from py2d.Math.Polygon import Polygon
+from py2d.Math.ArrayPolygon import ArrayPolygon
+
+# number of points from which it pays off to discard interior points with NumPy before building the hull
+_PREFILTER_THRESHOLD = 64
+
+def convex_hull_indices(points):
+	"""Get the indices of the convex hull vertices of a point set.
+
+	The hull is built with Andrew's monotone chain algorithm in O(n log n). Points inside the octagon spanned by the
+	extreme points in x, y and the diagonal directions are discarded first, which leaves only few points for typical inputs.
+	All orientation tests are exact, see L{orientation_determinant}.
+
+	Reference:
+	A. M. Andrew. Another efficient algorithm for convex hulls in two dimensions.
+	Information Processing Letters 9(5):216-219, 1979
+
+	@type points: VectorArray
+	@param points: The points. Anything accepted by as_vector_array will do.
+
+	@return: An int NumPy array of the indices of the hull vertices in the same orientation as L{Polygon.regular}, starting at the
+	lowest point with the smallest x coordinate. Collinear points on the hull are left out. A hull of a single distinct point has one vertex.
+	"""
+
+	q = as_vector_array(points).data
+	candidates = numpy.arange(q.shape[0])
+
+	if q.shape[0] >= _PREFILTER_THRESHOLD:
+		# Akl-Toussaint heuristic: points strictly inside the polygon of the extreme points cannot be on the hull.
+		# the extreme points in directions of increasing angle form a convex polygon in hull orientation.
+		x, y = q[:, 0], q[:, 1]
+		extremes = [ numpy.argmin(x), numpy.argmin(x + y), numpy.argmin(y), numpy.argmax(x - y), numpy.argmax(x), numpy.argmax(x + y), numpy.argmax(y), numpy.argmax(y - x) ]
+
+		corners = []
+		for i in extremes:
+			c = Vector(*q[i].tolist())
+			if not corners or (c.x, c.y) != (corners[-1].x, corners[-1].y): corners.append(c)
+		if len(corners) > 1 and (corners[0].x, corners[0].y) == (corners[-1].x, corners[-1].y): corners.pop()
+
+		if len(corners) >= 3:
+			inside = numpy.ones(q.shape[0], dtype=bool)
+			for a, b in zip(corners, corners[1:] + corners[:1]):
+				inside &= point_orientations(q, a, b) > 0
+
+			candidates = numpy.flatnonzero(~inside)
+
+	c = q[candidates]
+	order = candidates[numpy.lexsort((c[:, 1], c[:, 0]))].tolist()
+	if len(order) == 0: return numpy.zeros(0, dtype=numpy.intp)
+
+	pts = dict((i, Vector(*q[i].tolist())) for i in order)
+
+	def chain(indices):
+		out = []
+		for i in indices:
+			while len(out) >= 2 and orientation_determinant(pts[out[-2]], pts[out[-1]], pts[i]) <= 0: out.pop()
+			out.append(i)
+		return out
+
+	lower = chain(order)
+	upper = chain(reversed(order))
+
+	return numpy.array(_join_chains(lower, upper, lambda i, j: pts[i].x == pts[j].x and pts[i].y == pts[j].y), dtype=numpy.intp)
+
+def convex_hull(points):
+	"""Get the convex hull of a point set, see L{convex_hull_indices}.
+
+	@type points: VectorArray
+	@param points: The points. Anything accepted by as_vector_array will do.
+
+	@return: An L{ArrayPolygon} of the hull if points is an array, otherwise a Polygon
+	"""
+	q = as_vector_array(points)
+	hull = convex_hull_indices(q)
+
+	if isinstance(points, (numpy.ndarray, VectorArray, ArrayPolygon)):
+		return ArrayPolygon(q.data[hull])
+
+	return Polygon.from_vector_array(VectorArray(q.data[hull]))
+
+def convex_hulls(point_sets):
+	"""Get the convex hulls of many small point sets in one call.
+
+	All sets are processed at once: they are padded to the same size, sorted with NumPy and the monotone chains are built for all
+	sets simultaneously, one point at a time. This is much faster than calling L{convex_hull} for thousands of small sets,
+	e.g. sprite or agent footprints. The hulls are the same as from L{convex_hull}.
+
+	@type point_sets: List
+	@param point_sets: A list of point sets, each of which may be anything accepted by as_vector_array, or an NxKx2 array of N sets of K points
+
+	@return: A list of L{ArrayPolygon}s, one per point set
+	"""
+
+	if isinstance(point_sets, numpy.ndarray) and point_sets.ndim == 3:
+		pts = numpy.array(point_sets, dtype=numpy.float64)
+		sizes = numpy.full(pts.shape[0], pts.shape[1], dtype=numpy.intp)
+	else:
+		sets = [ as_vector_array(s).data for s in point_sets ]
+		sizes = numpy.array([ s.shape[0] for s in sets ], dtype=numpy.intp)
+
+		# pad every set with its first point, duplicate points do not change the hull
+		pts = numpy.zeros((len(sets), max(sizes.max(), 1) if len(sets) else 1, 2))
+		for i, s in enumerate(sets):
+			if s.shape[0] == 0: continue
+			pts[i, :s.shape[0]] = s
+			pts[i, s.shape[0]:] = s[0]
+
+	if pts.shape[0] == 0: return []
+
+	order = numpy.lexsort((pts[:, :, 1], pts[:, :, 0]), axis=-1)
+	pts = numpy.take_along_axis(pts, order[:, :, numpy.newaxis], axis=1)
+
+	lower, lower_size = _batched_chain(pts)
+	upper, upper_size = _batched_chain(pts[:, ::-1])
+
+	# the hulls are the lower chains without their last point followed by the upper chains without their last point
+	lower_take = numpy.where(lower_size == 1, 1, lower_size - 1)
+	upper_take = numpy.where(lower_size == 1, 0, upper_size - 1)
+
+	# sets of a single distinct point give two identical chain points
+	if lower.shape[1] >= 2:
+		same = (lower_size == 2) & (upper_size == 2) & (lower[:, 0] == lower[:, 1]).all(axis=1)
+		lower_take[same], upper_take[same] = 1, 0
+
+	lower_take[sizes == 0], upper_take[sizes == 0] = 0, 0
+
+	k = pts.shape[1]
+	cols = numpy.arange(k)
+	keep = numpy.concatenate((cols < lower_take[:, numpy.newaxis], cols < upper_take[:, numpy.newaxis]), axis=1)
+
+	hulls = numpy.concatenate((lower, upper), axis=1)[keep]
+	ends = numpy.cumsum(lower_take + upper_take)
+
+	return [ ArrayPolygon(h) for h in numpy.split(hulls, ends[:-1]) ]
+
+def hull_diameter(points):
+	"""Get the diameter of a point set, i.e. its two points that are farthest apart.
+
+	The farthest pair is among the antipodal pairs of hull vertices, which the rotating calipers enumerate in O(h) for a hull of
+	h vertices after the O(n log n) hull construction.
+
+	Reference:
+	Michael Ian Shamos. Computational Geometry. PhD thesis, Yale University, 1978
+
+	@type points: VectorArray
+	@param points: The points. Anything accepted by as_vector_array will do.
+
+	@return: A tuple (distance, p, q) of the diameter and the two points, or None if there are no points
+	"""
+
+	h = _hull_points(points)
+	if not h: return None
+	if len(h) < 3: return (h[-1] - h[0]).length, h[0], h[-1]
+
+	best = (-1, None, None)
+	for i, top, right, left in _calipers(h):
+		for a in (h[i], h[(i + 1) % len(h)]):
+			for b in (h[top], h[(top + 1) % len(h)]):
+				d = (b - a).length_squared
+				if d > best[0]: best = (d, a, b)
+
+	return math.sqrt(best[0]), best[1], best[2]
+
+def hull_width(points):
+	"""Get the width of a point set, i.e. the smallest distance between two parallel lines enclosing it.
+
+	One of the lines always passes through a hull edge, so the rotating calipers find the width in O(h) after building the hull.
+
+	Reference:
+	Godfried T. Toussaint. Solving Geometric Problems with the Rotating Calipers. Proceedings of IEEE MELECON, 1983
+
+	@type points: VectorArray
+	@param points: The points. Anything accepted by as_vector_array will do.
+
+	@return: A tuple (width, a, b) of the width and the hull edge from a to b that one of the enclosing lines passes through,
+	or None if there are less than 3 distinct points that are not collinear
+	"""
+
+	h = _hull_points(points)
+	if len(h) < 3: return None
+
+	best = None
+	for i, top, right, left in _calipers(h):
+		a, b = h[i], h[(i + 1) % len(h)]
+		e = b - a
+		w = (e.x * (h[top].y - a.y) - e.y * (h[top].x - a.x)) / e.length
+
+		if best is None or w < best[0]: best = (w, a, b)
+
+	return best
+
+def minimum_area_rectangle(points):
+	"""Get the oriented bounding rectangle of a point set with the smallest area.
+
+	One side of the minimum area rectangle is collinear with a hull edge, so the rotating calipers test all h candidate rectangles
+	in O(h) after building the hull.
+
+	Reference:
+	Herbert Freeman, Ruth Shapira. Determining the minimum-area encasing rectangle for an arbitrary closed curve.
+	Communications of the ACM 18(7):409-413, 1975
+
+	@type points: VectorArray
+	@param points: The points. Anything accepted by as_vector_array will do.
+
+	@return: A Polygon of the four corners of the rectangle in the same orientation as L{Polygon.regular}, or None if there are
+	less than 3 distinct points that are not collinear
+	"""
+
+	h = _hull_points(points)
+	if len(h) < 3: return None
+
+	best = None
+	for i, top, right, left in _calipers(h):
+		a = h[i]
+		u = (h[(i + 1) % len(h)] - a).normalize()
+		v = Vector(-u.y, u.x)
+
+		u_min, u_max, v_max = (h[left] - a) * u, (h[right] - a) * u, (h[top] - a) * v
+		area = (u_max - u_min) * v_max
+
+		if best is None or area < best[0]: best = (area, a, u, v, u_min, u_max, v_max)
+
+	area, a, u, v, u_min, u_max, v_max = best
+	return Polygon.from_pointlist([a + u * u_min, a + u * u_max, a + u * u_max + v * v_max, a + u * u_min + v * v_max])
+
+def _hull_points(points):
+	"""Get the hull vertices of a point set as a list of Vectors"""
+	q = as_vector_array(points).data
+	return [ Vector(x, y) for x, y in q[convex_hull_indices(q)].tolist() ]
+
+def _calipers(h):
+	"""Generator function rotating calipers around the hull h.
+
+	For every edge i from h[i] to h[i+1], yield a tuple (i, top, right, left) of the indices of the vertex farthest from the edge
+	and of the vertices with the largest and smallest projection onto the edge direction. All pointers move forward around the hull,
+	so the whole rotation takes O(h).
+	"""
+
+	n = len(h)
+
+	def direction(i):
+		return h[(i + 1) % n] - h[i]
+
+	def height(i, k):
+		e = direction(i)
+		return e.x * (h[k].y - h[i].y) - e.y * (h[k].x - h[i].x)
+
+	def projection(i, k):
+		return direction(i) * h[k]
+
+	# start with a full scan for the first edge
+	top = max(range(n), key=lambda k: height(0, k))
+	right = max(range(n), key=lambda k: projection(0, k))
+	left = min(range(n), key=lambda k: projection(0, k))
+
+	for i in range(n):
+		# advance every pointer while the next vertex is better, stopping at the first vertex of a plateau
+		for steps in range(n):
+			if height(i, (top + 1) % n) > height(i, top): top = (top + 1) % n
+			else: break
+
+		for steps in range(n):
+			if projection(i, (right + 1) % n) > projection(i, right): right = (right + 1) % n
+			else: break
+
+		for steps in range(n):
+			if projection(i, (left + 1) % n) < projection(i, left): left = (left + 1) % n
+			else: break
+
+		yield i, top, right, left
+
+def _join_chains(lower, upper, same):
+	"""Join the lower and upper monotone chains to a hull, dropping the end points they share.
+
+	@param same: Function telling whether two entries of the chains are the same point
+	"""
+
+	if len(lower) == 1: return lower
+
+	hull = lower[:-1] + upper[:-1]
+
+	# all points are the same
+	if len(hull) == 2 and same(hull[0], hull[1]): return hull[:1]
+
+	return hull
+
+def _batched_chain(pts):
+	"""Build the monotone chains of the sorted point sets pts (NxKx2) simultaneously.
+
+	@return: A tuple (chains, sizes) of an NxKx2 array of chain points and the length of every chain
+	"""
+
+	n, k = pts.shape[0], pts.shape[1]
+	chains = numpy.empty((n, k, 2))
+	sizes = numpy.zeros(n, dtype=numpy.intp)
+	rows = numpy.arange(n)
+
+	for j in range(k):
+		p = pts[:, j]
+
+		# pop from all chains that do not turn left, until none needs to
+		active = numpy.flatnonzero(sizes >= 2)
+		while active.shape[0] > 0:
+			s = sizes[active]
+			turns = point_orientations(chains[active, s - 2], chains[active, s - 1], p[active])
+
+			active = active[turns <= 0]
+			sizes[active] -= 1
+			active = active[sizes[active] >= 2]
+
+		chains[rows, sizes] = p
+		sizes += 1
+
+	return chains, sizes
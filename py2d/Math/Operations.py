@@ -1,8 +1,19 @@
 # cython: language_level=3
 
+import sys
 import math
+import numpy
+from fractions import Fraction
 
 from py2d.Math.Vector import *
+from py2d.Math.VectorArray import *
+from py2d.Math.Segments import *
+
+# below this number of segment pairs, intersecting pairwise is faster than building the bounding box trees of intersect_segments
+_SWEEP_THRESHOLD = 256
+
+# below this number of segments, intersecting one by one is faster than the vectorized kernels
+_KERNEL_THRESHOLD = 32
 
 def __intersect_line_line_u(p1, p2, q1, q2):
 
@@ -127,7 +138,7 @@ def intersect_linesegs_ray(segs, p1, p2):
 	"""Intersect a list of line segments and a ray
 
 	@type segs: List
-	@param segs: The list of line segments, i.e. a list of 2-tuples of vectors
+	@param segs: The list of line segments, i.e. a list of 2-tuples of vectors or an Mx4 array
 
 	@type p1: Vector
 	@param p1: The first point on the ray
@@ -137,21 +148,27 @@ def intersect_linesegs_ray(segs, p1, p2):
 
 	@return: The list of intersections or an empty list
 	"""
-	intersect_points = []
+	if not isinstance(segs, numpy.ndarray): segs = list(segs)
+
+	if isinstance(segs, list) and len(segs) < _KERNEL_THRESHOLD:
+		intersect_points = []
+
+		for line_segment in segs:
+			intersect = intersect_lineseg_ray(line_segment[0], line_segment[1], p1, p2)
+			if intersect:
+				#if line_segment[0] != p2 and line_segment[1] != p2:
+				intersect_points += [intersect]
 
-	for line_segment in segs:
-		intersect = intersect_lineseg_ray(line_segment[0], line_segment[1], p1, p2)
-		if intersect:
-			#if line_segment[0] != p2 and line_segment[1] != p2:
-			intersect_points += [intersect]
+		return intersect_points
 
-	return intersect_points
+	indices, t, points = intersect_segments_ray(segs, p1, p2)
+	return points.as_vectors()
 
 def intersect_linesegs_lineseg(segs, p1, p2):
 	"""Intersect a list of line segments and a line segment
 
 	@type segs: List
-	@param segs: The list of line segments, i.e. a list of 2-tuples of vectors
+	@param segs: The list of line segments, i.e. a list of 2-tuples of vectors or an Mx4 array
 
 	@type p1: Vector
 	@param p1: The first point on the line segment
@@ -161,15 +178,27 @@ def intersect_linesegs_lineseg(segs, p1, p2):
 
 	@return: The list of intersections or an empty list
 	"""
-	intersect_points = []
+	if not isinstance(segs, numpy.ndarray): segs = list(segs)
 
-	for line_segment in segs:
-		intersect = intersect_lineseg_lineseg(line_segment[0], line_segment[1], p1, p2)
-		if intersect:
-			if line_segment[0] != p2 and line_segment[1] != p2:
-				intersect_points += [intersect]
+	if isinstance(segs, list) and len(segs) < _KERNEL_THRESHOLD:
+		intersect_points = []
+
+		for line_segment in segs:
+			intersect = intersect_lineseg_lineseg(line_segment[0], line_segment[1], p1, p2)
+			if intersect:
+				if line_segment[0] != p2 and line_segment[1] != p2:
+					intersect_points += [intersect]
+
+		return intersect_points
+
+	s = as_segment_array(segs)
+	indices, t, points = intersect_segments_lineseg(s, p1, p2)
+
+	# skip segments that start or end at p2
+	ends = s[indices]
+	keep = ~(numpy.all(numpy.abs(ends[:, :2] - (p2.x, p2.y)) < EPSILON, axis=1) | numpy.all(numpy.abs(ends[:, 2:] - (p2.x, p2.y)) < EPSILON, axis=1))
 
-	return intersect_points
+	return VectorArray(points.data[keep]).as_vectors()
 
 def intersect_poly_poly(poly_points1, poly_points2):
 	"""Intersect two polygons
@@ -188,19 +217,35 @@ def intersect_poly_poly(poly_points1, poly_points2):
 def intersect_linesegs_linesegs(segs1, segs2):
 	"""Intersect two lists of line segments
 
+	Larger inputs are handled by the bounding box trees in L{intersect_segments}. Use that function directly to also get the indices of the intersecting segments.
+
 	@type segs1: List
-	@param segs1: The first list of line segments, i.e. a list of 2-tuples of vectors
+	@param segs1: The first list of line segments, i.e. a list of 2-tuples of vectors or an Mx4 array
 
 	@type segs2: List
-	@param segs2: The second list of line segments, i.e. a list of 2-tuples of vectors
+	@param segs2: The second list of line segments, i.e. a list of 2-tuples of vectors or an Mx4 array
 
 	@return: The list of intersections or an empty list
 	"""
-	intersect_points = []
-	for ls1 in segs1:
-		intersect_points += intersect_linesegs_lineseg(segs2, ls1[0], ls1[1])
+	if not isinstance(segs1, numpy.ndarray): segs1 = list(segs1)
+	if not isinstance(segs2, numpy.ndarray): segs2 = list(segs2)
+
+	if isinstance(segs1, list) and isinstance(segs2, list) and len(segs1) * len(segs2) < _SWEEP_THRESHOLD:
+		intersect_points = []
+		for ls1 in segs1:
+			intersect_points += intersect_linesegs_lineseg(segs2, ls1[0], ls1[1])
+
+		return intersect_points
+
+	a, b = as_segment_array(segs1), as_segment_array(segs2)
+	pairs, points = intersect_segments(a, b)
+	i, j = pairs[:, 0], pairs[:, 1]
+
+	# skip segments of segs2 that start or end at the end point of the segment of segs1
+	end_a = a[i, 2:]
+	keep = ~(numpy.all(numpy.abs(b[j, :2] - end_a) < EPSILON, axis=1) | numpy.all(numpy.abs(b[j, 2:] - end_a) < EPSILON, axis=1))
 
-	return intersect_points
+	return VectorArray(points.data[keep]).as_vectors()
 
 def intersect_lineseg_lineseg(p1, p2, q1, q2):
 	"""Intersect two line segments
@@ -278,26 +323,19 @@ def distance_point_lineseg_squared(p, a, b):
 	"""
 
 
-	ap = p - a
-	ab = b - a
-	bp = p - b
+	# plain float arithmetic, this is called in many inner loops. use distance_points_segments_squared for batches.
+	apx, apy = p.x - a.x, p.y - a.y
+	abx, aby = b.x - a.x, b.y - a.y
 
-	r = float(ap * ab) / ab.length_squared
+	l2 = abx * abx + aby * aby
+	r = float(apx * abx + apy * aby) / l2
 
-	if r <= 0: return ap.length_squared
-	if r >= 1: return bp.length_squared
+	if r <= 0: return apx * apx + apy * apy
+	if r >= 1: return (p.x - b.x) * (p.x - b.x) + (p.y - b.y) * (p.y - b.y)
 
-	s = ((a.y - p.y) * (b.x - a.x) - (a.x - p.x) * (b.y - a.y))
+	s = (a.y - p.y) * abx - (a.x - p.x) * aby
 
-	return float(s * s) / ab.length_squared
-
-	# ap_squared = (p - a).get_length_squared()
-	# bp_squared = (p - b).get_length_squared()
-	# ap_prime = a * b
-
-	# perpendicular_squared = abs( ap_squared - ap_prime * ap_prime )
-
-	# return min(ap_squared, bp_squared, perpendicular_squared)
+	return float(s * s) / l2
 
 
 def distance_point_line(p, a, b):
@@ -311,6 +349,105 @@ def point_orientation(a,b,c):
 	"""Returns the orientation of the triangle a, b, c.
 
 	Return True if a,b,c are oriented clock-wise.
+
+	The result is exact even for nearly collinear points, see L{orientation_determinant}.
 	"""
-	return (b.x - a.x) * (c.y - a.y) - (c.x - a.x) * (b.y - a.y) > 0
+
+	# this is orientation_determinant(a, b, c) > 0, inlined since it is called very often
+	cx, cy = c.x, c.y
+	detleft = (a.x - cx) * (b.y - cy)
+	detright = (a.y - cy) * (b.x - cx)
+
+	if detleft > 0:
+		if detright <= 0: return True
+		detsum = detleft + detright
+	elif detleft < 0:
+		if detright >= 0: return False
+		detsum = -detleft - detright
+	else:
+		return detright < 0
+
+	det = detleft - detright
+	errbound = _CCW_ERRBOUND * detsum
+	if det > errbound: return True
+	if -det > errbound: return False
+
+	return _orientation_exact(a.x, a.y, b.x, b.y, cx, cy) > 0
+
+def orientation_determinant(a, b, c):
+	"""Get the orientation determinant of the triangle a, b, c.
+
+	The determinant is positive if L{point_orientation} is True, negative if the orientation is reversed and zero if the points are collinear.
+	Its sign is always exact: the determinant is computed in floating point arithmetic first, and only if the result is within the
+	rounding error bound is it recomputed exactly.
+
+	Reference:
+	Jonathan Richard Shewchuk. Adaptive Precision Floating-Point Arithmetic and Fast Robust Geometric Predicates.
+	Discrete & Computational Geometry 18(3):305-363, 1997
+	"""
+
+	cx, cy = c.x, c.y
+	detleft = (a.x - cx) * (b.y - cy)
+	detright = (a.y - cy) * (b.x - cx)
+	det = detleft - detright
+
+	# if the two terms have different signs, the sign of the difference is certain
+	if detleft > 0:
+		if detright <= 0: return det
+		detsum = detleft + detright
+	elif detleft < 0:
+		if detright >= 0: return det
+		detsum = -detleft - detright
+	else:
+		return det
+
+	errbound = _CCW_ERRBOUND * detsum
+	if det > errbound or -det > errbound: return det
+
+	return float(_orientation_exact(a.x, a.y, b.x, b.y, cx, cy))
+
+def point_orientations(a, b, c):
+	"""Get the orientations of many triangles at once.
+
+	@type a: VectorArray
+	@param a: The first points of the triangles. Anything accepted by as_vector_array will do.
+
+	@type b: VectorArray
+	@param b: The second points of the triangles. Either an array of the same length as a or a single Vector.
+
+	@type c: VectorArray
+	@param c: The third points of the triangles. Either an array of the same length as a or a single Vector.
+
+	@return: An int8 NumPy array that is 1 where L{point_orientation} would be True, -1 for the reverse orientation and 0 for collinear points.
+	"""
+
+	a, b, c = (_point_operand(v) for v in (a, b, c))
+	a, b, c = numpy.broadcast_arrays(a, b, c)
+
+	detleft = (a[:, 0] - c[:, 0]) * (b[:, 1] - c[:, 1])
+	detright = (a[:, 1] - c[:, 1]) * (b[:, 0] - c[:, 0])
+	det = detleft - detright
+
+	out = numpy.sign(det).astype(numpy.int8)
+
+	# only re-compute the triangles for which the floating point result is uncertain
+	uncertain = numpy.flatnonzero(numpy.abs(det) <= _CCW_ERRBOUND * (numpy.abs(detleft) + numpy.abs(detright)))
+	for i in uncertain.tolist():
+		e = _orientation_exact(a[i, 0], a[i, 1], b[i, 0], b[i, 1], c[i, 0], c[i, 1])
+		out[i] = (e > 0) - (e < 0)
+
+	return out
+
+def _orientation_exact(ax, ay, bx, by, cx, cy):
+	"""Compute the orientation determinant exactly using rational arithmetic. Floats are dyadic rationals, so this is exact."""
+	ax, ay, bx, by, cx, cy = (Fraction(float(v)) for v in (ax, ay, bx, by, cx, cy))
+	return (ax - cx) * (by - cy) - (ay - cy) * (bx - cx)
+
+def _point_operand(v):
+	"""Get an Nx2 or 1x2 array for a batched point argument"""
+	if isinstance(v, Vector): return numpy.array([[v.x, v.y]])
+	return as_vector_array(v).data
+
+# error bound for the floating point orientation determinant, relative to the magnitude of its terms
+_CCW_ERRBOUND = (3.0 + 16.0 * sys.float_info.epsilon / 2) * sys.float_info.epsilon / 2
 
@@ -2,10 +2,21 @@
 
 import math
 import itertools
+import functools
+import numpy
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 
 from py2d.Math.Vector import *
+from py2d.Math.VectorArray import *
 from py2d.Math.Operations import *
+from py2d.Math.Segments import _candidate_pairs
+from py2d.Math.Triangulation import triangulate as _triangulate, triangulation_points as _triangulation_points, convex_partition as _convex_partition
+from py2d.Math.PreparedPolygon import PreparedPolygon
+from py2d.Math.Boolean import polygon_boolean as _polygon_boolean, polygon_union_all as _polygon_union_all, _boolean_sweep
+
+# maximum number of point-edge pairs to process at once in batched functions
+_BATCH_PAIRS = 1 << 18
 
 def tip_decorator_pointy(a,b,c,d,is_cw):
 	intersection = intersect_line_line(a,b,c,d)
@@ -14,17 +25,196 @@ def tip_decorator_pointy(a,b,c,d,is_cw):
 def tip_decorator_flat(a,b,c,d,is_cw):
 	return []
 
+def tip_decorator_round(tolerance=0.1):
+	"""Get a tip decorator for round tips.
+
+	@type tolerance: float
+	@param tolerance: The maximum distance between the arc of a tip and the segments approximating it
+	"""
+
+	if tolerance <= 0: raise ValueError("Tolerance must be positive!")
+
+	return functools.partial(_tip_round, tolerance)
+
+def tip_decorator_miter(limit=2.0):
+	"""Get a tip decorator for pointy tips that are cut off flat where they reach further than limit times the offset amount from the corner.
+
+	@type limit: float
+	@param limit: The maximum length of a tip relative to the offset amount, at least 1
+	"""
+
+	if limit < 1: raise ValueError("Miter limit must be at least 1!")
+
+	return functools.partial(_tip_miter, limit)
+
+def _tip_round(tolerance, a, b, c, d, is_cw):
+	"""Approximate the arc around the corner of a tip by chords, see L{tip_decorator_round}"""
+	center = _tip_center(a, b, c, d)
+	if center is None: return []
+
+	u, v = b - center, c - center
+	r = u.length
+	if r <= tolerance: return []
+
+	angle = math.atan2(u.x * v.y - u.y * v.x, u * v)
+	n = int(math.ceil(abs(angle) / (2 * math.acos(1 - tolerance / r))))
+
+	out = []
+	for i in range(1, n):
+		cos_t, sin_t = math.cos(angle * i / n), math.sin(angle * i / n)
+		out.append(center + Vector(u.x * cos_t - u.y * sin_t, u.x * sin_t + u.y * cos_t))
+	return out
+
+def _tip_miter(limit, a, b, c, d, is_cw):
+	"""Get a pointy tip that is cut off at limit times the offset amount, see L{tip_decorator_miter}"""
+	tip = intersect_line_line(a, b, c, d)
+	center = _tip_center(a, b, c, d)
+	if tip is None or center is None: return []
+
+	reach = (b - center).length * limit
+	if (tip - center).length <= reach: return [tip]
+
+	# cut the tip perpendicular to its direction
+	direction = (tip - center).normalize()
+	q = center + direction * reach
+	p1, p2 = intersect_line_line(b, tip, q, q + direction.normal()), intersect_line_line(c, tip, q, q + direction.normal())
+	if p1 is None or p2 is None: return []
+	return [p1, p2]
+
+def _tip_center(a, b, c, d):
+	"""Get the corner that the tip between the moved edges a-b and c-d belongs to"""
+	return intersect_line_line(b, b + (b - a).normal(), c, c + (d - c).normal())
+
+def _offset_corners(polys):
+	"""Get the corners of the polygons to offset, which do not depend on the offset amount.
+
+	@return: A list of tuples (is_hole, corners) per polygon, where corners is a list of tuples (c, n, n2, unit_normal, unit_normal2, is_convex)
+	for the corners at n between the edges c-n and n-n2
+	"""
+	corners = []
+	for poly in polys:
+		pts = [ p for i, p in enumerate(poly.points) if not p == poly.points[i - 1] ]
+		if len(pts) < 3: continue
+
+		normals = [ (pts[ (i+1) % len(pts) ] - pts[i]).normal().normalize() for i in range(len(pts)) ]
+
+		poly_corners = []
+		for i in range(len(pts)):
+			c, n, n2 = pts[i], pts[ (i+1) % len(pts) ], pts[ (i+2) % len(pts) ]
+			poly_corners.append((c, n, n2, normals[i], normals[ (i+1) % len(pts) ], point_orientation(c,n,n2)))
+		corners.append((poly.is_clockwise(), poly_corners))
+
+	return corners
+
+def _offset_curve(corners, amount, tip_decorator):
+	"""Get the raw offset curve of a polygon from its corners, see L{_offset_corners}"""
+	r = []
+	for c, n, n2, unit_normal, unit_normal2, is_convex in corners:
+		c_prime = c + unit_normal * amount
+		n_prime = n + unit_normal * amount
+		n2_prime = n2 + unit_normal2 * amount
+		n_prime2 = n + unit_normal2 * amount
+
+		r.append(c_prime)
+		r.append(n_prime)
+
+		if is_convex == (amount > 0):
+			r.append(n)
+		else:
+			r.extend( p for p in tip_decorator(c_prime, n_prime, n_prime2, n2_prime, True) if p is not None )
+
+	return r
+
+def _offset_islands(corners, amount, tip_decorator, debug_callback=None):
+	"""Offset polygons given by their corners, see L{Polygon.offset}
+
+	@return: A list of tuples (outline, holes) of point lists
+	"""
+	islands = [ _offset_curve(poly_corners, amount, tip_decorator) for is_hole, poly_corners in corners if not is_hole ]
+	holes = [ _offset_curve(poly_corners, amount, tip_decorator) for is_hole, poly_corners in corners if is_hole ]
+
+	if debug_callback:
+		for p in itertools.chain(*(islands + holes)): debug_callback(p, 0xffff00, "")
+
+	# the loops through the corners of growing holes have a positive winding number, but are only part of the result where
+	# they are inside of an island. keep the regions inside of the islands where the total winding number is positive.
+	resolved = _boolean_sweep(islands, holes, 'd', lambda w: w[0] > 0 and w[0] + w[1] > 0)
+
+	# drop the points of the raw curves that ended up on straight edges
+	islands = []
+	for outline, holes in resolved:
+		holes = [ h for h in ( Polygon.simplify_sequence(h) for h in holes ) if len(h) >= 3 ]
+		outline = Polygon.simplify_sequence(outline)
+		if len(outline) >= 3: islands.append((outline, holes))
+
+	return islands
+
+def _check_intersect_edges(a, b, c, d):
+	"""Exactly check if the line segments a-b and c-d cross, touch or overlap"""
+
+	o1 = orientation_determinant(a, b, c)
+	o2 = orientation_determinant(a, b, d)
+	o3 = orientation_determinant(c, d, a)
+	o4 = orientation_determinant(c, d, b)
+
+	# a proper crossing
+	if ((o1 > 0 and o2 < 0) or (o1 < 0 and o2 > 0)) and ((o3 > 0 and o4 < 0) or (o3 < 0 and o4 > 0)): return True
+
+	# an end point on the other segment
+	if o1 == 0 and _in_box(a, b, c): return True
+	if o2 == 0 and _in_box(a, b, d): return True
+	if o3 == 0 and _in_box(c, d, a): return True
+	if o4 == 0 and _in_box(c, d, b): return True
+
+	return False
+
+def _from_islands(islands):
+	"""Get a flat list of Polygons from a list of tuples (outline, holes)"""
+	output = []
+	for outline, holes in islands:
+		output.append(Polygon.from_pointlist(outline))
+		output.extend( Polygon.from_pointlist(h) for h in holes )
+	return output
+
+def _rings(operand):
+	"""Get the rings of an operand of a boolean operation, which is a Polygon, a MultiPolygon or a list of Polygons"""
+	if isinstance(operand, MultiPolygon): return operand.get_polygons()
+	if isinstance(operand, (list, tuple)): return operand
+	return [operand]
+
+def _in_box(a, b, p):
+	"""Check if p is in the bounding box of a and b"""
+	return min(a.x, b.x) <= p.x <= max(a.x, b.x) and min(a.y, b.y) <= p.y <= max(a.y, b.y)
+
 
 class Polygon(object):
 	"""Class for 2D Polygons.
 
 	A Polgon behaves like a list of points, but the last point in the list is assumed to be connected back to the first point.
+
+	Derived geometry (bounding box, area, centroid, orientation and convexity) is computed on first access and cached until the
+	polygon is modified through its methods. If you modify the points list or its vectors directly, call L{invalidate} afterwards.
 	"""
 
 	def __init__(self):
 		"""Create a new, empty Polygon object"""
+		self._cache = {}
 		self.points = []
 
+	def get_points(self):
+		return self._points
+
+	def set_points(self, points):
+		self._points = points
+		self._cache.clear()
+
+	def invalidate(self):
+		"""Discard all cached geometry of the polygon.
+
+		This is called automatically by all modifying methods of the polygon.
+		"""
+		self._cache.clear()
+
 	@staticmethod
 	def regular(center, radius, points):
 		"""Create a regular polygon
@@ -71,6 +261,18 @@ class Polygon(object):
 		p.points = [ Vector(t[0], t[1]) for t in tuples ]
 		return p
 
+	@staticmethod
+	def from_vector_array(points):
+		"""Create a polygon from a VectorArray
+
+		@type points: VectorArray
+		@param points: VectorArray of the polygon points
+		"""
+
+		p = Polygon()
+		p.points = points.as_vectors()
+		return p
+
 	def add_point(self, point):
 		"""Add a new point at the end of the polygon
 
@@ -78,6 +280,7 @@ class Polygon(object):
 		@param point: The new Vector to add to the polygon
 		"""
 		self.points.append(point)
+		self._cache.clear()
 
 	def add_points(self, points):
 		"""Add multiple new points to the end of the polygon
@@ -86,6 +289,7 @@ class Polygon(object):
 		@param points: A list of Vectors to add
 		"""
 		self.points.extend(points)
+		self._cache.clear()
 
 	def get_centerpoint(self):
 		"""Get the center of mass for the polygon"""
@@ -105,6 +309,7 @@ class Polygon(object):
 
 
 		self.points.sort(key=lambda p: angle_from_origin(p - center))
+		self._cache.clear()
 
 	def __repr__(self):
 		pts = ["(%.2f, %.2f)" % (p.x, p.y) for p in self.points]
@@ -115,9 +320,11 @@ class Polygon(object):
 
 	def __setitem__(self, key, value):
 		self.points[key] = value
+		self._cache.clear()
 
 	def __delitem__(self, key):
 		del self.points[key]
+		self._cache.clear()
 
 	def __len__(self):
 		return len(self.points)
@@ -130,6 +337,7 @@ class Polygon(object):
 		"""Return a shallow copy of the polygon (points are not cloned)"""
 		poly = Polygon()
 		poly.points = [ p for p in self.points ]
+		poly._cache.update(self._cache)
 		return poly
 
 	def clone_ccw(self):
@@ -143,15 +351,22 @@ class Polygon(object):
 		return p
 
 	@staticmethod
-	def boolean_operation(polygon_a, polygon_b, operation):
+	def boolean_operation(polygon_a, polygon_b, operation, backend="margalit"):
 		"""Perform a boolean operation on two polygons.
 
+		There are two backends:
+
+			- "margalit" handles a single island-type polygon per operand, so control tables are replaced by small boolean expressions.
+			- "sweep" splits all edges in a single plane sweep, see L{py2d.Math.Boolean.polygon_boolean}. Each operand may also be a
+			  list of polygons, where polygons inside of others are holes. It runs in O((n + k) log n) for n edges with k intersections
+			  and handles shared edges and vertices.
+
+		If one of the operands is a L{MultiPolygon}, the "sweep" backend is used and the result is a MultiPolygon as well.
+
 		Reference:
 		Avraham Margalit. An Algorithm for Computing the Union, Intersection or Difference of Two Polygons.
 		Comput & Graphics VoI. 13, No 2, pp 167-183, 1989
 
-		This implementation will only consider island-type polygons, so control tables are replaced by small boolean expressions.
-
 		@type polygon_a: Polygon
 		@param polygon_a: The first polygon
 
@@ -159,9 +374,22 @@ class Polygon(object):
 		@param polygon_b: The second polygon
 
 		@type operation: char
-		@param operation: The operation to perform. Either 'u' for union, 'i' for intersection, or 'd' for difference.
+		@param operation: The operation to perform. Either 'u' for union, 'i' for intersection, or 'd' for difference. The "sweep" backend also supports 'x' for exclusive or.
+
+		@type backend: str
+		@param backend: Either "margalit" or "sweep"
+
+		@return: A list of fragment polygons. The "sweep" backend lists every counter-clockwise island followed by its clockwise holes.
 		"""
 
+		if backend not in ("margalit", "sweep"): raise ValueError("Unknown boolean operation backend: %s" % backend)
+
+		if isinstance(polygon_a, MultiPolygon) or isinstance(polygon_b, MultiPolygon):
+			return MultiPolygon.from_islands(_polygon_boolean(_rings(polygon_a), _rings(polygon_b), operation))
+
+		if backend == "sweep":
+			return _from_islands(_polygon_boolean(_rings(polygon_a), _rings(polygon_b), operation))
+
 		def inorder_extend(v, v1, v2, ints):
 			"""Extend a sequence v by points ints that are on the segment v1, v2"""
 
@@ -202,14 +430,15 @@ class Polygon(object):
 
 
 		# find all intersections
+		edges_a = list(zip(polygon_a.points, polygon_a.points[1:])) + [(polygon_a.points[-1], polygon_a.points[0])]
+		edges_b = list(zip(polygon_b.points, polygon_b.points[1:])) + [(polygon_b.points[-1], polygon_b.points[0])]
+
 		intersections_a = defaultdict(list)
 		intersections_b = defaultdict(list)
-		for a1, a2 in list(zip(v_a, v_a[1:])) + [(v_a[-1], v_a[0])]:
-			for b1, b2 in list(zip(v_b, v_b[1:])) + [(v_b[-1], v_b[0])]:
-				i = intersect_lineseg_lineseg(a1[0],a2[0],b1[0],b2[0])
-				if i:
-					intersections_a[(a1[0],a2[0])].append(i)
-					intersections_b[(b1[0],b2[0])].append(i)
+		pairs, points = intersect_segments(edges_a, edges_b)
+		for (i, j), p in zip(pairs.tolist(), points.as_vectors()):
+			intersections_a[edges_a[i]].append(p)
+			intersections_b[edges_b[j]].append(p)
 
 
 		# extend vector rings by intersections
@@ -292,7 +521,7 @@ class Polygon(object):
 
 
 	@staticmethod
-	def union(polygon_a, polygon_b):
+	def union(polygon_a, polygon_b, backend="margalit"):
 		"""Get the union of polygon_a and polygon_b
 
 		@type polygon_a: Polygon
@@ -301,12 +530,15 @@ class Polygon(object):
 		@type polygon_b: Polygon
 		@param polygon_b: The second polygon
 
+		@type backend: str
+		@param backend: The boolean operation backend, see L{boolean_operation}
+
 		@return: A list of fragment polygons
 		"""
-		return Polygon.boolean_operation(polygon_a, polygon_b, 'u')
+		return Polygon.boolean_operation(polygon_a, polygon_b, 'u', backend)
 
 	@staticmethod
-	def intersect(polygon_a, polygon_b):
+	def intersect(polygon_a, polygon_b, backend="margalit"):
 		"""Intersect the area of polygon_a and polygon_b
 
 		@type polygon_a: Polygon
@@ -315,12 +547,15 @@ class Polygon(object):
 		@type polygon_b: Polygon
 		@param polygon_b: The second polygon
 
+		@type backend: str
+		@param backend: The boolean operation backend, see L{boolean_operation}
+
 		@return: A list of fragment polygons
 		"""
-		return Polygon.boolean_operation(polygon_a, polygon_b, 'i')
+		return Polygon.boolean_operation(polygon_a, polygon_b, 'i', backend)
 
 	@staticmethod
-	def subtract(polygon_a, polygon_b):
+	def subtract(polygon_a, polygon_b, backend="margalit"):
 		"""Subtract the area of polygon_b from polygon_a
 
 		@type polygon_a: Polygon
@@ -329,244 +564,207 @@ class Polygon(object):
 		@type polygon_b: Polygon
 		@param polygon_b: The second polygon
 
+		@type backend: str
+		@param backend: The boolean operation backend, see L{boolean_operation}
+
 		@return: A list of fragment polygons
 		"""
-		return Polygon.boolean_operation(polygon_a, polygon_b, 'd')
-
+		return Polygon.boolean_operation(polygon_a, polygon_b, 'd', backend)
 
 	@staticmethod
-	def offset(polys, amount, tip_decorator=tip_decorator_pointy, debug_callback=None):
-		"""Shrink or grow a polygon by a given amount.
+	def union_all(polys, processes=None):
+		"""Get the union of many polygons at once.
 
-		Reference:
-		Xiaorui Chen and Sara McMains. Polygon Offsetting by Computing Winding Numbers
-		Proceedings of IDETC/CIE 2005. ASME 2005 International Design Engineering Technical Conferences &
-		Computers and Information in Engineering Conference
+		This is much faster than calling L{union} in a loop, see L{py2d.Math.Boolean.polygon_union_all}.
 
 		@type polys: List
-		@param polys: The list of polygons to offset. Counter-clockwise polygons will be treated as islands, clockwise polygons as holes.
+		@param polys: The polygons to merge. Each item may also be a L{MultiPolygon} or a list of polygons, where polygons inside of others are holes.
 
-		@type amount: float
-		@param amount: The amount to offset. Positive values will grow the polygon, negative values will shrink.
+		@type processes: int
+		@param processes: If given, run the independent sweeps of the merge in a pool of this many worker processes
 
-		@type tip_decorator: function
-		@param tip_decorator: A function used for decorating tips generated in the offset polygon
+		@return: A list of fragment polygons, listing every counter-clockwise island followed by its clockwise holes. If one of the polys is a MultiPolygon, a MultiPolygon is returned instead.
 		"""
+		islands = _polygon_union_all([ _rings(p) for p in polys ], processes)
 
-		# fix passing a single polygon instead of a poly list
-		if isinstance(polys, Polygon): polys = [polys]
-
-		if amount == 0: return polys
-
-		def offset_poly(poly):
-			r = []
-			for i in range(len(poly.points)):
-				c, n, n2 = poly.points[i], poly.points[ (i+1) % len(poly) ], poly.points[ (i+2) % len(poly) ]
-				is_convex = point_orientation(c,n,n2)
-
-				unit_normal = (n - c).normal().normalize()
-				unit_normal2 = (n2 - n).normal().normalize()
-
-				c_prime = c + unit_normal * amount
-				n_prime = n + unit_normal * amount
-				n2_prime = n2 + unit_normal2 * amount
-				n_prime2 = n + unit_normal2 * amount
-
-				r.append(c_prime)
-				r.append(n_prime)
-
-				if is_convex == (amount > 0):
-					r.append(n)
-				else:
-					r.extend(tip_decorator(c_prime, n_prime, n_prime2, n2_prime, True))
+		if any(isinstance(p, MultiPolygon) for p in polys): return MultiPolygon.from_islands(islands)
+		return _from_islands(islands)
 
+	@staticmethod
+	def xor(polygon_a, polygon_b):
+		"""Get the area covered by exactly one of polygon_a and polygon_b
 
-			return r
-
-
-		def decompose(poly_points):
-			"""Decompose a possibly self-intersecting polygon into multiple simple polygons."""
-
-			def inorder_extend(v, v1, v2, ints):
-				"""Extend a sequence v by points ints that are on the segment v1, v2"""
-
-				k, r = None, False
-				if v1.x < v2.x:
-					k = lambda i: i.x
-					r = True
-				elif v1.x > v2.x:
-					k = lambda i: i.x
-					r = False
-				elif v1.y < v2.y:
-					k = lambda i: i.y
-					r = True
-				else:
-					k = lambda i: i.y
-					r = False
-
-				l = sorted(ints, key=k, reverse=r)
-				i = next((i for i, p in enumerate(v) if p == v2), -1)
-				assert(i>=0)
-
-				for e in l:
-					v.insert(i, e)
+		@type polygon_a: Polygon
+		@param polygon_a: The first polygon
 
-			pts = [p for p in poly_points]
+		@type polygon_b: Polygon
+		@param polygon_b: The second polygon
 
-			# find self-intersections
-			ints = defaultdict(list)
-			for i in range(len(pts)):
-				for j in range(i+1, len(pts)):
-					a = pts[i]
-					b = pts[(i+1)%len(pts)]
-					c = pts[j]
-					d = pts[(j+1)%len(pts)]
+		@return: A list of fragment polygons, see L{boolean_operation}
+		"""
+		return Polygon.boolean_operation(polygon_a, polygon_b, 'x', "sweep")
 
-					x = intersect_lineseg_lineseg(a, b, c, d)
-					if x and x not in (a,b,c,d):
-						ints[(a,b)].append( x )
-						ints[(c,d)].append( x )
 
+	@staticmethod
+	def offset(polys, amount, tip_decorator=tip_decorator_pointy, debug_callback=None):
+		"""Shrink or grow a polygon by a given amount.
 
-			# add self-intersection points to poly
-			for k, v in ints.items():
-				inorder_extend(pts, k[0], k[1], v)
+		Every polygon is replaced by its raw offset curve, which joins the edges moved along their normals by tips at the
+		corners that open up, and by loops through the original vertex at the other corners. All raw curves are resolved in
+		a single sweep that splits them at their intersections and keeps the regions of positive winding number inside of the
+		islands, see L{py2d.Math.Boolean.polygon_boolean}. Holes without an island around them are ignored. This takes
+		O((n + k) log n) for n vertices with k intersections.
 
-			# build a list of loops
-			out = []
-			while pts:
+		Reference:
+		Xiaorui Chen and Sara McMains. Polygon Offsetting by Computing Winding Numbers
+		Proceedings of IDETC/CIE 2005. ASME 2005 International Design Engineering Technical Conferences &
+		Computers and Information in Engineering Conference
 
-				# build up a list of seen points until we re-visit one - a loop!
-				seen = []
-				for p in pts + [pts[0]]:
-					if p not in seen:
-						seen.append(p)
-					else:
-						break
+		@type polys: List
+		@param polys: The list of polygons to offset. Counter-clockwise polygons will be treated as islands, clockwise polygons as holes.
+		For a L{MultiPolygon}, the result is a MultiPolygon as well.
 
-				loop = seen[seen.index(p):]
+		@type amount: float
+		@param amount: The amount to offset. Positive values will grow the polygon, negative values will shrink.
 
-				# remove the loop from pts
-				for p in loop:
-					pts.remove(p)
+		@type tip_decorator: function
+		@param tip_decorator: A function used for decorating tips generated in the offset polygon, such as L{tip_decorator_pointy},
+		L{tip_decorator_flat} or the functions returned by L{tip_decorator_round} and L{tip_decorator_miter}
 
-				out.append(loop)
+		@type debug_callback: function
+		@param debug_callback: Optional function f(p, color, text) that is called with the points of the raw offset curves
 
-			return out
+		@return: A list of polygons, listing every counter-clockwise island followed by its clockwise holes
+		"""
 
+		multi = isinstance(polys, MultiPolygon)
+		if multi: polys = polys.get_polygons()
 
-		def winding_number(p, raw):
+		# fix passing a single polygon instead of a poly list
+		if isinstance(polys, Polygon): polys = [polys]
 
-			# compute winding number of point
-			#http://softsurfer.com/Archive/algorithm_0103/algorithm_0103.htm
+		if amount == 0: return MultiPolygon.from_polygons(polys) if multi else polys
 
-			wn = 0
-			for pp in raw:
-				for a,b in list(zip(pp, pp[1:])) + [(pp[-1], pp[0])]:
-					if a.y < p.y and b.y > p.y:
-						i = intersect_lineseg_ray(a,b,p,p+VECTOR_X)
-						if i and i.x > p.x:
-							wn -= 1
+		islands = _offset_islands(_offset_corners(polys), amount, tip_decorator, debug_callback)
 
-					if a.y > p.y and b.y < p.y:
-						i = intersect_lineseg_ray(a,b,p,p+VECTOR_X)
-						if i and i.x > p.x:
-							wn += 1
-			return wn
+		return MultiPolygon.from_islands(islands) if multi else _from_islands(islands)
 
+	@staticmethod
+	def offset_many(polys, amounts, tip_decorator=tip_decorator_pointy, processes=None):
+		"""Shrink or grow polygons by several amounts at once, e.g. to inflate walls for agents of different sizes.
 
-		def find_point_in_poly(pts):
-			# find point inside of pts according to http://www.exaflop.org/docs/cgafaq/cga2.html#Subject%202.06:%20How%20do%20I%20find%20a%20single%20point%20inside%20a%20simple%20polygonu
+		This gives the same results as calling L{offset} for every amount, but the cleaned up points, edge normals and corner
+		orientations are only computed once for all amounts.
 
-			if len(pts) == 3: return (pts[0] + pts[1] + pts[2]) / 3
+		@type polys: List
+		@param polys: The list of polygons to offset, see L{offset}
 
+		@type amounts: List
+		@param amounts: The amounts to offset by. Positive values will grow the polygon, negative values will shrink.
 
-			# find convex point v
-			v = None
-			for i in range(len(pts)):
-				a, v, b = pts[i-1], pts[i], pts[(i+1) % len(pts)]
-				if not point_orientation(a,v,b): break
+		@type tip_decorator: function
+		@param tip_decorator: A function used for decorating tips, see L{offset}. It has to be picklable if processes is given,
+		which is the case for L{tip_decorator_pointy}, L{tip_decorator_flat} and the functions returned by L{tip_decorator_round} and L{tip_decorator_miter}
 
+		@type processes: int
+		@param processes: If given, offset by the different amounts in a pool of this many worker processes
 
-			q_s = [ q for q in pts if q not in [a,v,b] and point_in_triangle(q, a,v,b) ]
+		@return: A list with the result of L{offset} for every amount
+		"""
 
-			if len(pts) >= 5:
-				dbg(v, 0x000000, "V")
-				dbg(a, 0x000000, "A")
-				dbg(b, 0x000000, "B")
+		multi = isinstance(polys, MultiPolygon)
+		if multi: polys = polys.get_polygons()
 
-				for q in q_s:
-					dbg(q, 0x000000, "Q")
+		# fix passing a single polygon instead of a poly list
+		if isinstance(polys, Polygon): polys = [polys]
 
-			if q_s:
-				# return the midpoint of the shortest diagonal qv
-				q = min(q_s, key=lambda q: (q-v).length_squared )
+		corners = _offset_corners(polys)
+		pending = [ amount for amount in amounts if amount != 0 ]
 
+		if processes is not None and processes > 1 and len(pending) > 1:
+			with ProcessPoolExecutor(processes) as pool:
+				results = list(pool.map(_offset_islands, itertools.repeat(corners), pending, itertools.repeat(tip_decorator)))
+		else:
+			results = [ _offset_islands(corners, amount, tip_decorator) for amount in pending ]
 
-				return (q - v) / 2.0 + v
+		results = iter(results)
+		output = []
+		for amount in amounts:
+			if amount == 0:
+				output.append(MultiPolygon.from_polygons(polys) if multi else list(polys))
 			else:
-				# no diagonal from v, return midpoint of ab instead
-				return (b - a) / 2.0 + a
-
-
-
-		def dbg(p, color, text):
-			if debug_callback:
-				debug_callback(p,color,text)
-
-
-		raw = []
-		for poly in polys:
-
-			offset = offset_poly(poly)
-			decomp = decompose( offset )
-
-			raw.extend( decomp )
+				islands = next(results)
+				output.append(MultiPolygon.from_islands(islands) if multi else _from_islands(islands))
 
+		return output
 
-		#print "\n-----------------\n"
-		output = []
-		for poly in raw:
+	@staticmethod
+	def triangulate(polygon, holes=[], method="auto"):
+		"""Split a polygon with holes into triangles.
 
-			poly = Polygon.simplify_sequence(poly)
-			p = find_point_in_poly( poly )
-			wn = winding_number(p, raw)
+		This is much faster and more robust than L{convex_decompose}. For rendering, use L{triangulate} from py2d.Math.Triangulation
+		directly, it returns an index buffer instead of creating a Polygon per triangle.
 
+		@type polygon: Polygon
+		@param polygon: The possibly concave polygon to triangulate. For a L{MultiPolygon}, all islands are triangulated and the holes are subtracted from it.
 
-			dbg(p, 0xffff00, "%d %d" % (wn, len(poly)))
-			#print "%d %d" % (wn, len(poly))
+		@type holes: List
+		@param holes: A list of polygons inside of polygon to be considered as holes
 
-			# shrink: include poly in solution only if winding number of that region is greater than 1
-			# grow: include only if winding number is 1
-			if False or (amount < 0 and wn > 0) or (amount > 0 and wn == 1):
-				output.append(Polygon.from_pointlist(poly))
+		@type method: str
+		@param method: The triangulation method, see L{py2d.Math.Triangulation.triangulate}
 
+		@return: A list of triangle Polygons in the same orientation as L{Polygon.regular}
+		"""
+		if isinstance(polygon, MultiPolygon):
+			if holes: polygon = Polygon.subtract(polygon, holes)
+			return [ t for shell, shell_holes in polygon for t in Polygon.triangulate(shell, shell_holes, method) ]
 
-
-		return output
+		pts = _triangulation_points(polygon, holes).data
+		return [ Polygon.from_vector_array(VectorArray(pts[t])) for t in _triangulate(polygon, holes, method) ]
 
 	@staticmethod
-	def convex_decompose(polygon, holes=[], debug_callback=None):
+	def convex_decompose(polygon, holes=[], debug_callback=None, method="mp3"):
 		"""Decompose a polygon into convex parts
 
+		There are two methods:
+
+			- "mp3" grows convex parts by diagonals as described by Fernandez et al. It produces few parts but takes
+			  up to cubic time on complex polygons.
+			- "hertel_mehlhorn" triangulates the polygon and merges the triangles greedily, see L{py2d.Math.Triangulation.convex_partition}.
+			  It runs in O(n log n) and produces at most four times the minimum number of parts.
+
 		Reference:
 		Jose Fernandez, Boglarka Toth, Lazaro Canovas and Blas Pelegrin. A practical algorithm for decomposing polygonal domains into convex polygons by diagonals
 		Trabajos de Investigacion Operativa Volume 16, Number 2, 367-387.
 		doi 10.1007/s11750-008-0055-2
 
 		@type polygon: Polygon
-		@param polygon: The possibly concave polygon to decompose.
+		@param polygon: The possibly concave polygon to decompose. For a L{MultiPolygon}, all islands are decomposed and the holes are subtracted from it.
 
 		@type holes: List
 		@param holes: A list of polygons inside of polygon to be considered as holes
+
+		@type method: str
+		@param method: Either "mp3" or "hertel_mehlhorn"
 		"""
 
 		def dbg(p, c, t):
 			if debug_callback: debug_callback(p,c,t)
 
+		if method not in ("mp3", "hertel_mehlhorn"): raise ValueError("Unknown decomposition method: %s" % method)
+
+		if isinstance(polygon, MultiPolygon):
+			if holes: polygon = Polygon.subtract(polygon, holes)
+			return [ part for shell, shell_holes in polygon for part in Polygon.convex_decompose(shell, list(shell_holes), debug_callback, method) ]
+
 		if polygon.is_self_intersecting(): return []
 		if polygon.is_convex() and not holes: return [polygon]
 
+		if method == "hertel_mehlhorn":
+			pts = _triangulation_points(polygon, holes).data
+			return [ Polygon.from_vector_array(VectorArray(pts[piece])) for piece in _convex_partition(polygon, holes) ]
+
 		if not polygon.is_clockwise(): polygon = polygon.clone().flip()
 
 		p = [v for v in polygon.points]
@@ -761,23 +959,118 @@ class Polygon(object):
 
 		return out
 
-	def is_self_intersecting(self):
+	def is_self_intersecting(self, all_pairs=False):
+		"""Determines whether the polygon outline intersects itself.
 
-		for i in range(len(self.points)):
-			for j in range(i+1, len(self.points)):
-				a = self.points[i]
-				b = self.points[(i+1)%len(self.points)]
-				c = self.points[j]
-				d = self.points[(j+1)%len(self.points)]
+		Edges that share an end point with the start point of the other edge, e.g. consecutive edges, are not checked against each other.
+		All other edges intersect if they cross, touch or overlap.
 
-				if not (b == c or d == a):
-					if check_intersect_lineseg_lineseg(a, b, c, d): return True
+		@type all_pairs: bool
+		@param all_pairs: If True, find all intersecting edges instead of stopping at the first one, e.g. for diagnostics
+
+		@return: True if the polygon intersects itself. If all_pairs is True, a sorted list of pairs (i, j), i < j, of
+		intersecting edges instead, where edge i goes from point i to point i+1.
+		"""
+		return Polygon.is_self_intersecting_s(self.points, all_pairs)
+
+	@staticmethod
+	def is_self_intersecting_s(pts, all_pairs=False):
+		"""Determines whether the polygon defined by the point list pts intersects itself.
+
+		The check is a Shamos-Hoey sweep in O(n log n) that stops at the first intersection. Finding all intersections
+		tests the pairs of edges with overlapping bounding boxes instead.
+
+		Reference:
+		Michael Ian Shamos, Dan Hoey. Geometric Intersection Problems.
+		17th Annual Symposium on Foundations of Computer Science, 1976
+
+		@param all_pairs: See L{is_self_intersecting}
+		"""
+
+		n = len(pts)
+		if n < 4: return [] if all_pairs else False
+
+		def crossing(i, j):
+			if i > j: i, j = j, i
+			a, b, c, d = pts[i], pts[(i+1) % n], pts[j], pts[(j+1) % n]
+			return not (b == c or d == a) and _check_intersect_edges(a, b, c, d)
+
+		if all_pairs:
+			segs = poly_segment_array(pts)
+
+			return sorted( (i, j) for ci, cj in _candidate_pairs(segs, segs, True) for i, j in zip(ci.tolist(), cj.tolist()) if crossing(i, j) )
+
+		# edge end points ordered from left to right, and the start (0) and end (1) events of the sweep
+		ends = []
+		events = []
+		for k in range(n):
+			a, b = pts[k], pts[(k+1) % n]
+			if (b.x, b.y) < (a.x, a.y): a, b = b, a
+			ends.append((a, b))
+			events.append((a.x, a.y, 0, k))
+			events.append((b.x, b.y, 1, k))
+		events.sort()
+
+		# the edges crossing the sweep line, ordered along it
+		status = []
+		for (x, y), group in itertools.groupby(events, key=lambda e: (e[0], e[1])):
+			p = Vector(x, y)
+
+			starting, ending = [], set()
+			for e in group:
+				if e[2]: ending.add(e[3])
+				else: starting.append(e[3])
+
+			# find the block of edges that pass through p
+			lo, hi = 0, len(status)
+			while lo < hi:
+				mid = (lo + hi) // 2
+				if orientation_determinant(ends[status[mid]][0], ends[status[mid]][1], p) > 0: lo = mid + 1
+				else: hi = mid
+
+			hi = lo
+			while hi < len(status) and orientation_determinant(ends[status[hi]][0], ends[status[hi]][1], p) == 0: hi += 1
+
+			# all edges that pass through, start or end at p touch each other
+			touching = status[lo:hi] + starting
+			for i in range(len(touching)):
+				for j in range(i+1, len(touching)):
+					if crossing(touching[i], touching[j]): return True
+
+			# replace the block by the edges continuing to the right of p, ordered by their direction
+			block = [ t for t in status[lo:hi] if t not in ending ]
+			for k in starting:
+				if k in ending: continue
+
+				r = ends[k][1]
+				i, j = 0, len(block)
+				while i < j:
+					mid = (i + j) // 2
+					t = block[mid]
+					o = orientation_determinant(ends[t][0], ends[t][1], r)
+					if o == 0: o = k - t
+					if o > 0: i = mid + 1
+					else: j = mid
+				block.insert(i, k)
+
+			status[lo:hi] = block
+
+			# check the block against its new neighbors
+			below = status[lo-1] if lo > 0 else None
+			above = status[lo + len(block)] if lo + len(block) < len(status) else None
+			if block:
+				if below is not None and crossing(below, block[0]): return True
+				if above is not None and crossing(block[-1], above): return True
+			elif below is not None and above is not None and crossing(below, above): return True
 
 		return False
 
 	def is_clockwise(self):
 		"""Determines whether the polygon has a clock-wise orientation."""
-		return Polygon.is_clockwise_s(self.points)
+		cw = self._cache.get('clockwise')
+		if cw is None:
+			cw = self._cache['clockwise'] = Polygon.is_clockwise_s(self.points)
+		return cw
 
 	@staticmethod
 	def is_clockwise_s(pts):
@@ -794,7 +1087,10 @@ class Polygon(object):
 
 	def is_convex(self):
 		"""Determines whether the polygon is convex."""
-		return Polygon.is_convex_s(self.points)
+		convex = self._cache.get('convex')
+		if convex is None:
+			convex = self._cache['convex'] = Polygon.is_convex_s(self.points)
+		return convex
 
 	@staticmethod
 	def is_convex_s(poly_points):
@@ -814,6 +1110,12 @@ class Polygon(object):
 	def flip(self):
 		"""Reverses the orientation of the polygon"""
 		self.points.reverse()
+
+		# the bounding box is the only cached property unaffected by the orientation
+		bounds = self._cache.get('bounds')
+		self._cache.clear()
+		if bounds is not None: self._cache['bounds'] = bounds
+
 		return self
 
 	def contains_point(self, p):
@@ -849,31 +1151,212 @@ class Polygon(object):
 		# we are inside if we have an odd amount of polygon intersections
 		return 1 if len(intersections) % 2 == 1 else 0
 
+	def contains_points(self, points):
+		"""Checks which of a batch of points are contained in the polygon, or on the boundary.
+
+		@type points: VectorArray
+		@param points: The points to check. Anything accepted by as_vector_array will do.
+
+		@return: An int8 NumPy array with 0 for points outside, 1 for points in the polygon, 2 for points on the boundary.
+		"""
+		return Polygon.contains_points_s(self, points)
+
+	@staticmethod
+	def contains_points_s(pts, points):
+		"""Checks which of a batch of points are contained in the polygon defined by the point list pts.
+
+		This uses a vectorized crossing number test with the same boundary tolerance as L{contains_point_s}.
+
+		@type pts: VectorArray
+		@param pts: The points of the polygon. Anything accepted by as_vector_array will do.
+
+		@type points: VectorArray
+		@param points: The points to check. Anything accepted by as_vector_array will do.
+
+		@return: An int8 NumPy array with 0 for points outside, 1 for points in the polygon, 2 for points on the boundary.
+		"""
+
+		poly = as_vector_array(pts).data
+		q = as_vector_array(points).data
+
+		out = numpy.zeros(q.shape[0], dtype=numpy.int8)
+		if poly.shape[0] == 0 or q.shape[0] == 0: return out
+
+		nxt = numpy.roll(poly, -1, axis=0)
+		ax, ay, by = poly[:, 0], poly[:, 1], nxt[:, 1]
+		dx, dy = nxt[:, 0] - ax, by - ay
+
+		l2 = dx * dx + dy * dy
+		l2[l2 == 0] = 1
+
+		inv_slope = numpy.zeros_like(dx)
+		nonhorizontal = dy != 0
+		inv_slope[nonhorizontal] = dx[nonhorizontal] / dy[nonhorizontal]
+
+		# only points within the bounding box can be inside or on the boundary
+		candidates = numpy.flatnonzero(numpy.all((q >= poly.min(axis=0) - EPSILON) & (q <= poly.max(axis=0) + EPSILON), axis=1))
+
+		step = max(1, _BATCH_PAIRS // poly.shape[0])
+		for start in range(0, candidates.shape[0], step):
+			idx = candidates[start:start + step]
+			px, py = q[idx, 0, numpy.newaxis], q[idx, 1, numpy.newaxis]
+
+			# distance to the closest point on each edge
+			apx, apy = px - ax, py - ay
+			r = numpy.clip((apx * dx + apy * dy) / l2, 0, 1)
+			ex, ey = apx - r * dx, apy - r * dy
+			on_boundary = (ex * ex + ey * ey < EPSILON * EPSILON).any(axis=1)
+
+			# count the edges crossed by a ray cast in positive x direction
+			crossing = ((ay <= py) != (by <= py)) & (px < ax + (py - ay) * inv_slope)
+			result = (crossing.sum(axis=1) & 1).astype(numpy.int8)
+
+			result[on_boundary] = 2
+			out[idx] = result
+
+		return out
+
+	def signed_distance(self, p):
+		"""Get the signed distance of a point to the polygon outline.
+
+		The outline is cached as a segment array until the polygon is modified, so repeated queries do not allocate per edge.
+
+		@type p: Vector
+		@param p: The point
+
+		@return: The distance to the closest edge, negative if p is inside the polygon
+		"""
+		segs = self._cache.get('segments')
+		if segs is None:
+			segs = self._cache['segments'] = poly_segment_array(self.points)
+
+		nearest = nearest_segment(p, segs)
+		if nearest is None: return float('inf')
+
+		return -nearest[2] if self.prepare().contains_point(p) == 1 else nearest[2]
+
+	def signed_distances(self, points):
+		"""Get the signed distances of a batch of points to the polygon outline, see L{signed_distance}.
+
+		@type points: VectorArray
+		@param points: The points. Anything accepted by as_vector_array will do.
+
+		@return: A float NumPy array with one distance per point
+		"""
+		return Polygon.signed_distances_s(self.points, points)
+
+	@staticmethod
+	def signed_distances_s(pts, points):
+		"""Get the signed distances of a batch of points to the outline of the polygon defined by the point list pts.
+
+		@type pts: VectorArray
+		@param pts: The points of the polygon. Anything accepted by as_vector_array will do.
+
+		@type points: VectorArray
+		@param points: The points. Anything accepted by as_vector_array will do.
+
+		@return: A float NumPy array with one distance per point, negative for points inside the polygon
+		"""
+		distances = nearest_segments(points, poly_segment_array(pts))[2]
+		distances[Polygon.contains_points_s(pts, points) == 1] *= -1
+		return distances
+
+	def prepare(self):
+		"""Get a L{PreparedPolygon} for fast repeated containment tests.
+
+		The prepared polygon is cached until the polygon is modified.
+		"""
+		prepared = self._cache.get('prepared')
+		if prepared is None:
+			prepared = self._cache['prepared'] = PreparedPolygon(self.points)
+		return prepared
+
 	def as_tuple_list(self):
 		return [(p.x, p.y) for p in self.points]
 
+	def as_vector_array(self):
+		"""Get the points of the polygon as a VectorArray"""
+		return VectorArray.from_vectors(self.points)
+
+	def get_bounds(self):
+		"""Get the axis-aligned bounding box of the polygon as a tuple (left, top, right, bottom)"""
+		bounds = self._cache.get('bounds')
+		if bounds is None:
+			xes = [p.x for p in self.points]
+			yes = [p.y for p in self.points]
+			bounds = self._cache['bounds'] = (min(xes), min(yes), max(xes), max(yes))
+		return bounds
+
 	def get_width(self):
-		return self.right - self.left
+		left, top, right, bottom = self.get_bounds()
+		return right - left
 
 	def get_height(self):
-		return self.bottom - self.top
+		left, top, right, bottom = self.get_bounds()
+		return bottom - top
 
 	def get_left(self):
-		return min(self.points, key=lambda p: p.x).x
+		return self.get_bounds()[0]
 
 	def get_right(self):
-		return max(self.points, key=lambda p: p.x).x
+		return self.get_bounds()[2]
 
 	def get_top(self):
-		return min(self.points, key=lambda p: p.y).y
+		return self.get_bounds()[1]
 
 	def get_bottom(self):
-		return max(self.points, key=lambda p: p.y).y
+		return self.get_bounds()[3]
+
+	def _get_area_centroid(self):
+		"""Compute signed area and area centroid of the polygon in a single pass"""
+		ac = self._cache.get('area_centroid')
+		if ac is None:
+			pts = self.points
+			a, cx, cy = 0.0, 0.0, 0.0
+			prv = pts[-1]
+			for cur in pts:
+				cross = prv.x * cur.y - cur.x * prv.y
+				a += cross
+				cx += (prv.x + cur.x) * cross
+				cy += (prv.y + cur.y) * cross
+				prv = cur
+
+			a *= 0.5
+			if a != 0:
+				centroid = Vector(cx / (6 * a), cy / (6 * a))
+			else:
+				# degenerate polygon, fall back to the mean of the vertices
+				centroid = self.get_centerpoint()
+
+			ac = self._cache['area_centroid'] = (a, centroid)
+		return ac
+
+	def get_signed_area(self):
+		"""Get the signed area of the polygon. The area will be positive if the polygon is clockwise according to L{is_clockwise}."""
+		return self._get_area_centroid()[0]
+
+	def get_area(self):
+		"""Get the area of the polygon"""
+		return abs(self._get_area_centroid()[0])
+
+	def get_centroid(self):
+		"""Get the centroid of the polygon area.
+
+		Unlike L{get_centerpoint}, this is not affected by how the vertices are distributed along the outline.
+		"""
+		return self._get_area_centroid()[1].clone()
 
 	append = add_point
 	extend = add_points
 
+	points = property(get_points, set_points)
+
 	center = property(get_centerpoint)
+	centroid = property(get_centroid)
+
+	bounds = property(get_bounds)
+	area = property(get_area)
+	signed_area = property(get_signed_area)
 
 	left = property(get_left)
 	right = property(get_right)
@@ -883,3 +1366,134 @@ class Polygon(object):
 
 	width = property(get_width)
 	height = property(get_height)
+
+
+class MultiPolygon(object):
+	"""Class for a set of islands with holes.
+
+	Each island is a tuple (shell, holes) of a counter-clockwise shell Polygon and a list of clockwise hole Polygons inside of it,
+	see L{Polygon.is_clockwise}. Islands do not overlap, but an island may lie in a hole of another one. The nesting is known when
+	the MultiPolygon is built, so boolean operations, offsetting, decomposition and navigation meshes take it as it is instead of
+	re-deriving it with containment tests.
+
+	A MultiPolygon behaves like a list of its islands.
+	"""
+
+	def __init__(self, islands=None):
+		"""Create a new MultiPolygon
+
+		@type islands: List
+		@param islands: Optional list of tuples (shell, holes) of Polygons. These are used as they are, use L{from_polygons} to find the nesting of arbitrary rings.
+		"""
+		self.islands = [ (shell, list(holes)) for shell, holes in islands ] if islands else []
+
+	@staticmethod
+	def from_polygons(polys):
+		"""Build a MultiPolygon from rings that do not cross each other.
+
+		Rings inside of an odd number of other rings are holes, the orientation of the rings does not matter.
+
+		@type polys: List
+		@param polys: The Polygons to nest
+		"""
+
+		islands = []
+
+		# rings sorted by decreasing area, so the smallest ring containing a ring is the last one placed before it
+		placed = []
+		for ring in sorted(( p for p in polys if len(p) >= 3 ), key=lambda p: -p.area):
+			left, top, right, bottom = ring.get_bounds()
+
+			parent = None
+			for other, depth, island in reversed(placed):
+				o_left, o_top, o_right, o_bottom = other.get_bounds()
+				if o_left <= left and right <= o_right and o_top <= top and bottom <= o_bottom and _ring_inside(ring, other):
+					parent = (depth, island)
+					break
+
+			if parent is None or parent[0] % 2:
+				islands.append((ring.clone_ccw(), []))
+				placed.append((ring, parent[0] + 1 if parent else 0, len(islands) - 1))
+			else:
+				islands[parent[1]][1].append(ring.clone_cw())
+				placed.append((ring, parent[0] + 1, parent[1]))
+
+		return MultiPolygon(islands)
+
+	@staticmethod
+	def from_islands(islands):
+		"""Build a MultiPolygon from tuples (outline, holes) of point lists, as returned by L{py2d.Math.Boolean.polygon_boolean}"""
+		return MultiPolygon([ (Polygon.from_pointlist(outline), [ Polygon.from_pointlist(h) for h in holes ]) for outline, holes in islands ])
+
+	def __len__(self):
+		return len(self.islands)
+
+	def __iter__(self):
+		return iter(self.islands)
+
+	def __getitem__(self, key):
+		return self.islands[key]
+
+	def __repr__(self):
+		return "MultiPolygon [%s]" % ", ".join("%d points, %d holes" % (len(shell), len(holes)) for shell, holes in self.islands)
+
+	def clone(self):
+		"""Return a copy of the MultiPolygon with cloned shells and holes"""
+		return MultiPolygon([ (shell.clone(), [ h.clone() for h in holes ]) for shell, holes in self.islands ])
+
+	def get_shells(self):
+		"""Get the shells of all islands"""
+		return [ shell for shell, holes in self.islands ]
+
+	def get_holes(self):
+		"""Get the holes of all islands"""
+		return [ h for shell, holes in self.islands for h in holes ]
+
+	def get_polygons(self):
+		"""Get a flat list of all Polygons, listing every shell followed by its holes"""
+		return [ p for shell, holes in self.islands for p in [shell] + holes ]
+
+	def get_bounds(self):
+		"""Get the axis-aligned bounding box of all islands as a tuple (left, top, right, bottom)"""
+		bounds = [ shell.get_bounds() for shell, holes in self.islands ]
+		if not bounds: return (0, 0, 0, 0)
+		return (min(b[0] for b in bounds), min(b[1] for b in bounds), max(b[2] for b in bounds), max(b[3] for b in bounds))
+
+	def get_area(self):
+		"""Get the area of all islands without their holes"""
+		return sum(shell.area - sum(h.area for h in holes) for shell, holes in self.islands)
+
+	def contains_point(self, p):
+		"""Checks if p is contained in one of the islands, or on the boundary.
+
+		@return: 0 if outside, 1 if inside, 2 if on the boundary.
+		"""
+		for shell, holes in self.islands:
+			left, top, right, bottom = shell.get_bounds()
+			if not (left <= p.x <= right and top <= p.y <= bottom): continue
+
+			c = shell.contains_point(p)
+			if not c: continue
+
+			for h in holes:
+				ch = h.contains_point(p)
+				if ch == 2: return 2
+				if ch: c = 0
+
+			if c: return c
+		return 0
+
+	shells = property(get_shells)
+	holes = property(get_holes)
+	bounds = property(get_bounds)
+	area = property(get_area)
+
+
+def _ring_inside(inner, outer):
+	"""Check if the ring inner is inside of the ring outer, given that they do not cross"""
+	for p in inner.points:
+		c = outer.contains_point(p)
+		if c != 2: return c == 1
+
+	# all points are on the outline, so the rings are the same
+	return True
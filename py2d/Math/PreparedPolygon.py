@@ -0,0 +1,155 @@
+# cython: language_level=3
+
+"""Polygons prepared for fast repeated point containment queries"""
+
+import bisect
+
+from py2d.Math.Vector import *
+
+class PreparedPolygon(object):
+	"""Class for polygons that have been pre-processed for fast point-in-polygon tests.
+
+	The polygon is cut into horizontal slabs at every vertex y coordinate. The edges crossing a slab cannot cross each other
+	inside of it, so they can be kept sorted from left to right. A point query then only needs a binary search for the slab
+	and a binary search inside the slab, i.e. O(log n) time, and does not allocate any objects.
+
+	Results are the same as for L{Polygon.contains_point}: 0 if outside, 1 if inside, 2 if within EPSILON of the boundary.
+
+	The polygon must not be self-intersecting. Every edge is stored in all slabs it spans, so preparing takes O(n log n + m log n)
+	time and O(n + m) memory, where m is the total number of edge-slab pairs. m is up to O(n^2) for very jagged polygons, e.g. many
+	long edges each spanning many slabs, but typically much less. Use L{Polygon.prepare} to get a prepared polygon that is cached
+	with the polygon.
+	"""
+
+	def __init__(self, points):
+		"""Prepare a polygon for containment queries.
+
+		@type points: List
+		@param points: The polygon or list of Vectors to prepare. Later changes to the polygon will not be reflected.
+		"""
+
+		if hasattr(points, "points"): points = points.points
+
+		pts = [(p.x, p.y) for p in points]
+
+		# all vertex y coordinates become slab boundaries
+		self.slab_ys = sorted(set(y for x, y in pts))
+		y_index = dict((y, i) for i, y in enumerate(self.slab_ys))
+
+		# edges as tuples (ax, ay, bx, by, dx/dy) with ay < by
+		self.edges = []
+
+		# horizontal edges as tuples (y, x_min, x_max), sorted by y
+		self.horizontal = []
+
+		slabs = [[] for i in range(max(len(self.slab_ys) - 1, 0))]
+		for (ax, ay), (bx, by) in zip(pts, pts[1:] + pts[:1]):
+			if ay == by:
+				self.horizontal.append((ay, min(ax, bx), max(ax, bx)))
+				continue
+
+			if ay > by: ax, ay, bx, by = bx, by, ax, ay
+
+			k = len(self.edges)
+			self.edges.append((ax, ay, bx, by, (bx - ax) / (by - ay)))
+
+			for i in range(y_index[ay], y_index[by]):
+				slabs[i].append(k)
+
+		self.horizontal.sort()
+		self.horizontal_ys = [h[0] for h in self.horizontal]
+
+		# sort the edges in every slab by their x coordinate in the middle of the slab
+		for i, slab in enumerate(slabs):
+			y_mid = 0.5 * (self.slab_ys[i] + self.slab_ys[i + 1])
+			slab.sort(key=lambda k: self._x_at(k, y_mid))
+
+		self.slabs = slabs
+
+	def _x_at(self, k, y):
+		ax, ay, bx, by, inv = self.edges[k]
+		return ax + (y - ay) * inv
+
+	def _search(self, slab, x, y):
+		"""Get the number of edges in slab that are left of (x, y)"""
+		edges = self.edges
+		lo, hi = 0, len(slab)
+		while lo < hi:
+			mid = (lo + hi) >> 1
+			ax, ay, bx, by, inv = edges[slab[mid]]
+			if ax + (y - ay) * inv <= x:
+				lo = mid + 1
+			else:
+				hi = mid
+		return lo
+
+	def _near_edge(self, k, x, y):
+		"""Check if (x, y) is within EPSILON of edge k"""
+		ax, ay, bx, by, inv = self.edges[k]
+		return _distance_squared(x, y, ax, ay, bx, by) < EPSILON * EPSILON
+
+	def _on_boundary(self, x, y):
+		"""Check whether (x, y) is within EPSILON of the polygon boundary"""
+
+		slab_ys = self.slab_ys
+
+		# horizontal edges close to y
+		i = bisect.bisect_left(self.horizontal_ys, y - EPSILON)
+		while i < len(self.horizontal) and self.horizontal_ys[i] <= y + EPSILON:
+			hy, x_min, x_max = self.horizontal[i]
+			if _distance_squared(x, y, x_min, hy, x_max, hy) < EPSILON * EPSILON: return True
+			i += 1
+
+		# edges left and right of the point in all slabs close to y
+		i = max(bisect.bisect_right(slab_ys, y - EPSILON) - 1, 0)
+		while i < len(self.slabs) and slab_ys[i] <= y + EPSILON:
+			slab = self.slabs[i]
+			yq = min(max(y, slab_ys[i]), slab_ys[i + 1])
+
+			j = self._search(slab, x, yq)
+			if j > 0 and self._near_edge(slab[j - 1], x, y): return True
+			if j < len(slab) and self._near_edge(slab[j], x, y): return True
+
+			i += 1
+
+		return False
+
+	def contains_xy(self, x, y):
+		"""Checks if the point (x, y) is contained in the polygon, or on the boundary.
+
+		@return: 0 if outside, 1 if in the polygon, 2 if on the boundary.
+		"""
+
+		if self._on_boundary(x, y): return 2
+
+		i = bisect.bisect_right(self.slab_ys, y) - 1
+		if i < 0 or i >= len(self.slabs): return 0
+
+		slab = self.slabs[i]
+
+		# count the edges right of the point, i.e. the crossings of a ray cast in positive x direction
+		crossings = len(slab) - self._search(slab, x, y)
+		return crossings & 1
+
+	def contains_point(self, p):
+		"""Checks if p is contained in the polygon, or on the boundary.
+
+		@return: 0 if outside, 1 if in the polygon, 2 if on the boundary.
+		"""
+		return self.contains_xy(p.x, p.y)
+
+
+def _distance_squared(x, y, ax, ay, bx, by):
+	"""Get the squared distance of (x, y) to the line segment (ax, ay), (bx, by)"""
+
+	abx, aby = bx - ax, by - ay
+	apx, apy = x - ax, y - ay
+
+	l = abx * abx + aby * aby
+	r = (apx * abx + apy * aby) / l if l > 0 else 0
+
+	if r <= 0: return apx * apx + apy * apy
+	if r >= 1: return (x - bx) * (x - bx) + (y - by) * (y - by)
+
+	s = apx * aby - apy * abx
+	return s * s / l
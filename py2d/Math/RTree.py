@@ -0,0 +1,215 @@
+# cython: language_level=3
+
+"""R-tree over the bounding boxes of polygons"""
+
+import heapq
+import math
+
+import numpy
+
+from py2d.Math.Vector import *
+from py2d.Math.Operations import distance_point_lineseg_squared
+
+class RTree(object):
+	"""Class for a static R-tree over the bounding boxes of polygons.
+
+	The tree is bulk-loaded with the Sort-Tile-Recursive (STR) algorithm: the boxes are sorted into vertical slices by their center x,
+	each slice is sorted by center y and cut into full nodes, and the same is repeated for the nodes of the next level. This gives
+	well-packed nodes with little overlap, so point and box queries visit O(log n) nodes for typical polygon meshes.
+
+	Reference:
+	Scott T. Leutenegger, Mario A. Lopez, Jeffrey Edgington. STR: A Simple and Efficient Algorithm for R-Tree Packing.
+	Proceedings of the 13th International Conference on Data Engineering, 1997
+
+	Queries return the values stored with the polygons, which default to the polygons themselves, in the order the polygons
+	were given. The tree does not notice changes to the polygons, build a new tree instead.
+
+		>>> from py2d.Math import Polygon
+		>>> tree = RTree([Polygon.regular(Vector(0, 0), 1, 4), Polygon.regular(Vector(5, 0), 1, 4)], values=["a", "b"])
+		>>> tree.find(Vector(5.5, 0))
+		['b']
+	"""
+
+	def __init__(self, polygons, values=None, node_capacity=16):
+		"""Bulk-load a new R-tree
+
+		@type polygons: List
+		@param polygons: The polygons to index, or any other objects with a get_bounds method
+
+		@type values: List
+		@param values: Optional values to return from queries, one per polygon. Defaults to the polygons.
+
+		@type node_capacity: int
+		@param node_capacity: The maximum number of children of a node
+		"""
+
+		self.polygons = list(polygons)
+		self.values = list(values) if values is not None else self.polygons
+		self.node_capacity = node_capacity
+
+		if len(self.values) != len(self.polygons): raise ValueError("Need exactly one value per polygon!")
+		if node_capacity < 2: raise ValueError("Node capacity must be at least 2!")
+
+		# entries as tuples (left, top, right, bottom, index), then levels of nodes as tuples (left, top, right, bottom, start, end)
+		# with the children start:end on the level below. The last level holds the root.
+		boxes = numpy.array([ poly.get_bounds() for poly in self.polygons ], dtype=numpy.float64).reshape(-1, 4)
+		order = _str_order(boxes, node_capacity)
+
+		self.entries = [ tuple(b) + (i,) for b, i in zip(boxes[order].tolist(), order.tolist()) ]
+		self.levels = []
+
+		boxes = boxes[order]
+		while boxes.shape[0] > 1 or not self.levels:
+			n = boxes.shape[0]
+			if n == 0: break
+
+			starts = numpy.arange(0, n, node_capacity)
+			ends = numpy.minimum(starts + node_capacity, n)
+
+			parents = numpy.column_stack((
+				numpy.minimum.reduceat(boxes[:, 0], starts), numpy.minimum.reduceat(boxes[:, 1], starts),
+				numpy.maximum.reduceat(boxes[:, 2], starts), numpy.maximum.reduceat(boxes[:, 3], starts)))
+
+			nodes = [ tuple(b) + (s, e) for b, s, e in zip(parents.tolist(), starts.tolist(), ends.tolist()) ]
+
+			# pack the parents of this level for the next one
+			if len(nodes) > 1:
+				order = _str_order(parents, node_capacity)
+				nodes = [ nodes[i] for i in order.tolist() ]
+				parents = parents[order]
+
+			self.levels.append(nodes)
+			boxes = parents
+
+	def _search(self, left, top, right, bottom):
+		"""Generator function yielding the indices of all polygons whose bounding box intersects a box"""
+
+		if not self.levels: return
+
+		levels, entries = self.levels, self.entries
+
+		stack = [ (len(levels) - 1, k) for k in range(len(levels[-1])) ]
+		while stack:
+			level, k = stack.pop()
+			l, t, r, b, start, end = levels[level][k]
+			if r < left or l > right or b < top or t > bottom: continue
+
+			if level > 0:
+				stack.extend((level - 1, c) for c in range(start, end))
+				continue
+
+			for c in range(start, end):
+				l, t, r, b, i = entries[c]
+				if r < left or l > right or b < top or t > bottom: continue
+				yield i
+
+	def query_box(self, left, top, right, bottom):
+		"""Find all polygons whose bounding box intersects an axis-aligned box
+
+		@return: A list of values in the order the polygons were given
+		"""
+		return [ self.values[i] for i in sorted(self._search(left, top, right, bottom)) ]
+
+	def query_point(self, p):
+		"""Find all polygons whose bounding box contains the point p
+
+		@return: A list of values in the order the polygons were given
+		"""
+		return self.query_box(p.x, p.y, p.x, p.y)
+
+	def find(self, p):
+		"""Find all polygons that contain the point p or have it on their boundary
+
+		@return: A list of values in the order the polygons were given
+		"""
+		return [ self.values[i] for i in sorted(self._search(p.x, p.y, p.x, p.y)) if _contains(self.polygons[i], p) ]
+
+	def nearest(self, p, max_distance=float("inf")):
+		"""Find the polygon closest to the point p.
+
+		The distance to a polygon is 0 if p is inside of it, otherwise the distance to its outline.
+		Nodes are visited in the order of the distance of their boxes to p, so only few polygons need to be looked at.
+
+		@type max_distance: float
+		@param max_distance: Ignore polygons further away than this
+
+		@return: A tuple (value, distance) or None if there is no polygon within max_distance
+		"""
+
+		if not self.levels: return None
+
+		levels, entries = self.levels, self.entries
+		best, best_d2 = None, max_distance * max_distance
+
+		# heap of (squared box distance, tie breaker, level, index), level -1 being polygons
+		heap = [ (_box_distance_squared(p, node), k, len(levels) - 1, k) for k, node in enumerate(levels[-1]) ]
+		heapq.heapify(heap)
+
+		while heap:
+			d2, tie, level, k = heapq.heappop(heap)
+			if d2 > best_d2: break
+
+			if level < 0:
+				# ties go to the polygon given first
+				d2 = _distance_squared(p, self.polygons[k])
+				if d2 < best_d2 or (d2 == best_d2 and (best is None or k < best)):
+					best, best_d2 = k, d2
+				continue
+
+			start, end = levels[level][k][4:]
+			if level > 0:
+				for c in range(start, end):
+					heapq.heappush(heap, (_box_distance_squared(p, levels[level - 1][c]), c, level - 1, c))
+			else:
+				for c in range(start, end):
+					entry = entries[c]
+					heapq.heappush(heap, (_box_distance_squared(p, entry), entry[4], -1, entry[4]))
+
+		if best is None: return None
+		return self.values[best], math.sqrt(best_d2)
+
+	def __len__(self):
+		return len(self.polygons)
+
+	def __repr__(self):
+		return "RTree [%d polygons, %d levels]" % (len(self.polygons), len(self.levels))
+
+
+def _str_order(boxes, capacity):
+	"""Get the Sort-Tile-Recursive packing order of boxes (left, top, right, bottom)"""
+
+	n = boxes.shape[0]
+	if n == 0: return numpy.zeros(0, dtype=numpy.intp)
+
+	cx = boxes[:, 0] + boxes[:, 2]
+	cy = boxes[:, 1] + boxes[:, 3]
+
+	leaves = int(math.ceil(n / float(capacity)))
+	slices = int(math.ceil(math.sqrt(leaves)))
+	per_slice = slices * capacity
+
+	by_x = numpy.argsort(cx, kind='stable')
+	order = []
+	for s in range(0, n, per_slice):
+		sl = by_x[s:s + per_slice]
+		order.append(sl[numpy.argsort(cy[sl], kind='stable')])
+
+	return numpy.concatenate(order)
+
+def _box_distance_squared(p, box):
+	"""Get the squared distance of p to a box (left, top, right, bottom, ...)"""
+	dx = max(box[0] - p.x, 0, p.x - box[2])
+	dy = max(box[1] - p.y, 0, p.y - box[3])
+	return dx * dx + dy * dy
+
+def _contains(poly, p):
+	"""Check if p is inside or on the boundary of poly"""
+	if hasattr(poly, "prepare"): return poly.prepare().contains_point(p) != 0
+	return poly.contains_point(p) != 0
+
+def _distance_squared(p, poly):
+	"""Get the squared distance of p to a polygon, 0 if p is inside"""
+	if _contains(poly, p): return 0.0
+
+	pts = list(poly.points)
+	return min(distance_point_lineseg_squared(p, a, b) if a != b else (p - a).length_squared for a, b in zip(pts, pts[1:] + pts[:1]))
@@ -0,0 +1,302 @@
+# cython: language_level=3
+
+"""Bounding volume hierarchy over static line segments"""
+
+import numpy
+
+from py2d.Math.Vector import *
+from py2d.Math.Segments import *
+
+_INF = float("inf")
+_EMPTY = (_INF, -_INF)
+
+class SegmentBVH(object):
+	"""Class for a static bounding volume hierarchy (BVH) over line segments.
+
+	The segments are bulk-loaded into a binary tree of axis-aligned bounding boxes by recursively splitting them at the median
+	of their centers along the longer axis. Ray and segment queries then only need to test the segments in the few leaves whose
+	boxes they pass through, i.e. O(log n) segments for typical scenes instead of all of them.
+
+	Hit tests use the same formulas as L{intersect_lineseg_ray} and L{check_intersect_lineseg_lineseg}, so results match
+	the linear scans. Node boxes are padded by EPSILON so that rounding cannot make a query miss a segment on the border of a box.
+
+	The tree cannot be modified after it has been built. For moving obstacles, rebuild it or use a spatial hash instead.
+
+		>>> bvh = SegmentBVH.from_strips([[Vector(0, 0), Vector(0, 10)], [Vector(5, 0), Vector(5, 10)]])
+		>>> bvh.first_hit(Vector(-5, 5), Vector(0, 5))
+		(0, 1.0, Vector(0.000, 5.000))
+	"""
+
+	def __init__(self, segs, leaf_size=8):
+		"""Build a BVH over line segments.
+
+		@type segs: List
+		@param segs: The line segments. Anything accepted by L{as_segment_array} will do.
+
+		@type leaf_size: int
+		@param leaf_size: Maximum number of segments in a leaf
+		"""
+
+		self.segments = as_segment_array(segs)
+		self.leaf_size = leaf_size
+
+		n = self.segments.shape[0]
+		s = self.segments
+
+		x_min, x_max = numpy.minimum(s[:, 0], s[:, 2]), numpy.maximum(s[:, 0], s[:, 2])
+		y_min, y_max = numpy.minimum(s[:, 1], s[:, 3]), numpy.maximum(s[:, 1], s[:, 3])
+		centers = numpy.column_stack((x_min + x_max, y_min + y_max))
+
+		order = numpy.arange(n)
+
+		# nodes as tuples (x_min, y_min, x_max, y_max, left, right, start, end). leaves have left == -1 and contain
+		# the segments order[start:end], inner nodes have the children left and right.
+		nodes = []
+		stack = [(None, 0, n)] if n > 0 else []
+		while stack:
+			parent, start, end = stack.pop()
+
+			idx = order[start:end]
+			box = (float(x_min[idx].min()) - EPSILON, float(y_min[idx].min()) - EPSILON, float(x_max[idx].max()) + EPSILON, float(y_max[idx].max()) + EPSILON)
+
+			k = len(nodes)
+			if parent is not None:
+				# link the new node into its parent
+				p = nodes[parent]
+				nodes[parent] = p[:4] + ((k, p[5]) if p[4] is None else (p[4], k)) + p[6:]
+
+			if end - start <= leaf_size:
+				nodes.append(box + (-1, -1, start, end))
+				continue
+
+			# split at the median of the centers along the longer axis of the centers
+			c = centers[idx]
+			axis = int(numpy.argmax(c.max(axis=0) - c.min(axis=0)))
+			mid = (end - start) // 2
+			order[start:end] = idx[numpy.argpartition(c[:, axis], mid)]
+
+			nodes.append(box + (None, None, start, end))
+			stack.append((k, start + mid, end))
+			stack.append((k, start, start + mid))
+
+		self.nodes = nodes
+		self.order = order
+		self._order = order.tolist()
+
+		# segments as tuples in leaf order, for fast scalar access during traversal
+		self._segs = [tuple(r) for r in s[order].tolist()]
+
+	@staticmethod
+	def from_strips(strips, leaf_size=8):
+		"""Build a BVH over line strips, e.g. FOV obstructors.
+
+		@type strips: List
+		@param strips: A list of line strips, i.e. a list of lists of Vectors
+
+		@return: A SegmentBVH. Segment indices follow the order of the strips and their points.
+		"""
+		return SegmentBVH([ seg for strip in strips for seg in zip(strip, strip[1:]) ], leaf_size)
+
+	@staticmethod
+	def from_polygons(polygons, leaf_size=8):
+		"""Build a BVH over the edges of polygons.
+
+		@type polygons: List
+		@param polygons: A list of Polygons
+
+		@return: A SegmentBVH. Segment indices follow the order of the polygons and their points, edge i of a polygon going from point i to point i+1.
+		"""
+		segs = [ poly_segment_array(poly) for poly in polygons if len(poly) > 0 ]
+		return SegmentBVH(numpy.concatenate(segs) if segs else numpy.zeros((0, 4)), leaf_size)
+
+	def _slab(self, node, ox, oy, inv_x, inv_y):
+		"""Get the range of ray parameters (t_enter, t_exit) for which a ray is inside the box of a node"""
+		x0, y0, x1, y1 = node[:4]
+
+		if inv_x is None:
+			# parallel to the y axis, either always or never within the x extent of the box
+			if ox < x0 or ox > x1: return _EMPTY
+			t0, t1 = -_INF, _INF
+		else:
+			t0, t1 = (x0 - ox) * inv_x, (x1 - ox) * inv_x
+			if t0 > t1: t0, t1 = t1, t0
+
+		if inv_y is None:
+			if oy < y0 or oy > y1: return _EMPTY
+		else:
+			u0, u1 = (y0 - oy) * inv_y, (y1 - oy) * inv_y
+			if u0 > u1: u0, u1 = u1, u0
+			if u0 > t0: t0 = u0
+			if u1 < t1: t1 = u1
+
+		return t0, t1
+
+	def _ray_setup(self, p1, p2):
+		"""Get the origin and inverse direction of the ray through p1 and p2. Axes the ray is parallel to have inverse None."""
+		dx, dy = p2.x - p1.x, p2.y - p1.y
+		return p1.x, p1.y, dx, dy, (1.0 / dx if dx != 0 else None), (1.0 / dy if dy != 0 else None)
+
+	def first_hit(self, p1, p2, t_min=0.0, t_max=_INF):
+		"""Find the first segment hit by the ray starting at p1 and passing through p2.
+
+		@type p1: Vector
+		@param p1: The starting point of the ray
+
+		@type p2: Vector
+		@param p2: The second point on the ray
+
+		@type t_min: float
+		@param t_min: Ignore hits with a ray parameter smaller than t_min
+
+		@type t_max: float
+		@param t_max: Ignore hits with a ray parameter larger than t_max, e.g. 1 to only look up to p2
+
+		@return: A tuple (index, t, point) of the index of the hit segment, the ray parameter of the hit (0 at p1, 1 at p2)
+		and the hit point, or None if nothing was hit. Ties are broken by the lower segment index.
+		"""
+
+		if not self.nodes: return None
+
+		ox, oy, dx, dy, inv_x, inv_y = self._ray_setup(p1, p2)
+		if inv_x is None and inv_y is None: return None
+
+		nodes, segs, order = self.nodes, self._segs, self._order
+
+		best_t, best_k, best_u = t_max, -1, 0.0
+
+		stack = [0]
+		while stack:
+			node = nodes[stack.pop()]
+
+			t0, t1 = self._slab(node, ox, oy, inv_x, inv_y)
+			if t0 > t1 or t0 > best_t or t1 < t_min or t1 < 0: continue
+
+			left, right, start, end = node[4:]
+			if left >= 0:
+				# visit the closer child first
+				tl = self._slab(nodes[left], ox, oy, inv_x, inv_y)[0]
+				tr = self._slab(nodes[right], ox, oy, inv_x, inv_y)[0]
+				if tl <= tr:
+					stack.append(right)
+					stack.append(left)
+				else:
+					stack.append(left)
+					stack.append(right)
+				continue
+
+			for k in range(start, end):
+				ax, ay, bx, by = segs[k]
+
+				d = dy * (bx - ax) - dx * (by - ay)
+				if d == 0: continue
+
+				u_seg = (dx * (ay - oy) - dy * (ax - ox)) / d
+				if u_seg < 0 or u_seg > 1: continue
+
+				u_ray = ((bx - ax) * (ay - oy) - (by - ay) * (ax - ox)) / d
+				if u_ray < 0 or u_ray < t_min or u_ray > best_t: continue
+
+				if u_ray < best_t or best_k < 0 or order[k] < order[best_k]:
+					best_t, best_k, best_u = u_ray, k, u_seg
+
+		if best_k < 0: return None
+
+		ax, ay, bx, by = segs[best_k]
+		return order[best_k], best_t, Vector(ax + best_u * (bx - ax), ay + best_u * (by - ay))
+
+	def any_hit(self, p1, p2, skip=None):
+		"""Check if any segment intersects the line segment from p1 to p2.
+
+		This is the same as calling L{check_intersect_lineseg_lineseg} for every segment, but stops at the first hit.
+
+		@type p1: Vector
+		@param p1: The first point of the line segment
+
+		@type p2: Vector
+		@param p2: The second point of the line segment
+
+		@type skip: Vector
+		@param skip: If given, ignore segments that start or end at this point, e.g. the target of a visibility test
+
+		@return: True if any segment intersects the line segment
+		"""
+
+		if not self.nodes: return False
+
+		ox, oy, dx, dy, inv_x, inv_y = self._ray_setup(p1, p2)
+		qx0, qx1 = min(p1.x, p2.x), max(p1.x, p2.x)
+		qy0, qy1 = min(p1.y, p2.y), max(p1.y, p2.y)
+
+		nodes, segs = self.nodes, self._segs
+
+		stack = [0]
+		while stack:
+			node = nodes[stack.pop()]
+
+			x0, y0, x1, y1, left, right, start, end = node
+			if x1 < qx0 or x0 > qx1 or y1 < qy0 or y0 > qy1: continue
+
+			if inv_x is not None or inv_y is not None:
+				t0, t1 = self._slab(node, ox, oy, inv_x, inv_y)
+				if t0 > t1 or t0 > 1 or t1 < 0: continue
+
+			if left >= 0:
+				stack.append(right)
+				stack.append(left)
+				continue
+
+			for k in range(start, end):
+				ax, ay, bx, by = segs[k]
+
+				if max(ax, bx) < qx0 or min(ax, bx) > qx1 or max(ay, by) < qy0 or min(ay, by) > qy1: continue
+
+				d = (by - ay) * dx - (bx - ax) * dy
+				if d == 0: continue
+
+				u_a = ((bx - ax) * (oy - ay) - (by - ay) * (ox - ax)) / d
+				if u_a < 0 or u_a > 1: continue
+
+				u_b = (dx * (oy - ay) - dy * (ox - ax)) / d
+				if u_b < 0 or u_b > 1: continue
+
+				if skip is not None and ((abs(ax - skip.x) < EPSILON and abs(ay - skip.y) < EPSILON) or (abs(bx - skip.x) < EPSILON and abs(by - skip.y) < EPSILON)):
+					continue
+
+				return True
+
+		return False
+
+	def query_box(self, left, top, right, bottom):
+		"""Find all segments whose bounding box intersects an axis-aligned box.
+
+		@return: A sorted list of segment indices
+		"""
+
+		if not self.nodes: return []
+
+		nodes, segs, order = self.nodes, self._segs, self._order
+
+		out = []
+		stack = [0]
+		while stack:
+			x0, y0, x1, y1, l, r, start, end = nodes[stack.pop()]
+			if x1 < left or x0 > right or y1 < top or y0 > bottom: continue
+
+			if l >= 0:
+				stack.append(r)
+				stack.append(l)
+				continue
+
+			for k in range(start, end):
+				ax, ay, bx, by = segs[k]
+				if max(ax, bx) < left or min(ax, bx) > right or max(ay, by) < top or min(ay, by) > bottom: continue
+				out.append(order[k])
+
+		out.sort()
+		return out
+
+	def __len__(self):
+		return self.segments.shape[0]
+
+	def __repr__(self):
+		return "SegmentBVH [%d segments, %d nodes]" % (len(self), len(self.nodes))
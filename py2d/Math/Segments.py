@@ -0,0 +1,610 @@
+# cython: language_level=3
+
+"""Batched line segment operations on contiguous segment arrays.
+
+Segments are stored as Mx4 float64 NumPy arrays, one row (x1, y1, x2, y2) per segment.
+"""
+
+import heapq
+
+import numpy
+
+from py2d.Math.Vector import *
+from py2d.Math.VectorArray import *
+
+# maximum number of segment pairs to test at once
+_BATCH_PAIRS = 1 << 18
+
+# number of segments per leaf of the bounding box trees used for finding candidate pairs
+_LEAF_SIZE = 8
+
+# number of pairs tested by the bounding box trees that cost about as much as one event of the sweep
+_SWEEP_COST = 200
+
+# number of segment pairs sampled for estimating the number of intersections
+_SAMPLE_PAIRS = 4096
+
+def as_segment_array(segs):
+	"""Get an Mx4 float64 array for a list of line segments without copying where possible.
+
+	@type segs: List
+	@param segs: The line segments, either as a list of 2-tuples of Vectors or as an array of shape Mx4
+
+	@return: An Mx4 NumPy array with rows (x1, y1, x2, y2)
+	"""
+
+	if isinstance(segs, numpy.ndarray):
+		segs = numpy.ascontiguousarray(segs, dtype=numpy.float64)
+		if segs.size == 0: return segs.reshape(0, 4)
+		if segs.ndim != 2 or segs.shape[1] != 4:
+			raise ValueError("Expected an Mx4 array, got shape %s" % (segs.shape,))
+		return segs
+
+	return numpy.array([(a.x, a.y, b.x, b.y) for a, b in segs], dtype=numpy.float64).reshape(-1, 4)
+
+def poly_segment_array(poly_points):
+	"""Get the closed outline of a polygon as an Mx4 segment array
+
+	@type poly_points: List
+	@param poly_points: The polygon or list of points in the polygon. Anything accepted by as_vector_array will do.
+	"""
+	pts = as_vector_array(poly_points).data
+	return numpy.hstack((pts, numpy.roll(pts, -1, axis=0)))
+
+def intersect_segments(segs_a, segs_b=None):
+	"""Find all intersections between two sets of line segments, or within one set of line segments.
+
+	The segments are sorted along a Z-order curve and grouped into a binary tree of bounding boxes. Both trees are descended
+	together, level by level, and only pairs of nodes whose boxes overlap are expanded. Only the segment pairs of
+	overlapping leaves are tested. This takes O(n log n + c) time, where c is the number of segment pairs with overlapping
+	bounding boxes. c is proportional to n plus the number of intersections k for short segments as in polygon outlines,
+	but can be up to O(n^2) even if k = 0, e.g. for long parallel diagonal segments.
+
+	If the number of pairs tested by the trees exceeds the cost of a sweep, estimated from a sample of the intersections,
+	the pairs are found with a Bentley-Ottmann sweep instead, which takes O((n + k) log n) time regardless of the bounding
+	boxes.
+
+	The intersection test is the same as in L{intersect_lineseg_lineseg}: touching segments intersect, parallel segments never do.
+
+	@type segs_a: List
+	@param segs_a: The first set of line segments. Anything accepted by L{as_segment_array} will do.
+
+	@type segs_b: List
+	@param segs_b: The second set of line segments. If None, the intersections of segs_a with itself are reported.
+
+	@return: A tuple (pairs, points). pairs is a Kx2 int array of indices (i, j) into segs_a and segs_b (or i < j into segs_a),
+	sorted lexicographically. points is a VectorArray of the K intersection points.
+	"""
+
+	a = as_segment_array(segs_a)
+	b = a if segs_b is None else as_segment_array(segs_b)
+
+	pairs = []
+	points = []
+	for i, j in _candidate_pairs(a, b, segs_b is None):
+		mask, pts = _intersect_pairs(a[i], b[j])
+		pairs.append(numpy.column_stack((i[mask], j[mask])))
+		points.append(pts)
+
+	if not pairs: return numpy.zeros((0, 2), dtype=numpy.intp), VectorArray.zeros(0)
+
+	pairs = numpy.concatenate(pairs)
+	points = numpy.concatenate(points)
+
+	order = numpy.lexsort((pairs[:, 1], pairs[:, 0]))
+	return pairs[order], VectorArray(points[order])
+
+def _candidate_pairs(a, b, same):
+	"""Generator function yielding chunks of index arrays (i, j) of segment pairs with overlapping bounding boxes"""
+
+	if a.shape[0] == 0 or b.shape[0] == 0: return
+
+	a_boxes = _boxes(a)
+	a_order = _morton_order(a_boxes)
+	a_sorted = a_boxes[a_order]
+	a_levels = _box_tree(a_sorted)
+
+	if same:
+		b_order, b_sorted, b_levels = a_order, a_sorted, a_levels
+	else:
+		b_boxes = _boxes(b)
+		b_order = _morton_order(b_boxes)
+		b_sorted = b_boxes[b_order]
+		b_levels = _box_tree(b_sorted)
+
+	# descend both trees at once, only keeping pairs of nodes with overlapping boxes
+	limit = _SWEEP_COST * (a.shape[0] + b.shape[0])
+	ia, ib = numpy.zeros(1, dtype=numpy.intp), numpy.zeros(1, dtype=numpy.intp)
+	da, db = len(a_levels) - 1, len(b_levels) - 1
+	while da > 0 or db > 0:
+		if da >= db and da > 0:
+			ia, ib = numpy.concatenate((2 * ia, 2 * ia + 1)), numpy.concatenate((ib, ib))
+			da -= 1
+		if db >= da + (0 if same else 1) and db > 0:
+			ia, ib = numpy.concatenate((ia, ia)), numpy.concatenate((2 * ib, 2 * ib + 1))
+			db -= 1
+
+		keep = (ia < a_levels[da].shape[0]) & (ib < b_levels[db].shape[0])
+		if same: keep &= ia <= ib
+		ia, ib = ia[keep], ib[keep]
+
+		keep = _overlapping(a_levels[da][ia], b_levels[db][ib])
+		ia, ib = ia[keep], ib[keep]
+
+		# long segments can make the boxes of many nodes overlap without intersecting, so that the tree would test
+		# quadratically many pairs. Switch to the sweep once it is expected to be cheaper, estimating the number of
+		# intersections from a sample of the segment pairs below the current nodes.
+		if ia.shape[0] * _LEAF_SIZE * _LEAF_SIZE > limit:
+			limit = 2 * ia.shape[0] * _LEAF_SIZE * _LEAF_SIZE
+			size_a, size_b = _LEAF_SIZE << da, _LEAF_SIZE << db
+			pa, pb = _sample_pairs(ia, ib, size_a, size_b, a.shape[0], b.shape[0])
+			k = ia.shape[0] * size_a * size_b * numpy.mean(_intersect_pairs(a[a_order[pa]], b[b_order[pb]])[0])
+			if ia.shape[0] * _LEAF_SIZE * _LEAF_SIZE > _SWEEP_COST * (a.shape[0] + b.shape[0] + k):
+				i, j = _sweep_pairs(a, b, same)
+				for lo in range(0, i.shape[0], _BATCH_PAIRS):
+					yield i[lo:lo + _BATCH_PAIRS], j[lo:lo + _BATCH_PAIRS]
+				return
+
+	# test the segments of all overlapping pairs of leaves
+	ax0, ay0, ax1, ay1 = numpy.ascontiguousarray(a_sorted.T)
+	bx0, by0, bx1, by1 = numpy.ascontiguousarray(b_sorted.T)
+	offsets = numpy.arange(_LEAF_SIZE)
+	step = max(_BATCH_PAIRS // (_LEAF_SIZE * _LEAF_SIZE), 1)
+	for lo in range(0, ia.shape[0], step):
+		pa = (ia[lo:lo + step, numpy.newaxis] * _LEAF_SIZE + offsets)[:, :, numpy.newaxis]
+		pb = (ib[lo:lo + step, numpy.newaxis] * _LEAF_SIZE + offsets)[:, numpy.newaxis, :]
+		pa, pb = numpy.broadcast_arrays(pa, pb)
+
+		valid = (pa < a.shape[0]) & (pb < b.shape[0])
+		if same: valid &= pa < pb
+
+		pa, pb = pa[valid], pb[valid]
+		keep = (ax0[pa] <= bx1[pb]) & (bx0[pb] <= ax1[pa]) & (ay0[pa] <= by1[pb]) & (by0[pb] <= ay1[pa])
+		i, j = a_order[pa[keep]], b_order[pb[keep]]
+		if same: i, j = numpy.minimum(i, j), numpy.maximum(i, j)
+
+		if i.shape[0] > 0: yield i, j
+
+def _sample_pairs(ia, ib, size_a, size_b, n_a, n_b):
+	"""Get random segment positions (pa, pb) in the sorted orders from random pairs of the tree nodes ia and ib"""
+
+	rng = numpy.random.default_rng(0)
+	k = rng.integers(0, ia.shape[0], _SAMPLE_PAIRS)
+	pa = numpy.minimum(ia[k] * size_a + rng.integers(0, size_a, _SAMPLE_PAIRS), n_a - 1)
+	pb = numpy.minimum(ib[k] * size_b + rng.integers(0, size_b, _SAMPLE_PAIRS), n_b - 1)
+	return pa, pb
+
+def _sweep_pairs(a, b, same):
+	"""Get index arrays (i, j) of a superset of the intersecting segment pairs with a Bentley-Ottmann sweep.
+
+	The segments crossing the sweep line are kept in a list ordered from bottom to top. Intersections of neighbours in that
+	list become events. At every event, the segments passing through its point are reported as touching each other and
+	reordered by their slope, which is their order right of the point. This takes O((n + k) log n) comparisons for n segments
+	with k intersections. Inserting into the status list moves O(n) references, which is negligible in practice.
+
+	Reference:
+	Jon L. Bentley, Thomas A. Ottmann. Algorithms for Reporting and Counting Geometric Intersections.
+	IEEE Transactions on Computers C-28(9), pp 643-647, 1979
+	"""
+
+	segs = a if same else numpy.concatenate((a, b))
+	n_a = a.shape[0]
+	if n_a == 0 or b.shape[0] == 0: return numpy.zeros(0, dtype=numpy.intp), numpy.zeros(0, dtype=numpy.intp)
+
+	# orient all segments from left to right
+	flip = (segs[:, 2] < segs[:, 0]) | ((segs[:, 2] == segs[:, 0]) & (segs[:, 3] < segs[:, 1]))
+	segs = numpy.where(flip[:, numpy.newaxis], segs[:, [2, 3, 0, 1]], segs)
+	ax, ay, bx, by = [ c.tolist() for c in segs.T ]
+	dx, dy = (segs[:, 2] - segs[:, 0]).tolist(), (segs[:, 3] - segs[:, 1]).tolist()
+	length = numpy.hypot(segs[:, 2] - segs[:, 0], segs[:, 3] - segs[:, 1]).tolist()
+	slope = [ y / x if x else float('inf') for x, y in zip(dx, dy) ]
+
+	# distances below this are treated as zero when grouping segments at an event point
+	tol = 1e-9 * max(float(numpy.abs(segs).max()), 1.0)
+
+	# the segments starting and ending at every event point, and the segments crossing there
+	starts, ends, crossings = {}, {}, {}
+	for k, (p, q) in enumerate(zip(zip(ax, ay), zip(bx, by))):
+		starts.setdefault(p, []).append(k)
+		ends.setdefault(q, set()).add(k)
+	queue = list(set(starts) | set(ends))
+	heapq.heapify(queue)
+
+	pairs = set()
+	scheduled = set()
+
+	def side(k, px, py):
+		"""Get the distance of (px, py) above segment k"""
+		return (dx[k] * (py - ay[k]) - dy[k] * (px - ax[k])) / length[k]
+
+	def report(s, t):
+		if same or (s < n_a) != (t < n_a): pairs.add((s, t) if s < t else (t, s))
+
+	def check(s, t, px, py):
+		"""Report neighbours s and t if they intersect, and schedule their intersection if it is right of (px, py)"""
+		key = (s, t) if s < t else (t, s)
+		if key in scheduled: return
+
+		d = dx[t] * dy[s] - dy[t] * dx[s]
+		if not d: return
+
+		ex, ey = ax[t] - ax[s], ay[t] - ay[s]
+		u, v = (dx[t] * ey - dy[t] * ex) / d, (dx[s] * ey - dy[s] * ex) / d
+		eps = 1e-9
+		if not (-eps <= u <= 1 + eps and -eps <= v <= 1 + eps): return
+
+		scheduled.add(key)
+		report(s, t)
+
+		# snap the intersection to a nearby endpoint, which already is an event
+		q = (ax[s] + u * dx[s], ay[s] + u * dy[s])
+		for k in (s, t):
+			for e in ((ax[k], ay[k]), (bx[k], by[k])):
+				if abs(q[0] - e[0]) + abs(q[1] - e[1]) <= tol: q = e
+
+		if q > (px, py):
+			if q not in starts and q not in ends and q not in crossings: heapq.heappush(queue, q)
+			crossings.setdefault(q, set()).update((s, t))
+
+	status = []
+	while queue:
+		px, py = p = heapq.heappop(queue)
+
+		lo, hi = _status_block(status, side, px, py, tol)
+
+		# crossings found by neighbour tests that rounding moved out of the block are taken out of the status and added
+		missing = set( k for k in crossings.pop(p, ()) if (ax[k], ay[k]) < p <= (bx[k], by[k]) ).difference(status[lo:hi])
+		if missing:
+			status[:] = [ k for k in status if k not in missing ]
+			lo, hi = _status_block(status, side, px, py, tol)
+
+		# all segments passing through, starting or ending at p touch each other
+		starting = starts.get(p, [])
+		touching = status[lo:hi] + sorted(missing) + starting
+		for i in range(len(touching)):
+			for j in range(i + 1, len(touching)):
+				report(touching[i], touching[j])
+
+		# the segments continuing right of p, ordered by their direction
+		ending = ends.get(p, ())
+		block = sorted(( k for k in touching if k not in ending ), key=lambda k: (slope[k], k))
+		status[lo:hi] = block
+
+		if block:
+			if lo > 0: check(status[lo - 1], block[0], px, py)
+			if lo + len(block) < len(status): check(block[-1], status[lo + len(block)], px, py)
+		elif 0 < lo < len(status):
+			check(status[lo - 1], status[lo], px, py)
+
+	if not pairs: return numpy.zeros(0, dtype=numpy.intp), numpy.zeros(0, dtype=numpy.intp)
+
+	pairs = numpy.array(sorted(pairs), dtype=numpy.intp)
+	i, j = pairs[:, 0], pairs[:, 1]
+	if not same: j = j - n_a
+	return i, j
+
+def _status_block(status, side, px, py, tol):
+	"""Get the slice lo:hi of the sweep status with the segments passing through (px, py)"""
+
+	lo, hi = 0, len(status)
+	while lo < hi:
+		mid = (lo + hi) >> 1
+		if side(status[mid], px, py) > tol: lo = mid + 1
+		else: hi = mid
+
+	hi = lo
+	while hi < len(status) and side(status[hi], px, py) >= -tol: hi += 1
+	return lo, hi
+
+def _boxes(segs):
+	"""Get the bounding boxes (xmin, ymin, xmax, ymax) of an Mx4 segment array"""
+	return numpy.hstack((numpy.minimum(segs[:, :2], segs[:, 2:]), numpy.maximum(segs[:, :2], segs[:, 2:])))
+
+def _overlapping(p, q):
+	"""Check if the boxes p[k] and q[k] overlap or touch for all k"""
+	return (p[:, 0] <= q[:, 2]) & (q[:, 0] <= p[:, 2]) & (p[:, 1] <= q[:, 3]) & (q[:, 1] <= p[:, 3])
+
+def _morton_order(boxes):
+	"""Get the order of boxes along the Z-order curve through their centers, which keeps nearby boxes together"""
+
+	centers = boxes[:, :2] + boxes[:, 2:]
+	lo, extent = centers.min(axis=0), numpy.ptp(centers, axis=0)
+	cells = ((centers - lo) / numpy.where(extent > 0, extent, 1) * 0xffff).astype(numpy.uint32)
+
+	# interleave the bits of the x and y cell coordinates
+	codes = numpy.zeros(boxes.shape[0], dtype=numpy.uint64)
+	for bit in range(16):
+		codes |= ((cells[:, 0] >> bit) & 1).astype(numpy.uint64) << numpy.uint64(2 * bit)
+		codes |= ((cells[:, 1] >> bit) & 1).astype(numpy.uint64) << numpy.uint64(2 * bit + 1)
+
+	return numpy.argsort(codes, kind='stable')
+
+def _box_tree(boxes):
+	"""Get the levels of a binary tree over boxes in leaves of _LEAF_SIZE boxes, from the leaves up to the root.
+
+	Node k of a level has the children 2k and 2k + 1 on the level below.
+	"""
+
+	levels = [boxes]
+	size = _LEAF_SIZE
+	while True:
+		starts = numpy.arange(0, levels[-1].shape[0], size)
+		prev = levels[-1]
+		levels.append(numpy.column_stack((
+			numpy.minimum.reduceat(prev[:, 0], starts), numpy.minimum.reduceat(prev[:, 1], starts),
+			numpy.maximum.reduceat(prev[:, 2], starts), numpy.maximum.reduceat(prev[:, 3], starts))))
+		size = 2
+		if levels[-1].shape[0] == 1: break
+
+	return levels[1:]
+
+def _intersect_pairs(p, q):
+	"""Intersect segments p[k] and q[k] for all k.
+
+	@return: A tuple (mask, points) with a boolean mask of intersecting pairs and an array of the intersection points
+	"""
+
+	u_p, u_q, mask = _line_params(p, q[:, 0], q[:, 1], q[:, 2], q[:, 3])
+	mask &= (u_q <= 1)
+
+	return mask, _points_on(p[mask], u_p[mask])
+
+def intersect_segments_lineseg(segs, p1, p2, nearest=False):
+	"""Intersect many line segments with a single line segment.
+
+	Results are the same as calling L{intersect_lineseg_lineseg} for every segment.
+
+	@type segs: List
+	@param segs: The line segments. Anything accepted by L{as_segment_array} will do.
+
+	@type p1: Vector
+	@param p1: The first point on the line segment
+
+	@type p2: Vector
+	@param p2: The second point on the line segment
+
+	@type nearest: bool
+	@param nearest: If True, only return the hit closest to p1
+
+	@return: A tuple (indices, t, points) of the indices of the hit segments, the parameters of the hits along the line segment
+	(0 at p1, 1 at p2) and a VectorArray of the hit points, in segment order. If nearest is set, a tuple (index, t, point) or None if nothing was hit.
+	"""
+	s = as_segment_array(segs)
+	x1, y1, x2, y2 = p1.x, p1.y, p2.x, p2.y
+
+	u_seg, u_line, hit = _line_params(s, x1, y1, x2, y2)
+
+	# bounding box rejection as in intersect_lineseg_lineseg
+	hit &= ~((numpy.maximum(s[:, 0], s[:, 2]) < min(x1, x2)) | (numpy.minimum(s[:, 0], s[:, 2]) > max(x1, x2)) |
+		(numpy.maximum(s[:, 1], s[:, 3]) < min(y1, y2)) | (numpy.minimum(s[:, 1], s[:, 3]) > max(y1, y2)))
+	hit &= (u_line <= 1)
+
+	return _collect_hits(s, u_seg, u_line, hit, nearest)
+
+def intersect_segments_ray(segs, p1, p2, nearest=False, t_min=0.0):
+	"""Intersect many line segments with a single ray.
+
+	Results are the same as calling L{intersect_lineseg_ray} for every segment.
+
+	@type segs: List
+	@param segs: The line segments. Anything accepted by L{as_segment_array} will do.
+
+	@type p1: Vector
+	@param p1: The starting point of the ray
+
+	@type p2: Vector
+	@param p2: The second point on the ray
+
+	@type nearest: bool
+	@param nearest: If True, only return the hit closest to p1
+
+	@type t_min: float
+	@param t_min: Ignore hits with a ray parameter smaller than t_min, e.g. 1 to only get hits beyond p2
+
+	@return: A tuple (indices, t, points) of the indices of the hit segments, the parameters of the hits along the ray
+	(0 at p1, 1 at p2) and a VectorArray of the hit points, in segment order. If nearest is set, a tuple (index, t, point) or None if nothing was hit.
+	"""
+	s = as_segment_array(segs)
+
+	u_seg, u_ray, hit = _line_params(s, p1.x, p1.y, p2.x, p2.y)
+	hit &= (u_ray >= t_min)
+
+	return _collect_hits(s, u_seg, u_ray, hit, nearest)
+
+def intersect_segments_rays(segs, origins, targets, nearest=True, t_min=0.0):
+	"""Intersect many line segments with many rays at once.
+
+	@type segs: List
+	@param segs: The line segments. Anything accepted by L{as_segment_array} will do.
+
+	@type origins: VectorArray
+	@param origins: The starting points of the rays, or a single Vector shared by all rays
+
+	@type targets: VectorArray
+	@param targets: The second points on the rays. Anything accepted by as_vector_array will do.
+
+	@type nearest: bool
+	@param nearest: If True, only return the hit closest to the origin of each ray
+
+	@type t_min: float
+	@param t_min: Ignore hits with a ray parameter smaller than t_min. Can also be an array with one value per ray.
+
+	@return: If nearest is set, a tuple (indices, t, points) with one entry per ray: the index of the closest hit segment or -1,
+	the ray parameter of the hit or inf and a VectorArray of the hit points or NaN. Otherwise, a tuple (rays, indices, t, points)
+	listing every hit, sorted by ray and then by segment.
+	"""
+	s = as_segment_array(segs)
+	tgt = as_vector_array(targets).data
+	k = tgt.shape[0]
+
+	org = numpy.broadcast_to(_point_array(origins), (k, 2))
+	t_min = numpy.broadcast_to(numpy.asarray(t_min, dtype=numpy.float64), (k,))
+
+	if nearest:
+		indices = numpy.full(k, -1, dtype=numpy.intp)
+		ts = numpy.full(k, numpy.inf)
+		points = numpy.full((k, 2), numpy.nan)
+	else:
+		results = []
+
+	step = max(_BATCH_PAIRS // max(s.shape[0], 1), 1)
+	for lo in range(0, k, step):
+		hi = min(lo + step, k)
+		ox, oy = org[lo:hi, 0:1], org[lo:hi, 1:2]
+
+		u_seg, u_ray, hit = _line_params(s, ox, oy, tgt[lo:hi, 0:1], tgt[lo:hi, 1:2])
+		hit &= (u_ray >= t_min[lo:hi, numpy.newaxis])
+
+		if nearest:
+			u = numpy.where(hit, u_ray, numpy.inf)
+			j = numpy.argmin(u, axis=1) if s.shape[0] > 0 else numpy.zeros(hi - lo, dtype=numpy.intp)
+			rows = numpy.nonzero(hit.any(axis=1))[0]
+			j = j[rows]
+
+			indices[lo + rows] = j
+			ts[lo + rows] = u_ray[rows, j]
+			points[lo + rows] = _points_on(s[j], u_seg[rows, j])
+		else:
+			rows, j = numpy.nonzero(hit)
+			results.append((rows + lo, j, u_ray[rows, j], _points_on(s[j], u_seg[rows, j])))
+
+	if nearest: return indices, ts, VectorArray(points)
+
+	if not results: return numpy.zeros(0, dtype=numpy.intp), numpy.zeros(0, dtype=numpy.intp), numpy.zeros(0), VectorArray.zeros(0)
+	rays, indices, ts, points = (numpy.concatenate(r) for r in zip(*results))
+	return rays, indices, ts, VectorArray(points)
+
+def distance_points_segments_squared(points, segs):
+	"""Get the squared distances between points and line segments.
+
+	This uses the same formula as L{distance_point_lineseg_squared}, broadcast over all pairs of points and segments.
+	Zero-length segments give the distance to their point.
+
+	@type points: VectorArray
+	@param points: A single Vector or many points. Anything accepted by as_vector_array will do.
+
+	@type segs: List
+	@param segs: The line segments. Anything accepted by L{as_segment_array} will do.
+
+	@return: A NumPy array with the squared distance to every segment for a single Vector, otherwise an NxM array with one row per point.
+	"""
+	s = as_segment_array(segs)
+
+	if isinstance(points, Vector):
+		return _segment_distances(s, points.x, points.y)[1]
+
+	q = as_vector_array(points).data
+	return _segment_distances(s, q[:, 0:1], q[:, 1:2])[1]
+
+def nearest_segment(p, segs):
+	"""Find the line segment closest to a point.
+
+	@type p: Vector
+	@param p: The point
+
+	@type segs: List
+	@param segs: The line segments. Anything accepted by L{as_segment_array} will do.
+
+	@return: A tuple (index, t, distance) of the index of the closest segment, the parameter of the closest point on it
+	(0 at its first point, 1 at its second point) and the distance, or None if there are no segments. Ties go to the lower index.
+	"""
+	s = as_segment_array(segs)
+	if s.shape[0] == 0: return None
+
+	t, d2 = _segment_distances(s, p.x, p.y)
+	j = int(numpy.argmin(d2))
+	return j, float(t[j]), float(numpy.sqrt(d2[j]))
+
+def nearest_segments(points, segs):
+	"""Find the line segment closest to each of many points.
+
+	@type points: VectorArray
+	@param points: The points. Anything accepted by as_vector_array will do.
+
+	@type segs: List
+	@param segs: The line segments. Anything accepted by L{as_segment_array} will do.
+
+	@return: A tuple (indices, t, distances) with one entry per point as in L{nearest_segment}. If there are no segments,
+	the indices are -1, t is NaN and the distances are inf.
+	"""
+	s = as_segment_array(segs)
+	q = as_vector_array(points).data
+	k = q.shape[0]
+
+	indices = numpy.full(k, -1, dtype=numpy.intp)
+	ts = numpy.full(k, numpy.nan)
+	distances = numpy.full(k, numpy.inf)
+	if s.shape[0] == 0: return indices, ts, distances
+
+	step = max(_BATCH_PAIRS // s.shape[0], 1)
+	for lo in range(0, k, step):
+		hi = min(lo + step, k)
+		t, d2 = _segment_distances(s, q[lo:hi, 0:1], q[lo:hi, 1:2])
+
+		j = numpy.argmin(d2, axis=1)
+		rows = numpy.arange(hi - lo)
+
+		indices[lo:hi] = j
+		ts[lo:hi] = t[rows, j]
+		distances[lo:hi] = numpy.sqrt(d2[rows, j])
+
+	return indices, ts, distances
+
+def _segment_distances(s, px, py):
+	"""Get the parameters of the closest points on segments s and their squared distances to the points (px, py)"""
+	ax, ay, bx, by = s[:, 0], s[:, 1], s[:, 2], s[:, 3]
+	abx, aby = bx - ax, by - ay
+	apx, apy = px - ax, py - ay
+
+	l2 = abx * abx + aby * aby
+	degenerate = l2 == 0
+	r = numpy.where(degenerate, 0, apx * abx + apy * aby) / numpy.where(degenerate, 1, l2)
+
+	# perpendicular distance in the middle, end point distances beyond the ends
+	c = (ay - py) * abx - (ax - px) * aby
+	d2 = numpy.where(r <= 0, apx * apx + apy * apy,
+		numpy.where(r >= 1, (px - bx) * (px - bx) + (py - by) * (py - by), c * c / numpy.where(degenerate, 1, l2)))
+
+	return numpy.clip(r, 0, 1), d2
+
+def _point_array(p):
+	"""Get a point or a list of points as something that broadcasts against a Kx2 array"""
+	if isinstance(p, Vector): return numpy.array((p.x, p.y))
+	return as_vector_array(p).data
+
+def _line_params(s, q1x, q1y, q2x, q2y):
+	"""Get the line parameters of the intersections of segments s with the lines through q1 and q2.
+
+	This uses the same formulas as L{intersect_lineseg_lineseg}, broadcast over the segments and the query lines.
+
+	@return: A tuple (u_seg, u_line, mask), where mask marks all hits that are within the segments
+	"""
+	p1x, p1y, p2x, p2y = s[:, 0], s[:, 1], s[:, 2], s[:, 3]
+
+	d = (q2y - q1y) * (p2x - p1x) - (q2x - q1x) * (p2y - p1y)
+	n1 = (q2x - q1x) * (p1y - q1y) - (q2y - q1y) * (p1x - q1x)
+	n2 = (p2x - p1x) * (p1y - q1y) - (p2y - p1y) * (p1x - q1x)
+
+	nonparallel = d != 0
+	d = numpy.where(nonparallel, d, 1)
+
+	u_seg = n1 / d
+	u_line = n2 / d
+
+	return u_seg, u_line, nonparallel & (u_seg >= 0) & (u_seg <= 1) & (u_line >= 0)
+
+def _points_on(s, u):
+	"""Get the points at parameters u on segments s"""
+	return numpy.column_stack((s[:, 0] + u * (s[:, 2] - s[:, 0]), s[:, 1] + u * (s[:, 3] - s[:, 1])))
+
+def _collect_hits(s, u_seg, u_line, hit, nearest):
+	"""Collect hits of a single query as (indices, t, points), or only the nearest hit"""
+
+	if nearest:
+		if not hit.any(): return None
+		j = int(numpy.argmin(numpy.where(hit, u_line, numpy.inf)))
+		x, y = _points_on(s[j:j + 1], u_seg[j:j + 1])[0].tolist()
+		return j, float(u_line[j]), Vector(x, y)
+
+	indices = numpy.nonzero(hit)[0]
+	return indices, u_line[indices], VectorArray(_points_on(s[indices], u_seg[indices]))
@@ -0,0 +1,370 @@
+# cython: language_level=3
+
+"""Uniform grid spatial hash for dynamic points, segments and polygons"""
+
+import math
+
+from py2d.Math.Vector import *
+from py2d.Math.Operations import distance_point_lineseg_squared
+
+_INF = float("inf")
+
+class SpatialHash(object):
+	"""Class for a uniform grid spatial hash over points, line segments and polygons.
+
+	Every item is stored under a key of your choice in all grid cells its bounding box overlaps. Inserting, removing and moving
+	items only touches these cells, so the hash is well suited for scenes with many moving obstacles that would need to be
+	rebuilt every frame in a tree. Choose the cell size to be about the size of a typical item.
+
+	Supported shapes are:
+
+		- Vectors, which are indexed as points
+		- 2-tuples of Vectors, which are indexed as line segments
+		- Polygons (or anything else with a get_bounds method), which are indexed by their bounding box
+
+		>>> from py2d.Math import Polygon
+		>>> grid = SpatialHash(10)
+		>>> grid.insert("wall", (Vector(0, 0), Vector(0, 100)))
+		>>> grid.insert("crate", Polygon.regular(Vector(50, 50), 5, 4))
+		>>> grid.query_point(Vector(52, 51))
+		['crate']
+		>>> grid.first_hit(Vector(30, 50), Vector(20, 50))
+		('wall', 3.0, Vector(0.000, 50.000))
+	"""
+
+	def __init__(self, cell_size):
+		"""Create a new, empty spatial hash
+
+		@type cell_size: float
+		@param cell_size: The edge length of the square grid cells
+		"""
+
+		if cell_size <= 0: raise ValueError("Cell size must be positive!")
+
+		self.cell_size = float(cell_size)
+		self._inv = 1.0 / self.cell_size
+
+		# cell coordinates -> set of keys
+		self.cells = {}
+
+		# key -> (shape, kind, bounds, cell range)
+		self.items = {}
+
+		# range of cells that have ever been occupied, limits ray traversal and nearest neighbour search
+		self._extent = None
+
+	def _cell(self, x, y):
+		return int(math.floor(x * self._inv)), int(math.floor(y * self._inv))
+
+	def _cell_range(self, bounds):
+		left, top, right, bottom = bounds
+		i0, j0 = self._cell(left, top)
+		i1, j1 = self._cell(right, bottom)
+		return i0, j0, i1, j1
+
+	def insert(self, key, shape):
+		"""Insert a new item into the spatial hash
+
+		@type key: object
+		@param key: A hashable key identifying the item. Inserting an existing key replaces the item.
+
+		@type shape: object
+		@param shape: A Vector, a 2-tuple of Vectors or a Polygon
+		"""
+
+		if key in self.items:
+			self.move(key, shape)
+			return
+
+		kind, bounds = _shape_bounds(shape)
+		cells = self._cell_range(bounds)
+		self.items[key] = (shape, kind, bounds, cells)
+
+		i0, j0, i1, j1 = cells
+		for i in range(i0, i1 + 1):
+			for j in range(j0, j1 + 1):
+				self.cells.setdefault((i, j), set()).add(key)
+
+		if self._extent is None:
+			self._extent = cells
+		else:
+			e = self._extent
+			self._extent = (min(e[0], i0), min(e[1], j0), max(e[2], i1), max(e[3], j1))
+
+	def remove(self, key):
+		"""Remove an item from the spatial hash
+
+		@type key: object
+		@param key: The key of the item. A KeyError is raised if there is no such item.
+		"""
+
+		shape, kind, bounds, cells = self.items.pop(key)
+
+		i0, j0, i1, j1 = cells
+		for i in range(i0, i1 + 1):
+			for j in range(j0, j1 + 1):
+				cell = self.cells[(i, j)]
+				cell.discard(key)
+				if not cell: del self.cells[(i, j)]
+
+	def move(self, key, shape):
+		"""Update the shape of an item, e.g. after it moved. Only cells the item enters or leaves are touched.
+
+		@type key: object
+		@param key: The key of the item
+
+		@type shape: object
+		@param shape: The new shape of the item
+		"""
+
+		old_cells = self.items[key][3]
+		kind, bounds = _shape_bounds(shape)
+		cells = self._cell_range(bounds)
+
+		if cells != old_cells:
+			self.remove(key)
+			self.insert(key, shape)
+		else:
+			self.items[key] = (shape, kind, bounds, cells)
+
+	def get_shape(self, key):
+		"""Get the shape of an item"""
+		return self.items[key][0]
+
+	def query_box(self, left, top, right, bottom):
+		"""Find all items whose bounding box intersects an axis-aligned box.
+
+		@return: A list of keys in no particular order
+		"""
+		i0, j0, i1, j1 = self._cell_range((left, top, right, bottom))
+		items, cells = self.items, self.cells
+
+		found = set()
+		out = []
+		if (i1 - i0 + 1) * (j1 - j0 + 1) > len(cells):
+			# the box covers more cells than are occupied, so look at the occupied ones only
+			candidates = (c for (i, j), c in cells.items() if i0 <= i <= i1 and j0 <= j <= j1)
+		else:
+			candidates = (cells[(i, j)] for i in range(i0, i1 + 1) for j in range(j0, j1 + 1) if (i, j) in cells)
+
+		for cell in candidates:
+			for key in cell:
+				if key in found: continue
+				found.add(key)
+
+				l, t, r, b = items[key][2]
+				if r < left or l > right or b < top or t > bottom: continue
+				out.append(key)
+
+		return out
+
+	def query_point(self, p):
+		"""Find all items whose bounding box contains the point p, e.g. as candidates for a point-in-polygon test.
+
+		@return: A list of keys in no particular order
+		"""
+		return self.query_box(p.x, p.y, p.x, p.y)
+
+	def traverse_ray(self, p1, p2, t_max=_INF):
+		"""Generator function walking the grid cells along the ray from p1 through p2 (DDA).
+
+		Only cells within the range of cells that have been occupied are visited.
+
+		@return: Yields tuples (cell, t_enter, t_exit) of cell coordinates and the range of ray parameters within the cell.
+		"""
+
+		if self._extent is None: return
+
+		ox, oy = p1.x * self._inv, p1.y * self._inv
+		dx, dy = (p2.x - p1.x) * self._inv, (p2.y - p1.y) * self._inv
+		if dx == 0 and dy == 0: return
+
+		# clip the ray against the occupied extent
+		e0, f0, e1, f1 = self._extent
+		t0, t1 = 0.0, t_max
+		for o, d, lo, hi in ((ox, dx, e0, e1 + 1), (oy, dy, f0, f1 + 1)):
+			if d == 0:
+				if o < lo or o > hi: return
+			else:
+				a, b = (lo - o) / d, (hi - o) / d
+				if a > b: a, b = b, a
+				t0, t1 = max(t0, a), min(t1, b)
+		if t0 > t1: return
+
+		i, j = int(math.floor(ox + t0 * dx)), int(math.floor(oy + t0 * dy))
+		i, j = min(max(i, e0), e1), min(max(j, f0), f1)
+
+		step_i = 1 if dx > 0 else -1
+		step_j = 1 if dy > 0 else -1
+		delta_i = abs(1.0 / dx) if dx != 0 else _INF
+		delta_j = abs(1.0 / dy) if dy != 0 else _INF
+		next_i = ((i + (dx > 0)) - ox) / dx if dx != 0 else _INF
+		next_j = ((j + (dy > 0)) - oy) / dy if dy != 0 else _INF
+
+		t = t0
+		while t <= t1:
+			t_exit = min(next_i, next_j, t1)
+			yield (i, j), t, t_exit
+
+			if next_i < next_j:
+				i += step_i
+				t = next_i
+				next_i += delta_i
+			else:
+				j += step_j
+				t = next_j
+				next_j += delta_j
+
+			if t > t1: break
+
+	def first_hit(self, p1, p2, t_min=0.0, t_max=_INF):
+		"""Find the first segment or polygon edge hit by the ray starting at p1 and passing through p2. Points are ignored.
+
+		@type t_min: float
+		@param t_min: Ignore hits with a ray parameter smaller than t_min
+
+		@type t_max: float
+		@param t_max: Ignore hits with a ray parameter larger than t_max, e.g. 1 to only look up to p2
+
+		@return: A tuple (key, t, point) of the hit item, the ray parameter of the hit (0 at p1, 1 at p2) and the hit point, or None if nothing was hit.
+		"""
+
+		ox, oy, dx, dy = p1.x, p1.y, p2.x - p1.x, p2.y - p1.y
+
+		best = None
+		best_t = t_max
+		tested = set()
+		for cell, t_enter, t_exit in self.traverse_ray(p1, p2, t_max):
+			if t_enter > best_t: break
+
+			for key in self.cells.get(cell, ()):
+				if key in tested: continue
+				tested.add(key)
+
+				shape, kind = self.items[key][:2]
+				for ax, ay, bx, by in _edges(shape, kind):
+					d = dy * (bx - ax) - dx * (by - ay)
+					if d == 0: continue
+
+					u_seg = (dx * (ay - oy) - dy * (ax - ox)) / d
+					if u_seg < 0 or u_seg > 1: continue
+
+					u_ray = ((bx - ax) * (ay - oy) - (by - ay) * (ax - ox)) / d
+					if u_ray < 0 or u_ray < t_min or u_ray > best_t: continue
+
+					if best is None or u_ray < best_t:
+						best_t = u_ray
+						best = (key, u_ray, Vector(ax + u_seg * (bx - ax), ay + u_seg * (by - ay)))
+
+			# hits found so far are in this cell or before it, later cells cannot contain closer ones
+			if best is not None and best_t <= t_exit: break
+
+		return best
+
+	def nearest(self, p, max_distance=_INF, kinds=None):
+		"""Find the item closest to the point p.
+
+		Distances are measured to the points, to the line segments and to the outlines of polygons, or 0 for points inside a polygon.
+		The search visits rings of cells around p until no closer item can be found.
+
+		@type max_distance: float
+		@param max_distance: Ignore items further away than this
+
+		@type kinds: str
+		@param kinds: If given, only consider items of these kinds: 'p' for points, 's' for segments, 'g' for polygons, e.g. 'ps'
+
+		@return: A tuple (key, distance) or None if there is no item within max_distance
+		"""
+
+		if self._extent is None: return None
+
+		ci, cj = self._cell(p.x, p.y)
+		e0, f0, e1, f1 = self._extent
+
+		# number of rings needed to cover the occupied extent, and to cover max_distance
+		rings = max(ci - e0, e1 - ci, cj - f0, f1 - cj, 0)
+		if max_distance != _INF: rings = min(rings, int(math.ceil(max_distance * self._inv)) + 1)
+
+		best, best_d2 = None, max_distance * max_distance
+		tested = set()
+		for r in range(rings + 1):
+			# everything in ring r or beyond is at least (r - 1) cells away
+			if best is not None and (r - 1) * self.cell_size > math.sqrt(best_d2): break
+
+			for cell in _ring(ci, cj, r):
+				for key in self.cells.get(cell, ()):
+					if key in tested: continue
+					tested.add(key)
+
+					shape, kind = self.items[key][:2]
+					if kinds is not None and kind not in kinds: continue
+
+					d2 = _distance_squared(p, shape, kind)
+					if d2 <= best_d2 and (best is None or d2 < best_d2):
+						best, best_d2 = key, d2
+
+		if best is None: return None
+		return best, math.sqrt(best_d2)
+
+	def __len__(self):
+		return len(self.items)
+
+	def __contains__(self, key):
+		return key in self.items
+
+	def __repr__(self):
+		return "SpatialHash [%d items in %d cells of size %g]" % (len(self.items), len(self.cells), self.cell_size)
+
+
+def _shape_bounds(shape):
+	"""Get the kind and bounding box (left, top, right, bottom) of a shape"""
+
+	if isinstance(shape, Vector):
+		return 'p', (shape.x, shape.y, shape.x, shape.y)
+
+	if isinstance(shape, tuple) and len(shape) == 2 and isinstance(shape[0], Vector):
+		a, b = shape
+		return 's', (min(a.x, b.x), min(a.y, b.y), max(a.x, b.x), max(a.y, b.y))
+
+	if hasattr(shape, "get_bounds"):
+		return 'g', shape.get_bounds()
+
+	raise ValueError("Cannot index shape %r" % (shape,))
+
+def _edges(shape, kind):
+	"""Get the line segments of a shape as tuples (ax, ay, bx, by)"""
+
+	if kind == 's':
+		a, b = shape
+		return ((a.x, a.y, b.x, b.y),)
+
+	if kind == 'g':
+		pts = shape.points
+		return [ (a.x, a.y, b.x, b.y) for a, b in zip(pts, pts[1:] + pts[:1]) ]
+
+	return ()
+
+def _distance_squared(p, shape, kind):
+	"""Get the squared distance of p to a shape"""
+
+	if kind == 'p': return (p - shape).length_squared
+	if kind == 's':
+		a, b = shape
+		if a.x == b.x and a.y == b.y: return (p - a).length_squared
+		return distance_point_lineseg_squared(p, a, b)
+
+	if shape.contains_point(p): return 0.0
+
+	pts = shape.points
+	return min(distance_point_lineseg_squared(p, a, b) for a, b in zip(pts, pts[1:] + pts[:1]))
+
+def _ring(ci, cj, r):
+	"""Get the cells at Chebyshev distance r around cell (ci, cj)"""
+
+	if r == 0: return [(ci, cj)]
+
+	cells = [ (ci + k, cj - r) for k in range(-r, r + 1) ]
+	cells += [ (ci + k, cj + r) for k in range(-r, r + 1) ]
+	cells += [ (ci - r, cj + k) for k in range(-r + 1, r) ]
+	cells += [ (ci + r, cj + k) for k in range(-r + 1, r) ]
+	return cells
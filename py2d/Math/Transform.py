@@ -1,35 +1,69 @@
 # cython: language_level=3
 
 import math
+import itertools
+import numpy
 
 from py2d.Math.Vector import *
+from py2d.Math.VectorArray import *
+from py2d.Math.Polygon import Polygon
+from py2d.Math.ArrayPolygon import ArrayPolygon
+
+# number of points from which on polygons will be transformed as a whole buffer
+_BATCH_THRESHOLD = 128
 
 class Transform(object):
-	"""Class for representing affine transformations"""
+	"""Class for representing affine transformations.
+
+	A transformation is stored as the six coefficients of the matrix
+
+		[[ xx, xy, x0 ],
+		 [ yx, yy, y0 ],
+		 [  0,  0,  1 ]]
+
+	with the last row implied. The coefficients are read-only and only replaced as a whole by L{set_data}, which allows caching the inverse.
+	"""
+
+	__slots__ = ('_xx', '_xy', '_x0', '_yx', '_yy', '_y0', '_inverse')
 
-	def __init__(self, data):
-		self.data = data
+	def __init__(self, data=None):
+		"""Create a new transformation.
+
+		@type data: List
+		@param data: The transformation matrix as a list of 3 (or 2, omitting the implied last row) rows. Defaults to the unit transformation.
+		"""
+
+		if data is None: data = ((1, 0, 0), (0, 1, 0))
+		self._inverse = None
+		self.set_data(data)
+
+	@staticmethod
+	def from_coefficients(xx, xy, x0, yx, yy, y0):
+		"""Get a transformation from its six matrix coefficients without building any intermediate lists"""
+		t = Transform.__new__(Transform)
+		t._xx, t._xy, t._x0 = xx, xy, x0
+		t._yx, t._yy, t._y0 = yx, yy, y0
+		t._inverse = None
+		return t
 
 	@staticmethod
 	def unit():
 		"""Get a new unit tranformation"""
-		return Transform([[1, 0, 0],
-		                  [0, 1, 0],
-		                  [0, 0, 1]])
+		return Transform.from_coefficients(1, 0, 0,
+		                                   0, 1, 0)
 
 	@staticmethod
 	def move(dx, dy):
 		"""Get a transformation that moves by dx, dy"""
-		return Transform([[1, 0, dx],
-		                  [0, 1, dy],
-		                  [0, 0, 1]])
+		return Transform.from_coefficients(1, 0, dx,
+		                                   0, 1, dy)
 
 	@staticmethod
 	def rotate(phi):
 		"""Get a transformation that rotates by phi"""
-		return Transform([[math.cos(phi), -math.sin(phi), 0],
-		                  [math.sin(phi), math.cos(phi), 0],
-		                  [0, 0, 1]])
+		c, s = math.cos(phi), math.sin(phi)
+		return Transform.from_coefficients(c, -s, 0,
+		                                   s,  c, 0)
 
 	@staticmethod
 	def rotate_around(cx, cy, phi):
@@ -39,56 +73,224 @@ class Transform(object):
 	@staticmethod
 	def scale(sx, sy):
 		"""Get a transformation that scales by sx, sy"""
-		return Transform([[sx, 0, 0],
-		                  [0, sy, 0],
-		                  [0, 0, 1]])
+		return Transform.from_coefficients(sx,  0, 0,
+		                                    0, sy, 0)
+
+	@staticmethod
+	def shear(k):
+		"""Get a transformation that shears along the x axis by a factor of k"""
+		return Transform.from_coefficients(1, k, 0,
+		                                   0, 1, 0)
+
 	@staticmethod
 	def mirror_x():
 		"""Get a transformation that mirrors along the x axis"""
-		return Transform([[-1, 0, 0],
-		                  [ 0, 1, 0],
-		                  [ 0, 0, 1]])
+		return Transform.from_coefficients(-1, 0, 0,
+		                                    0, 1, 0)
 
 	@staticmethod
 	def mirror_y():
 		"""Get a transformation that mirrors along the y axis"""
-		return Transform([[ 1, 0, 0],
-		                  [ 0,-1, 0],
-		                  [ 0, 0, 1]])
+		return Transform.from_coefficients(1,  0, 0,
+		                                   0, -1, 0)
+
+	def get_data(self):
+		"""Get the transformation matrix as a 3x3 nested list"""
+		return [[self._xx, self._xy, self._x0],
+		        [self._yx, self._yy, self._y0],
+		        [0, 0, 1]]
+
+	def set_data(self, data):
+		"""Set the transformation matrix from a nested list. The last row is ignored."""
+		(self._xx, self._xy, self._x0), (self._yx, self._yy, self._y0) = data[0], data[1]
+
+		# the cached inverse is no longer valid, and must not point back to us either
+		if self._inverse is not None: self._inverse._inverse = None
+		self._inverse = None
+
+	def get_coefficients(self):
+		"""Get the six matrix coefficients as a tuple (xx, xy, x0, yx, yy, y0)"""
+		return (self._xx, self._xy, self._x0, self._yx, self._yy, self._y0)
+
+	def get_matrix(self):
+		"""Get the transformation as a 3x3 NumPy array"""
+		return numpy.array(self.get_data(), dtype=numpy.float64)
+
+	def get_determinant(self):
+		"""Get the determinant of the linear part of the transformation"""
+		return self._xx * self._yy - self._xy * self._yx
+
+	def get_inverse(self):
+		"""Get the inverse transformation.
+
+		The inverse is computed in closed form on first access and cached afterwards.
+		"""
+
+		if self._inverse is None:
+			det = self._xx * self._yy - self._xy * self._yx
+			if det == 0: raise ValueError("Transformation is not invertible: %s" % self)
+
+			xx, xy, yx, yy = self._yy / det, -self._xy / det, -self._yx / det, self._xx / det
+
+			inv = Transform.from_coefficients(xx, xy, -(xx * self._x0 + xy * self._y0),
+			                                  yx, yy, -(yx * self._x0 + yy * self._y0))
+			inv._inverse = self
+			self._inverse = inv
+
+		return self._inverse
+
+	def decompose(self):
+		"""Decompose the transformation into translation, rotation, shear and scale.
+
+		The transformation will be equal to
+		C{Transform.move(dx, dy) * Transform.rotate(phi) * Transform.shear(k) * Transform.scale(sx, sy)}.
+		A mirroring transformation will result in a negative sy.
+
+		@return: A tuple (dx, dy, phi, sx, sy, k)
+		"""
+
+		sx = math.hypot(self._xx, self._yx)
+		if sx == 0: raise ValueError("Cannot decompose a degenerate transformation: %s" % self)
+
+		phi = math.atan2(self._yx, self._xx)
+		c, s = self._xx / sx, self._yx / sx
+
+		m = c * self._xy + s * self._yy
+		sy = c * self._yy - s * self._xy
+
+		k = m / sy if sy != 0 else 0.0
+
+		return (self._x0, self._y0, phi, sx, sy, k)
+
+	def apply(self, points, out=None):
+		"""Apply the transformation to a whole array of points at once.
+
+		@type points: VectorArray
+		@param points: The points to transform. Anything accepted by as_vector_array will do.
+
+		@type out: VectorArray
+		@param out: Optional VectorArray or Nx2 array to write the result to. May be the same buffer as points.
+
+		@return: A VectorArray of the transformed points
+		"""
+
+		pts = as_vector_array(points).data
+
+		if out is None:
+			out = numpy.empty_like(pts)
+		else:
+			out = as_vector_array(out).data
+			if out.shape != pts.shape:
+				raise ValueError("Output buffer has shape %s, expected %s" % (out.shape, pts.shape))
+
+		numpy.matmul(pts, ((self._xx, self._yx), (self._xy, self._yy)), out=out)
+		out += (self._x0, self._y0)
+
+		return VectorArray(out)
+
+	def apply_inplace(self, points):
+		"""Apply the transformation to a buffer of points, overwriting the buffer.
+
+		@type points: VectorArray
+		@param points: A VectorArray or a contiguous float64 Nx2 NumPy array
+
+		@return: The VectorArray wrapping the updated buffer
+		"""
+
+		if not isinstance(points, (VectorArray, numpy.ndarray)):
+			raise ValueError("Can only transform VectorArrays and NumPy arrays in-place, got %s" % type(points))
+
+		wrapped = as_vector_array(points)
+		if isinstance(points, numpy.ndarray) and not numpy.shares_memory(wrapped.data, points):
+			raise ValueError("Can only transform contiguous float64 arrays in-place, got %s array of shape %s" % (points.dtype, points.shape))
+
+		return self.apply(wrapped, out=wrapped)
+
+	def apply_polygons(self, polys):
+		"""Apply the transformation to a list of polygons in a single pass over one point buffer.
+
+		ArrayPolygons will be transformed into ArrayPolygons that share one result buffer, without any per-point conversion.
+
+		@type polys: List
+		@param polys: The list of polygons to transform
+
+		@return: A list of new, transformed polygons
+		"""
+
+		if not polys: return []
+
+		if all(isinstance(poly, ArrayPolygon) for poly in polys):
+			buf = VectorArray(numpy.concatenate([poly.data for poly in polys]))
+		else:
+			buf = VectorArray.from_vectors(list(itertools.chain.from_iterable(poly.points for poly in polys)))
+
+		self.apply_inplace(buf)
+
+		out = []
+		start = 0
+		pts = None
+		for poly in polys:
+			n = len(poly)
+			if isinstance(poly, ArrayPolygon):
+				out.append(ArrayPolygon(buf.data[start:start + n]))
+			else:
+				if pts is None: pts = buf.as_vectors()
+				out.append(Polygon.from_pointlist(pts[start:start + n]))
+			start += n
+
+		return out
 
 	def __add__(self, b):
-		t = Transform()
-		t.data = [[self.data[x][y] + b.data[x][y] for y in range(3)] for x in range(3)]
-		return t
+		return Transform.from_coefficients(self._xx + b._xx, self._xy + b._xy, self._x0 + b._x0,
+		                                   self._yx + b._yx, self._yy + b._yy, self._y0 + b._y0)
 
 	def __sub__(self, b):
-		t = Transform()
-		t.data = [[self.data[x][y] - b.data[x][y] for y in range(3)] for x in range(3)]
-		return t
+		return Transform.from_coefficients(self._xx - b._xx, self._xy - b._xy, self._x0 - b._x0,
+		                                   self._yx - b._yx, self._yy - b._yy, self._y0 - b._y0)
 
 	def __mul__(self, val):
 
 		if isinstance(val, Vector):
-
-			x = val.x * self.data[0][0] + val.y * self.data[0][1] + self.data[0][2]
-			y = val.x * self.data[1][0] + val.y * self.data[1][1] + self.data[1][2]
-
-			return Vector(x,y)
+			return Vector(val.x * self._xx + val.y * self._xy + self._x0, val.x * self._yx + val.y * self._yy + self._y0)
 
 		elif isinstance(val, Transform):
-			data = [[0 for y in range(3)] for x in range(3)]
-			for i in range(3):
-				for j in range(3):
-					for k in range(3):
-						data[i][j] += self.data[i][k] * val.data[k][j]
+			a_xx, a_xy, a_x0, a_yx, a_yy, a_y0 = self._xx, self._xy, self._x0, self._yx, self._yy, self._y0
+			b_xx, b_xy, b_x0, b_yx, b_yy, b_y0 = val._xx, val._xy, val._x0, val._yx, val._yy, val._y0
 
-			return Transform(data)
+			return Transform.from_coefficients(
+				a_xx * b_xx + a_xy * b_yx, a_xx * b_xy + a_xy * b_yy, a_xx * b_x0 + a_xy * b_y0 + a_x0,
+				a_yx * b_xx + a_yy * b_yx, a_yx * b_xy + a_yy * b_yy, a_yx * b_x0 + a_yy * b_y0 + a_y0)
+
+		elif isinstance(val, ArrayPolygon):
+			return ArrayPolygon(self.apply(val))
 
 		elif isinstance(val, Polygon):
-			p_transform = [ self * v for v in val.points ]
-			return Polygon.from_pointlist(p_transform)
+			# for small polygons, the conversion to and from a buffer costs more than it saves
+			if len(val) >= _BATCH_THRESHOLD:
+				return Polygon.from_vector_array(self.apply(val))
+
+			xx, xy, x0, yx, yy, y0 = self._xx, self._xy, self._x0, self._yx, self._yy, self._y0
+			return Polygon.from_pointlist([ Vector(v.x * xx + v.y * xy + x0, v.x * yx + v.y * yy + y0) for v in val.points ])
+
+		elif isinstance(val, VectorArray):
+			return self.apply(val)
 
 		else:
 			raise ValueError("Unknown multiplier: %s" % val)
 
+	def __repr__(self):
+		return "Transform([[%.3f, %.3f, %.3f], [%.3f, %.3f, %.3f]])" % self.get_coefficients()
+
+	data = property(get_data, set_data)
+	coefficients = property(get_coefficients)
+	matrix = property(get_matrix)
+	determinant = property(get_determinant)
+	inverse = property(get_inverse)
 
+	# the coefficients can only be replaced as a whole by set_data, which clears the cached inverse
+	xx = property(lambda self: self._xx)
+	xy = property(lambda self: self._xy)
+	x0 = property(lambda self: self._x0)
+	yx = property(lambda self: self._yx)
+	yy = property(lambda self: self._yy)
+	y0 = property(lambda self: self._y0)
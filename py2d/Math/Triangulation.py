@@ -0,0 +1,577 @@
+# cython: language_level=3
+
+"""Triangulation of polygons with holes into index buffers"""
+
+import math
+
+import numpy
+
+from py2d.Math.Vector import *
+from py2d.Math.VectorArray import *
+from py2d.Math.Operations import orientation_determinant
+
+# vertex types of the monotone partition sweep
+_START, _END, _SPLIT, _MERGE, _REGULAR = range(5)
+
+def triangulation_points(polygon, holes=[]):
+	"""Get the vertex buffer that the indices returned by L{triangulate} refer to.
+
+	@type polygon: Polygon
+	@param polygon: The outline. Anything accepted by as_vector_array will do.
+
+	@type holes: List
+	@param holes: The holes, each of which may be anything accepted by as_vector_array
+
+	@return: A VectorArray of the outline points followed by the points of all holes in order. Without holes,
+	this is the VectorArray of the outline itself, so for ArrayPolygons and arrays no data is copied.
+	"""
+	outline = as_vector_array(polygon)
+	if not holes: return outline
+
+	return VectorArray(numpy.concatenate([outline.data] + [ as_vector_array(h).data for h in holes ]).reshape(-1, 2))
+
+def triangulate(polygon, holes=[], method="auto", dtype=numpy.intp):
+	"""Triangulate a polygon with holes.
+
+	There are two methods:
+
+		- "monotone" partitions the polygon into y-monotone pieces with a plane sweep and triangulates each of them in linear time,
+		  which takes O(n log n) in total.
+		- "ear" bridges the holes into the outline and clips ears, which takes O(n^2) but copes with more degenerate input,
+		  e.g. vertices touching other edges.
+
+	"auto" uses the monotone method and checks the result, falling back to ear clipping if the input was too degenerate.
+
+	Reference:
+	Mark de Berg, Otfried Cheong, Marc van Kreveld, Mark Overmars. Computational Geometry: Algorithms and Applications,
+	Chapter 3. Springer, 2008
+
+	David Eberly. Triangulation by Ear Clipping. Geometric Tools, 2002
+
+	@type polygon: Polygon
+	@param polygon: The outline, in any orientation. Anything accepted by as_vector_array will do.
+
+	@type holes: List
+	@param holes: The holes, each in any orientation. They must be inside of the outline and must not overlap each other.
+
+	@type method: str
+	@param method: Either "auto", "monotone" or "ear"
+
+	@type dtype: NumPy dtype
+	@param dtype: The integer type of the index buffer, e.g. numpy.uint32 for uploading to a GPU
+
+	@return: A Kx3 NumPy array of vertex indices into L{triangulation_points}, i.e. into the outline points followed by
+	the hole points. All triangles have the same orientation as L{Polygon.regular}.
+	"""
+
+	if method not in ("auto", "monotone", "ear"): raise ValueError("Unknown triangulation method: %s" % method)
+
+	pts = triangulation_points(polygon, holes).data
+	rings, area = _prepare_rings(pts, len(as_vector_array(polygon)), [ len(as_vector_array(h)) for h in holes ])
+	if not rings: return numpy.zeros((0, 3), dtype=dtype)
+
+	verts = [ Vector(x, y) for x, y in pts.tolist() ]
+	expected = sum(len(r) for r in rings) + 2 * (len(rings) - 1) - 2
+
+	triangles = None
+	if method != "ear":
+		try:
+			triangles = _orient_triangles(pts, _triangulate_monotone(verts, rings))
+		except _TriangulationError:
+			if method == "monotone": raise ValueError("Polygon is too degenerate for the monotone triangulation")
+
+		if method == "auto" and triangles is not None and not _is_valid(pts, triangles, expected, area): triangles = None
+
+	if triangles is None:
+		triangles = _orient_triangles(pts, _triangulate_ears(verts, rings))
+
+	return triangles.astype(dtype, copy=False)
+
+def convex_partition(polygon, holes=[], method="auto"):
+	"""Partition a polygon with holes into convex pieces.
+
+	The polygon is triangulated, then the diagonals between the triangles are removed greedily as long as the pieces on both sides
+	of a diagonal merge into a convex piece. This runs in O(n log n) for the monotone triangulation and yields at most four times
+	the minimum number of convex pieces.
+
+	Reference:
+	Stefan Hertel, Kurt Mehlhorn. Fast triangulation of simple polygons.
+	Proceedings of the 4th International Conference on Fundamentals of Computation Theory, 1983
+
+	@type polygon: Polygon
+	@param polygon: The outline, in any orientation. Anything accepted by as_vector_array will do.
+
+	@type holes: List
+	@param holes: The holes, each in any orientation. They must be inside of the outline and must not overlap each other.
+
+	@type method: str
+	@param method: The triangulation method, see L{triangulate}
+
+	@return: A list of NumPy arrays of vertex indices into L{triangulation_points}, one per piece. All pieces have the same
+	orientation as L{Polygon.regular}. Pieces may contain collinear vertices where they touch the corners of neighboring pieces.
+	"""
+
+	triangles = triangulate(polygon, holes, method)
+	if triangles.shape[0] == 0: return []
+
+	pts = triangulation_points(polygon, holes).data
+	return _merge_triangles([ Vector(x, y) for x, y in pts.tolist() ], triangles)
+
+
+class _TriangulationError(Exception):
+	"""Raised when the monotone partition runs into degenerate input"""
+	pass
+
+def _signed_area(pts, ring):
+	"""Get twice the signed area of a ring of indices into pts"""
+	r = pts[ring]
+	return float(numpy.dot(r[:, 0], numpy.roll(r[:, 1], -1)) - numpy.dot(numpy.roll(r[:, 0], -1), r[:, 1]))
+
+def _prepare_rings(pts, n_outline, hole_sizes):
+	"""Get the rings of vertex indices with the outline in the orientation of Polygon.regular and holes in the opposite orientation.
+
+	Consecutive duplicate points are dropped and degenerate rings are left out.
+
+	@return: A tuple (rings, area) of the list of rings, the outline first, and twice the area of the polygon with holes
+	"""
+
+	bounds = [0, n_outline]
+	for size in hole_sizes: bounds.append(bounds[-1] + size)
+
+	rings = []
+	area = 0.0
+	for k in range(len(bounds) - 1):
+		ring = []
+		for i in range(bounds[k], bounds[k + 1]):
+			if ring and (pts[i] == pts[ring[-1]]).all(): continue
+			ring.append(i)
+		while len(ring) > 1 and (pts[ring[0]] == pts[ring[-1]]).all(): ring.pop()
+
+		if len(ring) < 3:
+			if k == 0: return [], 0.0
+			continue
+
+		a = _signed_area(pts, ring)
+		if a == 0:
+			if k == 0: return [], 0.0
+			continue
+
+		# outline counter-clockwise, holes clockwise, so the inside is always left of the edges
+		if (a > 0) != (k == 0): ring.reverse()
+
+		area += abs(a) if k == 0 else -abs(a)
+		rings.append(ring)
+
+	return rings, area
+
+def _orient_triangles(pts, triangles):
+	"""Get the triangles as a Kx3 array, all in the orientation of Polygon.regular"""
+
+	t = numpy.array(triangles, dtype=numpy.intp).reshape(-1, 3)
+	if t.shape[0] == 0: return t
+
+	a, b, c = pts[t[:, 0]], pts[t[:, 1]], pts[t[:, 2]]
+	cross = (b[:, 0] - a[:, 0]) * (c[:, 1] - a[:, 1]) - (b[:, 1] - a[:, 1]) * (c[:, 0] - a[:, 0])
+
+	flip = cross < 0
+	t[flip, 1], t[flip, 2] = t[flip, 2], t[flip, 1].copy()
+	return t
+
+def _is_valid(pts, t, expected, area):
+	"""Check if a triangulation has the expected number of triangles and covers the polygon area exactly once"""
+
+	if t.shape[0] != expected: return False
+	if t.shape[0] == 0: return True
+
+	a, b, c = pts[t[:, 0]], pts[t[:, 1]], pts[t[:, 2]]
+	total = ((b[:, 0] - a[:, 0]) * (c[:, 1] - a[:, 1]) - (b[:, 1] - a[:, 1]) * (c[:, 0] - a[:, 0])).sum()
+
+	return abs(total - area) <= 1e-9 * max(abs(area), numpy.abs(pts).max() ** 2)
+
+def _above(verts, a, b):
+	"""Check if vertex a comes before vertex b in the sweep from top to bottom"""
+	va, vb = verts[a], verts[b]
+	return va.y > vb.y or (va.y == vb.y and va.x < vb.x)
+
+def _triangulate_monotone(verts, rings):
+	"""Triangulate by partitioning into y-monotone pieces with a sweep from top to bottom"""
+
+	nxt, prv = {}, {}
+	for ring in rings:
+		for k, i in enumerate(ring):
+			nxt[i] = ring[(k + 1) % len(ring)]
+			prv[i] = ring[k - 1]
+
+	def edge_ends(e):
+		a, b = e, nxt[e]
+		return (a, b) if _above(verts, a, b) else (b, a)
+
+	def right_of(e, v):
+		top, bottom = edge_ends(e)
+		return orientation_determinant(verts[top], verts[bottom], verts[v]) > 0
+
+	def left_edge(v):
+		"""Find the position of the first edge in the status that is not left of v"""
+		lo, hi = 0, len(status)
+		while lo < hi:
+			mid = (lo + hi) // 2
+			if right_of(status[mid], v): lo = mid + 1
+			else: hi = mid
+		return lo
+
+	def edge_left_of(v):
+		k = left_edge(v)
+		if k == 0: raise _TriangulationError()
+		return status[k - 1]
+
+	def insert(e, v):
+		status.insert(left_edge(v), e)
+		helper[e] = v
+
+	def remove(e):
+		try:
+			status.remove(e)
+		except ValueError:
+			raise _TriangulationError()
+
+	def diagonal_to_helper(v, e):
+		if e not in helper: raise _TriangulationError()
+		if kind[helper[e]] == _MERGE: diagonals.append((v, helper[e]))
+
+	order = sorted(nxt.keys(), key=lambda i: (-verts[i].y, verts[i].x))
+
+	kind = {}
+	for v in order:
+		p, n = prv[v], nxt[v]
+		p_below, n_below = _above(verts, v, p), _above(verts, v, n)
+		convex = orientation_determinant(verts[p], verts[v], verts[n]) > 0
+
+		if p_below and n_below: kind[v] = _START if convex else _SPLIT
+		elif not p_below and not n_below: kind[v] = _END if convex else _MERGE
+		else: kind[v] = _REGULAR
+
+	# edges are identified by their first vertex. the status holds the edges with the inside to their right, from left to right.
+	status = []
+	helper = {}
+	diagonals = []
+
+	for v in order:
+		k = kind[v]
+		e_prev = prv[v]
+
+		if k == _START:
+			insert(v, v)
+
+		elif k == _END:
+			diagonal_to_helper(v, e_prev)
+			remove(e_prev)
+
+		elif k == _SPLIT:
+			e = edge_left_of(v)
+			diagonals.append((v, helper[e]))
+			helper[e] = v
+			insert(v, v)
+
+		elif k == _MERGE:
+			diagonal_to_helper(v, e_prev)
+			remove(e_prev)
+			e = edge_left_of(v)
+			diagonal_to_helper(v, e)
+			helper[e] = v
+
+		elif _above(verts, prv[v], v):
+			# the inside is right of v
+			diagonal_to_helper(v, e_prev)
+			remove(e_prev)
+			insert(v, v)
+
+		else:
+			e = edge_left_of(v)
+			diagonal_to_helper(v, e)
+			helper[e] = v
+
+	triangles = []
+	for piece in _split_faces(verts, nxt, diagonals):
+		_triangulate_monotone_piece(verts, piece, triangles)
+
+	return triangles
+
+def _split_faces(verts, nxt, diagonals):
+	"""Split the polygon along the diagonals and get the faces as lists of vertices with the inside on the left"""
+
+	out_edges = dict((v, [n]) for v, n in nxt.items())
+	for a, b in set( (min(a, b), max(a, b)) for a, b in diagonals ):
+		if a == b or b in out_edges[a] or a in out_edges[b]: raise _TriangulationError()
+		out_edges[a].append(b)
+		out_edges[b].append(a)
+
+	def angle(v, w):
+		return math.atan2(verts[w].y - verts[v].y, verts[w].x - verts[v].x)
+
+	def next_vertex(u, w):
+		# the first outgoing edge of w clockwise from the edge back to u
+		back = angle(w, u)
+		best, best_turn = None, None
+		for x in out_edges[w]:
+			if x == u and len(out_edges[w]) > 1: continue
+			turn = (back - angle(w, x)) % (2 * math.pi)
+			if turn == 0: turn = 2 * math.pi
+			if best is None or turn < best_turn: best, best_turn = x, turn
+		return best
+
+	visited = set()
+	faces = []
+	for v in nxt:
+		for w in out_edges[v]:
+			if (v, w) in visited: continue
+
+			face = []
+			u, x = v, w
+			while (u, x) not in visited:
+				visited.add((u, x))
+				face.append(u)
+				u, x = x, next_vertex(u, x)
+
+				if len(face) > len(nxt): raise _TriangulationError()
+
+			if (u, x) != (v, w): raise _TriangulationError()
+			faces.append(face)
+
+	return faces
+
+def _triangulate_monotone_piece(verts, face, triangles):
+	"""Triangulate a y-monotone polygon given as a list of vertices with the inside on the left"""
+
+	n = len(face)
+	if n < 3: raise _TriangulationError()
+	if n == 3:
+		triangles.append(tuple(face))
+		return
+
+	key = lambda i: (-verts[i].y, verts[i].x)
+	top = min(range(n), key=lambda k: key(face[k]))
+	bottom = max(range(n), key=lambda k: key(face[k]))
+
+	# the vertices after the top vertex are on the left chain, down to the bottom vertex
+	left = set()
+	k = (top + 1) % n
+	while k != bottom:
+		left.add(face[k])
+		k = (k + 1) % n
+
+	order = sorted(face, key=key)
+	stack = [order[0], order[1]]
+
+	for j in range(2, n - 1):
+		u = order[j]
+		if (u in left) != (stack[-1] in left):
+			# u is on the other chain and sees all vertices on the stack
+			for a, b in zip(stack, stack[1:]):
+				triangles.append((u, a, b))
+			stack = [order[j - 1], u]
+		else:
+			last = stack.pop()
+			while stack:
+				o = orientation_determinant(verts[stack[-1]], verts[last], verts[u])
+				if not (o > 0 if u in left else o < 0): break
+
+				triangles.append((u, last, stack[-1]))
+				last = stack.pop()
+
+			stack.append(last)
+			stack.append(u)
+
+	u = order[-1]
+	for a, b in zip(stack, stack[1:]):
+		triangles.append((u, a, b))
+
+def _triangulate_ears(verts, rings):
+	"""Triangulate by bridging the holes into the outline and clipping ears"""
+
+	ring = _bridge_holes(verts, rings)
+
+	n = len(ring)
+	nxt = [ (k + 1) % n for k in range(n) ]
+	prv = [ (k - 1) % n for k in range(n) ]
+
+	def orientation(a, b, c):
+		return orientation_determinant(verts[ring[a]], verts[ring[b]], verts[ring[c]])
+
+	def is_ear(k):
+		a, b, c = prv[k], k, nxt[k]
+		if orientation(a, k, c) <= 0: return False
+
+		va, vb, vc = verts[ring[a]], verts[ring[b]], verts[ring[c]]
+		m = nxt[c]
+		while m != a:
+			p = verts[ring[m]]
+			if p != va and p != vb and p != vc and reflex[m] and \
+				orientation_determinant(va, vb, p) >= 0 and orientation_determinant(vb, vc, p) >= 0 and orientation_determinant(vc, va, p) >= 0:
+				return False
+			m = nxt[m]
+		return True
+
+	reflex = [ orientation(prv[k], k, nxt[k]) <= 0 for k in range(n) ]
+
+	triangles = []
+	remaining = n
+	k = 0
+	failures = 0
+	while remaining > 3:
+		if is_ear(k) or failures > remaining:
+			# clip the ear, or any vertex if there is none left due to degenerate input
+			a, c = prv[k], nxt[k]
+			triangles.append((ring[a], ring[k], ring[c]))
+
+			nxt[a], prv[c] = c, a
+			remaining -= 1
+			failures = 0
+
+			reflex[a] = orientation(prv[a], a, nxt[a]) <= 0
+			reflex[c] = orientation(prv[c], c, nxt[c]) <= 0
+			k = a
+		else:
+			failures += 1
+			k = nxt[k]
+
+	triangles.append((ring[prv[k]], ring[k], ring[nxt[k]]))
+	return triangles
+
+def _bridge_holes(verts, rings):
+	"""Merge the holes into the outline with pairs of bridge edges, giving a single ring that may visit vertices twice"""
+
+	outline = list(rings[0])
+
+	# merge the holes from right to left, so that the ray from a hole only ever hits the merged outline
+	holes = sorted(rings[1:], key=lambda h: -max(verts[i].x for i in h))
+	for hole in holes:
+		m = max(range(len(hole)), key=lambda k: (verts[hole[k]].x, -verts[hole[k]].y))
+		vm = verts[hole[m]]
+
+		k = _bridge_target(verts, outline, vm)
+		outline = outline[:k + 1] + hole[m:] + hole[:m + 1] + outline[k:]
+
+	return outline
+
+def _bridge_target(verts, outline, vm):
+	"""Find the position of an outline vertex that is visible from vm, casting a ray in positive x direction"""
+
+	n = len(outline)
+
+	# closest edge hit by the ray
+	best, best_x = None, None
+	for k in range(n):
+		a, b = verts[outline[k]], verts[outline[(k + 1) % n]]
+		if (a.y > vm.y) == (b.y > vm.y) and a.y != vm.y and b.y != vm.y: continue
+		if a.y == b.y:
+			if a.y != vm.y: continue
+			x = min(a.x, b.x)
+		else:
+			x = a.x + (vm.y - a.y) * (b.x - a.x) / (b.y - a.y)
+
+		if x < vm.x: continue
+		if best is None or x < best_x: best, best_x = k, x
+
+	if best is None: raise ValueError("Hole is not inside of the polygon")
+
+	a, b = best, (best + 1) % n
+	va, vb = verts[outline[a]], verts[outline[b]]
+	hit = Vector(best_x, vm.y)
+
+	if va == hit: return _visible_occurrence(verts, outline, a, vm)
+	if vb == hit: return _visible_occurrence(verts, outline, b, vm)
+
+	p = a if va.x > vb.x else b
+	vp = verts[outline[p]]
+
+	# reflex vertices in the triangle (vm, hit, vp) may hide vp, take the one closest in angle to the ray
+	tri = (vm, hit, vp) if orientation_determinant(vm, hit, vp) > 0 else (vm, vp, hit)
+	best_key = None
+	for k in range(n):
+		q = verts[outline[k]]
+		if q == vp or q.x < vm.x: continue
+		if orientation_determinant(verts[outline[k - 1]], q, verts[outline[(k + 1) % n]]) > 0: continue
+
+		if orientation_determinant(tri[0], tri[1], q) >= 0 and orientation_determinant(tri[1], tri[2], q) >= 0 and orientation_determinant(tri[2], tri[0], q) >= 0:
+			d = q - vm
+			key = (abs(d.y) / d.length if d.length > 0 else 0, d.length_squared)
+			if best_key is None or key < best_key: p, best_key = k, key
+
+	return _visible_occurrence(verts, outline, p, vm)
+
+def _visible_occurrence(verts, outline, p, vm):
+	"""Get the occurrence of the vertex at position p in the outline whose inside angle contains the direction to vm"""
+
+	n = len(outline)
+	vp = verts[outline[p]]
+
+	for k in range(n):
+		if verts[outline[k]] != vp: continue
+
+		a, c = verts[outline[k - 1]], verts[outline[(k + 1) % n]]
+		if orientation_determinant(a, vp, c) >= 0:
+			inside = orientation_determinant(a, vp, vm) >= 0 and orientation_determinant(vp, c, vm) >= 0
+		else:
+			inside = orientation_determinant(a, vp, vm) >= 0 or orientation_determinant(vp, c, vm) >= 0
+
+		if inside: return k
+
+	return p
+
+def _merge_triangles(verts, triangles):
+	"""Merge triangles into convex pieces by removing diagonals (Hertel-Mehlhorn).
+
+	The triangles are stored as half-edges 3*i+c starting at corner c of triangle i. Removing a diagonal relinks the
+	half-edges around it, so every merge takes constant time.
+	"""
+
+	k = triangles.shape[0]
+	origin = triangles.ravel().tolist()
+
+	nxt = [ 3 * (h // 3) + (h + 1) % 3 for h in range(3 * k) ]
+	prv = [ 3 * (h // 3) + (h + 2) % 3 for h in range(3 * k) ]
+
+	edges = dict(((origin[h], origin[nxt[h]]), h) for h in range(3 * k))
+	alive = [True] * (3 * k)
+
+	# the piece of every triangle, to never merge a piece with itself in degenerate input
+	piece = list(range(k))
+	def find(i):
+		while piece[i] != i:
+			piece[i] = piece[piece[i]]
+			i = piece[i]
+		return i
+
+	for h in range(3 * k):
+		a, b = origin[h], origin[nxt[h]]
+		t = edges.get((b, a))
+		if t is None or t < h: continue
+
+		fh, ft = find(h // 3), find(t // 3)
+		if fh == ft: continue
+
+		# the angles at a and b of the merged piece must not be reflex
+		if orientation_determinant(verts[origin[prv[h]]], verts[a], verts[origin[nxt[nxt[t]]]]) < 0: continue
+		if orientation_determinant(verts[origin[prv[t]]], verts[b], verts[origin[nxt[nxt[h]]]]) < 0: continue
+
+		ph, nh, pt, nt = prv[h], nxt[h], prv[t], nxt[t]
+		nxt[ph], prv[nt] = nt, ph
+		nxt[pt], prv[nh] = nh, pt
+
+		alive[h] = alive[t] = False
+		piece[ft] = fh
+
+	pieces = []
+	for h in range(3 * k):
+		if not alive[h]: continue
+
+		face = []
+		e = h
+		while alive[e]:
+			alive[e] = False
+			face.append(origin[e])
+			e = nxt[e]
+
+		pieces.append(numpy.array(face, dtype=numpy.intp))
+
+	return pieces
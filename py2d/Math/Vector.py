@@ -12,8 +12,11 @@ class Vector(object):
 		- v[0], v[1]
 		- x,y = v.as_tuple()
 
+	Vectors are slotted to keep them small, since large numbers of them end up in point lists, sets and dicts.
 	"""
 
+	__slots__ = ('x', 'y')
+
 	def __init__(self, x, y):
 		"""Create a new vector object.
 
@@ -64,6 +67,28 @@ class Vector(object):
 		"""Convert the vector to a non-object tuple"""
 		return (self.x, self.y)
 
+	def iadd(self, b):
+		"""Add the vector b to this vector in-place, returning this vector.
+
+		Unlike the + operator, this will not allocate a new vector, so it is useful in tight loops.
+		Be aware that all other references to this vector will see the change.
+		"""
+		self.x += b.x
+		self.y += b.y
+		return self
+
+	def isub(self, b):
+		"""Subtract the vector b from this vector in-place, returning this vector."""
+		self.x -= b.x
+		self.y -= b.y
+		return self
+
+	def imul(self, val):
+		"""Scale this vector by the scalar val in-place, returning this vector."""
+		self.x *= val
+		self.y *= val
+		return self
+
 	def __add__(self, b):
 		return Vector(self.x + b.x, self.y + b.y)
 
@@ -88,14 +113,18 @@ class Vector(object):
 
 	def __eq__(self, other):
 		if not isinstance(other, Vector): return False
-		d = self - other
-		return abs(d.x) < EPSILON and abs(d.y) < EPSILON
+		return abs(self.x - other.x) < EPSILON and abs(self.y - other.y) < EPSILON
 
 	def __ne__(self, other):
 		return not self.__eq__(other)
 
 	def __hash__(self):
-		return hash("%.4f %.4f" % (self.x, self.y))
+		# quantize to the EPSILON grid so that vectors that compare equal will usually share a hash
+		try:
+			return hash((_floor(self.x * _HASH_SCALE + 0.5), _floor(self.y * _HASH_SCALE + 0.5)))
+		except (OverflowError, ValueError):
+			# inf and nan cannot be quantized
+			return hash((self.x, self.y))
 
 	def __getitem__(self, key):
 		if key == 0: return self.x
@@ -116,3 +145,5 @@ VECTOR_NULL = Vector(0,0)
 VECTOR_X = Vector(1,0)
 VECTOR_Y = Vector(0,1)
 EPSILON = 0.0001
+_HASH_SCALE = round(1 / EPSILON)
+_floor = math.floor
@@ -0,0 +1,214 @@
+# cython: language_level=3
+
+"""Contiguous arrays of 2D vectors for batched point math"""
+
+import itertools
+import numpy
+
+from py2d.Math.Vector import *
+
+class VectorArray(object):
+	"""Class for arrays of 2D Vectors backed by a contiguous float64 Nx2 NumPy buffer.
+
+	A VectorArray behaves like a list of Vectors for indexing and iteration, but all arithmetic is done on the whole buffer at once:
+
+		- a + b, a - b for VectorArrays, single Vectors or broadcastable NumPy arrays
+		- a * s, a / s for scalars or arrays of N scalars
+		- a * b or a.dot(b) for the row-wise dot product
+
+	The raw buffer is available as a.data, its columns as a.x and a.y.
+	"""
+
+	__slots__ = ('data',)
+
+	def __init__(self, data):
+		"""Create a new vector array.
+
+		@type data: numpy.ndarray
+		@param data: Anything convertible to an Nx2 float64 array. The buffer will not be copied if it already has the right type and layout.
+		"""
+
+		data = numpy.ascontiguousarray(data, dtype=numpy.float64)
+
+		if data.size == 0: data = data.reshape(0, 2)
+
+		if data.ndim != 2 or data.shape[1] != 2:
+			raise ValueError("Expected an Nx2 array, got shape %s" % (data.shape,))
+
+		self.data = data
+
+	@staticmethod
+	def zeros(n):
+		"""Create a vector array of n null vectors"""
+		return VectorArray(numpy.zeros((n, 2)))
+
+	@staticmethod
+	def from_vectors(vectors):
+		"""Create a vector array from a list of Vectors
+
+		@type vectors: List
+		@param vectors: List of Vectors (or other objects with x and y attributes)
+		"""
+		flat = numpy.fromiter(itertools.chain.from_iterable((v.x, v.y) for v in vectors), dtype=numpy.float64, count=2 * len(vectors))
+		return VectorArray(flat.reshape(-1, 2))
+
+	@staticmethod
+	def from_tuples(tuples):
+		"""Create a vector array from 2-tuples
+
+		@type tuples: List
+		@param tuples: List of tuples of x,y coordinates
+		"""
+		return VectorArray(numpy.array(tuples, dtype=numpy.float64).reshape(-1, 2))
+
+	def as_vectors(self):
+		"""Convert the vector array to a list of new Vector objects"""
+		return [Vector(x, y) for x, y in self.data.tolist()]
+
+	def as_tuple_list(self):
+		"""Convert the vector array to a list of 2-tuples"""
+		return [(x, y) for x, y in self.data.tolist()]
+
+	def clone(self):
+		"""Return a copy of this vector array that does not share its buffer"""
+		return VectorArray(self.data.copy())
+
+	def get_x(self):
+		"""Get a view of the x components"""
+		return self.data[:, 0]
+
+	def get_y(self):
+		"""Get a view of the y components"""
+		return self.data[:, 1]
+
+	def get_lengths(self):
+		"""Get the lengths of all vectors as an array"""
+		return numpy.sqrt(self.get_lengths_squared())
+
+	def get_lengths_squared(self):
+		"""Get the squared lengths of all vectors as an array, not calculating the square root for a performance gain"""
+		return numpy.einsum('ij,ij->i', self.data, self.data)
+
+	def dot(self, b):
+		"""Get the row-wise dot product with a VectorArray, a single Vector or an Nx2 array"""
+		if isinstance(b, Vector): return self.data.dot((b.x, b.y))
+		return numpy.einsum('ij,ij->i', self.data, _operand(b))
+
+	def normalize(self):
+		"""Return a normalized version of the vector array where every vector has a length of 1.
+
+		Null vectors will stay null vectors instead of producing NaNs.
+		"""
+		lengths = self.get_lengths()
+		lengths[lengths == 0] = 1
+		return VectorArray(self.data / lengths[:, numpy.newaxis])
+
+	def normal(self):
+		"""Return the normal vectors of all vectors in the array"""
+		out = numpy.empty_like(self.data)
+		out[:, 0] = -self.data[:, 1]
+		out[:, 1] = self.data[:, 0]
+		return VectorArray(out)
+
+	def iadd(self, b):
+		"""Add b to all vectors in-place, returning this vector array."""
+		self.data += _operand(b)
+		return self
+
+	def isub(self, b):
+		"""Subtract b from all vectors in-place, returning this vector array."""
+		self.data -= _operand(b)
+		return self
+
+	def imul(self, val):
+		"""Scale all vectors by val in-place, returning this vector array.
+
+		val can either be a scalar or an array of N scalars.
+		"""
+		self.data *= _scalars(val)
+		return self
+
+	def __add__(self, b):
+		return VectorArray(self.data + _operand(b))
+
+	def __sub__(self, b):
+		return VectorArray(self.data - _operand(b))
+
+	def __neg__(self):
+		return VectorArray(-self.data)
+
+	def __mul__(self, val):
+		if isinstance(val, (VectorArray, Vector)):
+			return self.dot(val)
+		else:
+			return VectorArray(self.data * _scalars(val))
+
+	def __truediv__(self, val):
+		return VectorArray(self.data / _scalars(val))
+
+	def __len__(self):
+		return self.data.shape[0]
+
+	def __iter__(self):
+		return iter(self.as_vectors())
+
+	def __getitem__(self, key):
+		if isinstance(key, slice): return VectorArray(self.data[key])
+
+		x, y = self.data[key]
+		return Vector(float(x), float(y))
+
+	def __setitem__(self, key, value):
+		self.data[key] = _operand(value)
+
+	def __array__(self, dtype=None, copy=None):
+		if dtype is not None and self.data.dtype != dtype:
+			if copy is False: raise ValueError("Cannot convert to %s without copying" % numpy.dtype(dtype))
+			return self.data.astype(dtype)
+		return self.data.copy() if copy else self.data
+
+	def __repr__(self):
+		pts = ["(%.2f, %.2f)" % (x, y) for x, y in self.data.tolist()]
+		return "VectorArray [%s]" % ", ".join(pts)
+
+	x = property(get_x)
+	y = property(get_y)
+
+	lengths = property(get_lengths)
+	lengths_squared = property(get_lengths_squared)
+
+
+def as_vector_array(points):
+	"""Get a VectorArray for points without copying where possible.
+
+	This is the common entry point for all batched functions. It accepts:
+
+		- VectorArrays, which are returned as-is
+		- Nx2 NumPy arrays, which are wrapped without copying if they are contiguous float64
+		- Objects with an as_vector_array method, e.g. Polygons
+		- Lists of Vectors or 2-tuples
+
+	@type points: VectorArray
+	@param points: The points to convert
+	"""
+
+	if isinstance(points, VectorArray): return points
+	if isinstance(points, numpy.ndarray): return VectorArray(points)
+	if hasattr(points, "as_vector_array"): return points.as_vector_array()
+
+	if len(points) > 0 and isinstance(points[0], Vector):
+		return VectorArray.from_vectors(points)
+
+	return VectorArray.from_tuples(points)
+
+
+def _operand(b):
+	"""Get something that can be broadcast against an Nx2 buffer"""
+	if isinstance(b, VectorArray): return b.data
+	if isinstance(b, Vector): return numpy.array((b.x, b.y))
+	return b
+
+def _scalars(val):
+	"""Get something that scales the rows of an Nx2 buffer"""
+	if isinstance(val, numpy.ndarray) and val.ndim == 1: return val[:, numpy.newaxis]
+	return val
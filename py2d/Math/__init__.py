@@ -3,6 +3,16 @@
 """Math utilities for games"""
 
 from py2d.Math.Vector import *
+from py2d.Math.VectorArray import *
+from py2d.Math.Segments import *
+from py2d.Math.PreparedPolygon import *
 from py2d.Math.Polygon import *
+from py2d.Math.ArrayPolygon import *
+from py2d.Math.Hull import *
+from py2d.Math.RTree import *
+from py2d.Math.SegmentBVH import *
+from py2d.Math.SpatialHash import *
 from py2d.Math.Transform import *
+from py2d.Math.Triangulation import *
+from py2d.Math.Boolean import *
 from py2d.Math.Operations import *
@@ -20,22 +20,25 @@ class NavMesh(object):
 		self.update_nav()
 
 	@staticmethod
-	def generate(boundary, walls=[], distance_function=poly_midpoint_distance):
+	def generate(boundary, walls=[], distance_function=poly_midpoint_distance, decompose_method="mp3"):
 		"""Generate a new navigation mesh from a boundary polygon and a list of walls.
 
 		The method will delete wall areas from the boundary polygon and then decompose the resulting polygon into convex polygons, generating a navigation graph in the process.
 
 		@type boundary: Polygon
-		@param boundary: The boundary of the navigable area.
+		@param boundary: The boundary of the navigable area. This may also be a L{py2d.Math.Polygon.MultiPolygon}, for which the walls are subtracted from the islands.
 
 		@type walls: List
 		@param walls: List of Wall Polygons to subtract from the boundary polygon. These may intersect the polygon boundary or be properly inside the polygon.
 
 		@type distance_function: Function
 		@param distance_function: Function of the type f(p_a, p_b) that returns the distance between polygon objects p_a and p_b according to some metric.
+
+		@type decompose_method: str
+		@param decompose_method: The convex decomposition method, see L{py2d.Math.Polygon.convex_decompose}. Use "hertel_mehlhorn" for large meshes.
 		"""
 
-		convex_decomp = py2d.Math.Polygon.convex_decompose(boundary, walls)
+		convex_decomp = py2d.Math.Polygon.convex_decompose(boundary, walls, method=decompose_method)
 
 		# make NavPolygons out of the convex decomposition polygons
 		polygons = [NavPolygon(poly) for poly in convex_decomp]
@@ -66,6 +69,9 @@ class NavMesh(object):
 		This is called automatically upon mesh initialization, but you might want to call it if you have changed the navigation mesh.
 		"""
 
+		# the point location index is rebuilt on demand
+		self._index = None
+
 		# initialize with simple distances
 		self._nav_data = [
 			[
@@ -88,11 +94,12 @@ class NavMesh(object):
 
 	def find_polygon(self, p):
 		"""Find the NavPolygon that contains p"""
-		for poly in self._polygons:
-			if poly.contains_point(p):
-				return poly
 
-		return None
+		# index the polygons by their bounding boxes on first use
+		if self._index is None: self._index = py2d.Math.RTree(self._polygons)
+
+		polys = self._index.find(p)
+		return polys[0] if polys else None
 
 
 	def get_path(self, start, stop):
@@ -158,6 +165,9 @@ class NavPolygon(py2d.Math.Polygon):
 		self.points = polygon.points
 		self.neighbors = {}
 
+	# NavPolygons are graph nodes and compared by identity in the neighbor dicts
+	__hash__ = object.__hash__
+
 
 class NavPath(object):
 	"""Class representing a solved navigation path"""
@@ -178,7 +188,7 @@ class NavPath(object):
 
 		current_polys = []
 		for poly in self._polygons:
-			if poly.contains_point(position):
+			if poly.prepare().contains_point(position):
 				current_polys.append(poly)
 
 		i = max((self._polygons.index(p) for p in current_polys))
@@ -11,7 +11,7 @@ from xml.etree import ElementTree
 import re
 import warnings
 from collections import deque
-from py2d.Math import Polygon, Vector, Transform
+from py2d.Math import Polygon, Vector, Transform, RTree
 from py2d.Bezier import flatten_cubic_bezier, flatten_quadratic_bezier
 
 def convert_svg(f, transform=Transform.unit(), bezier_max_divisions=None, bezier_max_flatness=0.1):
@@ -32,20 +32,19 @@ def convert_svg(f, transform=Transform.unit(), bezier_max_divisions=None, bezier
 	def transform_element(e, transform):
 		new_t = e.get("transform", "")
 
+		# element coordinates are first transformed by the element transform, then by the parent transforms
 		nt = transform
 		m = re.match(r'translate\((?P<x>[0-9.-]+),(?P<y>[0-9.-]+)\)', new_t)
 		if m:
 			x, y = float(m.group("x")), float(m.group("y"))
-			nt = Transform.move(x,y) * nt
+			nt = nt * Transform.move(x,y)
 
 		m = re.match(r'matrix\((?P<a>[0-9.-]+),(?P<b>[0-9.-]+),(?P<c>[0-9.-]+),(?P<d>[0-9.-]+),(?P<e>[0-9.-]+),(?P<f>[0-9.-]+)\)', new_t)
 		if m:
 			a,b,c,d,e,f = ( float(m.group(l)) for l in "abcdef" )
 
-			import pdb; pdb.set_trace()
-			nt = Transform([[ a, c, e ],
-			                [ b, d, f ],
-					[ 0, 0, 1 ]]) * nt
+			nt = nt * Transform.from_coefficients(a, c, e,
+			                                      b, d, f)
 
 		return nt
 
@@ -152,7 +151,7 @@ def convert_svg(f, transform=Transform.unit(), bezier_max_divisions=None, bezier
 			elif cmd == "z":
 				# close line by only moving relative_pos to first vertex
 
-				polys.append(transform * Polygon.from_pointlist(verts))
+				polys.append(Polygon.from_pointlist(verts))
 				relative_pos = verts[0]
 				verts = []
 
@@ -163,10 +162,11 @@ def convert_svg(f, transform=Transform.unit(), bezier_max_divisions=None, bezier
 				break
 
 		if verts:
-			polys.append(transform * Polygon.from_pointlist(verts))
+			polys.append(Polygon.from_pointlist(verts))
 		#print "----"
 
-		return id, polys
+		# transform all polygons of the path in one pass
+		return id, transform.apply_polygons(polys)
 
 	out = {}
 	for p,tr in path_find(et.getroot(), transform):
@@ -175,5 +175,32 @@ def convert_svg(f, transform=Transform.unit(), bezier_max_divisions=None, bezier
 
 	return out
 
+def build_hit_index(polygons):
+	"""Build an R-tree for hit tests on converted SVG polygons.
+
+	@type polygons: dict
+	@param polygons: A hash of ids to lists of polygons as returned by L{convert_svg}
+
+	@return: An RTree over the outline polygons, with the ids as values
+	"""
+	ids = [ id for id, polys in polygons.items() if polys ]
+	return RTree([ polygons[id][0] for id in ids ], values=ids)
+
+def hit_test(polygons, index, p):
+	"""Find all converted SVG paths that contain a point.
+
+	@type polygons: dict
+	@param polygons: A hash of ids to lists of polygons as returned by L{convert_svg}
+
+	@type index: RTree
+	@param index: An index of the polygons built with L{build_hit_index}
+
+	@type p: Vector
+	@param p: The point to test
+
+	@return: The list of ids of all paths whose outline contains p, unless p is inside one of their holes
+	"""
+	return [ id for id in index.find(p) if not any(hole.prepare().contains_point(p) == 1 for hole in polygons[id][1:]) ]
+
 if __name__ == "__main__":
 	print(convert_svg("py2d/examples/shapes.svg"))
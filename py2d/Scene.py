@@ -0,0 +1,137 @@
+# cython: language_level=3
+
+"""Scene graph of nested transformations with cached world transformations"""
+
+from py2d.Math import Transform
+
+class SceneNode(object):
+	"""Class for a node in a transformation hierarchy.
+
+	Every node has a local transformation relative to its parent and an optional list of polygons in local coordinates.
+	The world transformation (parent world transformation * local transformation) and the world-space polygons are
+	computed lazily and cached until the node or one of its ancestors changes, so static subtrees cost nothing to query.
+
+		>>> root = SceneNode(Transform.move(10, 0))
+		>>> child = SceneNode(Transform.scale(2, 2), [Polygon.regular(Vector(0, 0), 1, 4)])
+		>>> root.add_child(child)
+		>>> child.get_world_polygons()
+		[Polygon [(12.00, 0.00), (10.00, 2.00), (8.00, 0.00), (10.00, -2.00)]]
+	"""
+
+	def __init__(self, transform=None, polygons=None):
+		"""Create a new scene node.
+
+		@type transform: Transform
+		@param transform: The transformation of the node relative to its parent. Defaults to the unit transformation.
+
+		@type polygons: List
+		@param polygons: A list of polygons attached to the node, in local coordinates
+		"""
+
+		self._transform = transform if transform is not None else Transform.unit()
+		self._polygons = polygons if polygons is not None else []
+
+		self._parent = None
+		self._children = []
+
+		self._world_transform = None
+		self._world_polygons = None
+
+	def add_child(self, node):
+		"""Attach node as a child of this node, detaching it from its previous parent"""
+
+		if node._parent is not None: node._parent.remove_child(node)
+
+		node._parent = self
+		self._children.append(node)
+		node.invalidate()
+
+	def remove_child(self, node):
+		"""Detach the child node from this node"""
+
+		self._children.remove(node)
+		node._parent = None
+		node.invalidate()
+
+	def invalidate(self):
+		"""Mark the cached world data of this node and all of its descendants as outdated.
+
+		This is called automatically when transformations or the hierarchy change.
+		"""
+
+		# a node with no cached world transformation cannot have descendants with cached world transformations
+		if self._world_transform is None and self._world_polygons is None: return
+
+		self._world_transform = None
+		self._world_polygons = None
+
+		for child in self._children:
+			child.invalidate()
+
+	def get_transform(self):
+		"""Get the transformation of the node relative to its parent"""
+		return self._transform
+
+	def set_transform(self, transform):
+		"""Set the transformation of the node relative to its parent"""
+		self._transform = transform
+		self.invalidate()
+
+	def get_world_transform(self):
+		"""Get the transformation from local coordinates of this node to world coordinates"""
+
+		if self._world_transform is None:
+			if self._parent is None:
+				self._world_transform = self._transform
+			else:
+				self._world_transform = self._parent.get_world_transform() * self._transform
+
+		return self._world_transform
+
+	def get_polygons(self):
+		"""Get the polygons attached to this node in local coordinates"""
+		return self._polygons
+
+	def set_polygons(self, polygons):
+		"""Set the polygons attached to this node in local coordinates"""
+		self._polygons = polygons
+		self._world_polygons = None
+
+	def get_world_polygons(self):
+		"""Get the polygons attached to this node in world coordinates.
+
+		The polygons are transformed in a single pass on first access and cached until the node changes.
+		"""
+
+		if self._world_polygons is None:
+			self._world_polygons = self.get_world_transform().apply_polygons(self._polygons)
+
+		return self._world_polygons
+
+	def walk(self):
+		"""Generator function that yields this node and all of its descendants in depth-first order"""
+
+		stack = [self]
+		while stack:
+			node = stack.pop()
+			yield node
+			stack.extend(reversed(node._children))
+
+	def get_all_world_polygons(self):
+		"""Get the world polygons of this node and all of its descendants as a flat list"""
+		return [poly for node in self.walk() for poly in node.get_world_polygons()]
+
+	def get_parent(self):
+		return self._parent
+
+	def get_children(self):
+		return self._children
+
+	transform = property(get_transform, set_transform)
+	world_transform = property(get_world_transform)
+
+	polygons = property(get_polygons, set_polygons)
+	world_polygons = property(get_world_polygons)
+
+	parent = property(get_parent)
+	children = property(get_children)
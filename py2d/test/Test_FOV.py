@@ -0,0 +1,21 @@
+import unittest
+from py2d.Math import *
+from py2d.FOV import Vision
+
+class TestVision(unittest.TestCase):
+
+	def setUp(self):
+		self.boundary = Polygon.regular(Vector(0, 0), 20, 12)
+
+	def test_open(self):
+		vision = Vision([[Vector(-30, 1), Vector(30, 1)]]).get_vision(Vector(0, 0), 20, Polygon.regular(Vector(0, 0), 20, 4))
+		self.assertEqual( [Vector(20, 0), Vector(19, 1), Vector(-19, 1), Vector(-20, 0), Vector(0, -20)], vision.points )
+
+	def test_enclosed(self):
+		# the eye is enclosed by crossing obstructors, so that no points are visible
+		obstructors = [[Vector(14, -16), Vector(-5, 16), Vector(-12, 1), Vector(-3, 16)], [Vector(-8, 0), Vector(16, 2), Vector(-11, 10), Vector(-7, -1)]]
+		vision = Vision(obstructors).get_vision(Vector(-5, 5), 40, self.boundary)
+		self.assertTrue( len(vision.points) <= 1 )
+
+if __name__ == '__main__':
+	unittest.main()
@@ -1,4 +1,6 @@
 import unittest
+import math
+import numpy
 from py2d.Math import *
 
 class TestVector(unittest.TestCase):
@@ -103,12 +105,91 @@ class TestVector(unittest.TestCase):
 
 	def test_hash(self):
 		self.assertEqual( hash(self.u), hash(Vector(3.0, 2.0) + self.y * 2) )
+		self.assertEqual( hash(Vector(0.1 + 0.2, 0)), hash(Vector(0.3, 0)) )
+		self.assertEqual( hash(Vector(-0.00001, 0)), hash(Vector(0.00001, 0)) )
+		self.assertEqual( 1, len(set([Vector(1, 2), Vector(1.00001, 2), Vector(1, 2.00001)])) )
+
+	def test_slots(self):
+		self.assertFalse( hasattr(self.u, "__dict__") )
+		self.assertRaises( AttributeError, setattr, self.u, "z", 1 )
+
+	def test_inplace(self):
+		w = self.w
+		self.assertTrue( w.iadd(self.v) is w )
+		self.assertEqual( Vector(2.5, 3.75), w )
+
+		w.isub(self.v)
+		self.assertEqual( Vector(0.5, 0.75), w )
+
+		w.imul(4)
+		self.assertEqual( Vector(2, 3), w )
+		self.assertEqual( Vector(2.0, 3.0), self.v )
 
 	def test_slope(self):
 
 		self.assertEqual(float('inf'), self.y.slope)
 		self.assertEqual(1.5, self.v.slope)
 
+class TestVectorArray(unittest.TestCase):
+
+	def setUp(self):
+		self.vectors = [ Vector(3.0, 4.0), Vector(2.0, 3.0), Vector(0.0, 0.0) ]
+		self.a = VectorArray.from_vectors(self.vectors)
+
+	def test_conversion(self):
+		self.assertEqual( (3, 2), self.a.data.shape )
+		self.assertEqual( self.vectors, self.a.as_vectors() )
+		self.assertEqual( [(3.0, 4.0), (2.0, 3.0), (0.0, 0.0)], self.a.as_tuple_list() )
+		self.assertEqual( self.vectors, VectorArray.from_tuples(self.a.as_tuple_list()).as_vectors() )
+		self.assertEqual( 0, len(VectorArray.from_vectors([])) )
+
+		self.assertRaises( ValueError, VectorArray, [1, 2, 3] )
+
+		self.assertTrue( numpy.shares_memory(self.a.data, numpy.asarray(self.a)) )
+		self.assertFalse( numpy.shares_memory(self.a.data, numpy.array(self.a)) )
+
+	def test_polygon_conversion(self):
+		poly = Polygon.from_pointlist(self.vectors)
+		self.assertEqual( self.vectors, poly.as_vector_array().as_vectors() )
+		self.assertEqual( poly, Polygon.from_vector_array(self.a) )
+
+		self.assertTrue( as_vector_array(self.a) is self.a )
+		self.assertEqual( self.vectors, as_vector_array(poly).as_vectors() )
+		self.assertEqual( self.vectors, as_vector_array(self.vectors).as_vectors() )
+		self.assertEqual( self.vectors, as_vector_array(self.a.data).as_vectors() )
+
+	def test_item_access(self):
+		self.assertEqual( Vector(2, 3), self.a[1] )
+		self.assertEqual( [Vector(2, 3), Vector(0, 0)], self.a[1:].as_vectors() )
+
+		self.a[2] = Vector(1, 1)
+		self.assertEqual( Vector(1, 1), self.a[2] )
+		self.assertEqual( [1.0, 1.0], [self.a.x[2], self.a.y[2]] )
+
+	def test_arithmetic(self):
+		self.assertEqual( [Vector(4, 5), Vector(3, 4), Vector(1, 1)], (self.a + Vector(1, 1)).as_vectors() )
+		self.assertEqual( [Vector(0, 0)] * 3, (self.a - self.a).as_vectors() )
+		self.assertEqual( [Vector(6, 8), Vector(4, 6), Vector(0, 0)], (self.a * 2).as_vectors() )
+		self.assertEqual( [Vector(1.5, 2), Vector(1, 1.5), Vector(0, 0)], (self.a / 2).as_vectors() )
+		self.assertEqual( [25, 13, 0], list(self.a * self.a) )
+		self.assertEqual( [3, 2, 0], list(self.a.dot(Vector(1, 0))) )
+
+	def test_inplace(self):
+		data = self.a.data
+		self.a.iadd(Vector(1, 1)).imul(numpy.array([1, 2, 3])).isub(self.a)
+		self.assertTrue( self.a.data is data )
+		self.assertEqual( [Vector(0, 0)] * 3, self.a.as_vectors() )
+
+	def test_length(self):
+		self.assertEqual( [5, 13 ** 0.5, 0], list(self.a.lengths) )
+		self.assertEqual( [25, 13, 0], list(self.a.lengths_squared) )
+
+	def test_normalize(self):
+		self.assertEqual( [v.normalize() for v in self.vectors[:2]] + [Vector(0, 0)], self.a.normalize().as_vectors() )
+
+	def test_normal(self):
+		self.assertEqual( [v.normal() for v in self.vectors], self.a.normal().as_vectors() )
+
 class TestPolygon(unittest.TestCase):
 
 	def setUp(self):
@@ -171,6 +252,79 @@ class TestPolygon(unittest.TestCase):
 	def test_clockwise(self):
 		self.assertFalse(self.irregular.is_clockwise())
 
+	def test_self_intersecting(self):
+		self.assertFalse( self.square.is_self_intersecting() )
+		self.assertFalse( self.irregular.is_self_intersecting() )
+		self.assertEqual( [], self.irregular.is_self_intersecting(all_pairs=True) )
+
+		bowtie = Polygon.from_tuples([(0, 0), (2, 2), (2, 0), (0, 2)])
+		self.assertTrue( bowtie.is_self_intersecting() )
+		self.assertEqual( [(0, 2)], bowtie.is_self_intersecting(all_pairs=True) )
+
+		# a vertex touching another edge, and collinear overlapping edges
+		self.assertTrue( Polygon.from_tuples([(0, 0), (4, 0), (4, 4), (2, 0), (0, 4)]).is_self_intersecting() )
+		self.assertEqual( [(0, 2), (0, 3), (0, 4)], Polygon.from_tuples([(0, 0), (4, 0), (4, 2), (3, 0), (1, 0), (1, -2)]).is_self_intersecting(all_pairs=True) )
+
+		# a large simple polygon, then with two points swapped
+		pts = [ Vector(math.cos(k * math.pi / 500), math.sin(k * math.pi / 500)) for k in range(1000) ]
+		self.assertFalse( Polygon.is_self_intersecting_s(pts) )
+		pts[10], pts[12] = pts[12], pts[10]
+		self.assertTrue( Polygon.is_self_intersecting_s(pts) )
+		self.assertEqual( [(9, 12)], Polygon.is_self_intersecting_s(pts, all_pairs=True) )
+
+	def test_bounds(self):
+		self.assertEqual( (0, 1, 4, 5), self.irregular.bounds )
+		self.assertEqual( (0, 1, 4, 5), (self.irregular.left, self.irregular.top, self.irregular.right, self.irregular.bottom) )
+		self.assertEqual( 4, self.irregular.width )
+		self.assertEqual( 4, self.irregular.height )
+
+	def test_area(self):
+		self.assertAlmostEqual( 18, self.square.area )
+		self.assertAlmostEqual( 7.5, self.irregular.area )
+
+		self.assertEqual( self.irregular.is_clockwise(), self.irregular.signed_area > 0 )
+		self.irregular.flip()
+		self.assertEqual( self.irregular.is_clockwise(), self.irregular.signed_area > 0 )
+
+	def test_centroid(self):
+		self.assertEqual( Vector(10, 30), self.square.centroid )
+
+		# adding a collinear point moves the vertex mean, but not the area centroid
+		box = Polygon.from_tuples([(0, 0), (1, 0), (2, 0), (3, 0), (4, 0), (4, 2), (0, 2)])
+		self.assertEqual( Vector(2, 1), box.centroid )
+		self.assertNotEqual( Vector(2, 1), box.center )
+
+	def test_cache_invalidation(self):
+		poly = Polygon.from_tuples([(0, 0), (4, 0), (4, 4), (2, 1), (0, 4)])
+		self.assertFalse( poly.is_convex() )
+		self.assertEqual( 4, poly.bottom )
+		area = poly.area
+
+		poly[3] = Vector(2, 5)
+		self.assertTrue( poly.is_convex() )
+		self.assertEqual( 5, poly.bottom )
+		self.assertNotEqual( area, poly.area )
+
+		poly.add_point( Vector(-10, 1) )
+		self.assertEqual( -10, poly.left )
+
+		del poly[5]
+		self.assertEqual( 0, poly.left )
+
+		poly.add_points( [Vector(1, -5)] )
+		self.assertEqual( -5, poly.top )
+
+		self.irregular.points = [Vector(0, 0), Vector(1, 0), Vector(0, 1)]
+		self.assertEqual( 0.5, self.irregular.area )
+
+		self.irregular.points[1] = Vector(2, 0)
+		self.irregular.invalidate()
+		self.assertEqual( 1, self.irregular.area )
+
+		clockwise = self.irregular.is_clockwise()
+		self.irregular.flip()
+		self.assertEqual( not clockwise, self.irregular.is_clockwise() )
+
 	def test_flip(self):
 		self.irregular.flip()
 		self.assertTrue(self.irregular.is_clockwise())
@@ -186,6 +340,26 @@ class TestPolygon(unittest.TestCase):
 		self.assertEqual(0, self.irregular.contains_point(Vector(0,1)))
 		self.assertEqual(0, self.irregular.contains_point(Vector(0,0)))
 
+	def test_contains_points(self):
+		points = [Vector(2,2), Vector(1,2), Vector(2,4), Vector(1,1), Vector(2,1.5), Vector(0,4), Vector(0,1), Vector(0,0)]
+		result = self.irregular.contains_points(points)
+
+		self.assertEqual( numpy.int8, result.dtype )
+		self.assertEqual( [1, 1, 2, 2, 2, 0, 0, 0], list(result) )
+		self.assertEqual( [1, 1, 2, 2, 2, 0, 0, 0], list(Polygon.contains_points_s(self.irregular.points, VectorArray.from_vectors(points).data)) )
+		self.assertEqual( 0, len(self.irregular.contains_points([])) )
+
+		grid = [ Vector(x * 0.25, y * 0.25) for x in range(-2, 20) for y in range(-2, 24) ]
+		self.assertEqual( [self.irregular.contains_point(p) for p in grid], list(self.irregular.contains_points(grid)) )
+
+	def test_signed_distance(self):
+		self.assertAlmostEqual( -3 * math.sqrt(0.5), self.square.signed_distance(Vector(10, 30)) )
+		self.assertAlmostEqual( 2, self.square.signed_distance(Vector(15, 30)) )
+		self.assertAlmostEqual( 0, self.square.signed_distance(Vector(13, 30)) )
+
+		points = [Vector(10, 30), Vector(15, 30), Vector(10, 40)]
+		self.assertEqual( [self.square.signed_distance(p) for p in points], list(self.square.signed_distances(points)) )
+
 
 
 	def test_union(self):
@@ -218,7 +392,268 @@ class TestPolygon(unittest.TestCase):
 		#self.square2 = Polygon.regular( Vector( 5.0, 30.0), 4, 4 )
 		#self.triangle = Polygon.regular( Vector( 12.0, 32.0 ), 5, 3 )
 		
-		self.assertEqual( [Polygon.regular( Vector(10, 30), 5, 4) ], Polygon.offset([self.square], 2.0) )
+		# regular polygons are clockwise, i.e. holes, which only shrink the islands around them
+		self.assertEqual( [], Polygon.offset([self.square], 2.0) )
+
+		grown = Polygon.offset([self.square.clone_ccw()], 2.0)
+		expected = Polygon.regular( Vector(10, 30), 3 + 2 * math.sqrt(2), 4 )
+		self.assertEqual( 1, len(grown) )
+		self.assertEqual( sorted((round(x, 9), round(y, 9)) for x, y in expected.as_tuple_list()), sorted((round(x, 9), round(y, 9)) for x, y in grown[0].as_tuple_list()) )
+
+	def test_offset_tips(self):
+		square = Polygon.from_tuples([(0, 0), (4, 0), (4, 4), (0, 4)]).clone_ccw()
+
+		self.assertAlmostEqual( 36, Polygon.offset([square], 1)[0].area )
+		self.assertAlmostEqual( 34, Polygon.offset([square], 1, tip_decorator_flat)[0].area )
+		self.assertAlmostEqual( 36 - 4 * (3 - 2 * 2 ** 0.5), Polygon.offset([square], 1, tip_decorator_miter(1))[0].area )
+
+		rounded = Polygon.offset([square], 1, tip_decorator_round(0.01))[0]
+		self.assertTrue( abs(32 + math.pi - rounded.area) < 0.1 )
+		self.assertTrue( all(-1 <= p.x <= 5 and -1 <= p.y <= 5 for p in rounded.points) )
+
+		self.assertEqual( [(1, 3), (3, 3), (3, 1), (1, 1)], Polygon.offset([square], -1)[0].as_tuple_list() )
+		self.assertEqual( [], Polygon.offset([square], -3) )
+
+		self.assertRaises( ValueError, tip_decorator_round, 0 )
+		self.assertRaises( ValueError, tip_decorator_miter, 0.5 )
+
+	def test_offset_many(self):
+		square = Polygon.from_tuples([(0, 0), (4, 0), (4, 4), (0, 4)]).clone_ccw()
+		amounts = [1, 0, -1, 0.5, -3]
+
+		expected = [ [ p.as_tuple_list() for p in Polygon.offset([square], amount) ] for amount in amounts ]
+		self.assertEqual( expected, [ [ p.as_tuple_list() for p in result ] for result in Polygon.offset_many([square], amounts) ] )
+
+		rounded = tip_decorator_round(0.05)
+		self.assertEqual( [ [ p.as_tuple_list() for p in Polygon.offset(square, amount, rounded) ] for amount in amounts ],
+			[ [ p.as_tuple_list() for p in result ] for result in Polygon.offset_many(square, amounts, rounded, processes=2) ] )
+
+		self.assertEqual( [], Polygon.offset_many([square], []) )
+
+class TestArrayPolygon(unittest.TestCase):
+
+	def setUp(self):
+		self.tuples = [(1, 1), (0, 3), (4, 5), (3, 2)]
+		self.irregular = Polygon.from_tuples(self.tuples)
+		self.poly = ArrayPolygon.from_tuples(self.tuples)
+
+	def test_conversion(self):
+		self.assertEqual( self.tuples, self.poly.as_tuple_list() )
+		self.assertEqual( self.irregular.points, self.poly.points )
+		self.assertEqual( self.irregular, self.poly )
+		self.assertEqual( self.poly, ArrayPolygon.from_pointlist(self.irregular.points) )
+		self.assertEqual( str(self.irregular), str(self.poly) )
+
+	def test_zero_copy(self):
+		data = numpy.array(self.tuples, dtype=numpy.float64)
+		poly = ArrayPolygon(data)
+
+		self.assertTrue( numpy.shares_memory(data, poly.data) )
+		self.assertTrue( numpy.shares_memory(data, numpy.asarray(poly)) )
+		self.assertFalse( numpy.shares_memory(data, numpy.array(poly)) )
+		self.assertTrue( numpy.shares_memory(data, numpy.array(poly, copy=False)) )
+		self.assertTrue( numpy.shares_memory(data, numpy.asarray(memoryview(poly.data))) )
+		self.assertTrue( numpy.shares_memory(data, poly.as_vector_array().data) )
+
+		poly[0] = Vector(7, 7)
+		self.assertEqual( [7, 7], list(data[0]) )
+
+		# numpy.array copies unless asked not to
+		copied = numpy.array(poly)
+		copied[0, 0] = 99
+		self.assertEqual( Vector(7, 7), poly[0] )
+
+	def test_point_view(self):
+		pts = self.poly.points
+		self.assertEqual( 4, len(pts) )
+		self.assertEqual( Vector(0, 3), pts[1] )
+		self.assertEqual( [Vector(0, 3), Vector(4, 5)], pts[1:3] )
+		self.assertTrue( Vector(4, 5) in pts )
+		self.assertEqual( 2, pts.index(Vector(4, 5)) )
+		self.assertEqual( [Vector(9, 9)] + self.irregular.points, [Vector(9, 9)] + pts )
+
+		pts.insert(1, Vector(0, 0))
+		pts.append(Vector(2, 0))
+		self.assertEqual( [(1, 1), (0, 0), (0, 3), (4, 5), (3, 2), (2, 0)], self.poly.as_tuple_list() )
+
+		del pts[1]
+		pts.remove(Vector(2, 0))
+		self.assertEqual( self.tuples, self.poly.as_tuple_list() )
+
+	def test_growth(self):
+		poly = ArrayPolygon()
+		for i in range(100):
+			poly.add_point(Vector(i, i * i))
+		poly.add_points([Vector(-1, -1), Vector(-2, -2)])
+
+		self.assertEqual( 102, len(poly) )
+		self.assertEqual( (102, 2), poly.data.shape )
+		self.assertEqual( Vector(99, 99 * 99), poly[99] )
+		self.assertEqual( -2, poly.left )
+
+	def test_geometry(self):
+		self.assertEqual( self.irregular.bounds, self.poly.bounds )
+		self.assertAlmostEqual( self.irregular.signed_area, self.poly.signed_area )
+		self.assertEqual( self.irregular.centroid, self.poly.centroid )
+		self.assertEqual( self.irregular.center, self.poly.center )
+		self.assertEqual( self.irregular.is_clockwise(), self.poly.is_clockwise() )
+		self.assertEqual( self.irregular.is_convex(), self.poly.is_convex() )
+
+		self.poly.flip()
+		self.irregular.flip()
+		self.assertEqual( self.irregular, self.poly )
+		self.assertEqual( self.irregular.is_clockwise(), self.poly.is_clockwise() )
+
+		self.poly.sort_around(Vector(2, 2))
+		self.irregular.sort_around(Vector(2, 2))
+		self.assertEqual( self.irregular, self.poly )
+
+	def test_operations(self):
+		for p in (Vector(2, 2), Vector(2, 4), Vector(0, 0)):
+			self.assertEqual( self.irregular.contains_point(p), self.poly.contains_point(p) )
+
+		square = Polygon.regular(Vector(2, 2), 2, 4)
+		self.assertEqual( Polygon.union(self.irregular, square), Polygon.union(self.poly, square) )
+
+	def test_transform(self):
+		t = Transform.move(1, 2) * Transform.rotate(0.5)
+		transformed = t * self.poly
+
+		self.assertTrue( isinstance(transformed, ArrayPolygon) )
+		self.assertEqual( t * self.irregular, transformed )
+
+		polys = t.apply_polygons([self.poly, ArrayPolygon.regular(Vector(0, 0), 1, 5)])
+		self.assertEqual( [t * self.irregular, t * Polygon.regular(Vector(0, 0), 1, 5)], polys )
+		self.assertTrue( polys[0].data.base is polys[1].data.base )
+
+	def test_pickle(self):
+		import pickle
+		self.poly.add_point(Vector(1, 0))
+		self.assertEqual( self.poly, pickle.loads(pickle.dumps(self.poly)) )
+
+class TestPreparedPolygon(unittest.TestCase):
+
+	def setUp(self):
+		self.irregular = Polygon.from_pointlist( [ Vector(1, 1), Vector(0, 3), Vector(4, 5), Vector(3, 2) ] )
+		self.comb = Polygon.from_tuples([(0, 0), (10, 0), (10, 10), (8, 10), (8, 2), (6, 2), (6, 10), (4, 10), (4, 2), (2, 2), (2, 10), (0, 10)])
+
+	def test_contains_point(self):
+		prepared = self.irregular.prepare()
+
+		self.assertEqual(1, prepared.contains_point(Vector(2,2)))
+		self.assertEqual(1, prepared.contains_point(Vector(1,2)))
+		self.assertEqual(2, prepared.contains_point(Vector(2,4)))
+		self.assertEqual(2, prepared.contains_point(Vector(1,1)))
+		self.assertEqual(2, prepared.contains_point(Vector(2,1.5)))
+		self.assertEqual(0, prepared.contains_point(Vector(0,4)))
+		self.assertEqual(0, prepared.contains_point(Vector(0,1)))
+		self.assertEqual(0, prepared.contains_point(Vector(0,0)))
+
+	def test_same_as_polygon(self):
+		prepared = PreparedPolygon(self.comb)
+
+		points = [ Vector(x * 0.5, y * 0.5) for x in range(-2, 23) for y in range(-2, 23) ]
+		points += [ Vector(x * 0.37, y * 0.41) for x in range(-2, 30) for y in range(-2, 30) ]
+
+		for p in points:
+			self.assertEqual( self.comb.contains_point(p), prepared.contains_point(p) )
+
+	def test_cache(self):
+		prepared = self.comb.prepare()
+		self.assertTrue( prepared is self.comb.prepare() )
+
+		self.comb[2] = Vector(12, 10)
+		self.assertTrue( prepared is not self.comb.prepare() )
+		self.assertEqual( 1, self.comb.prepare().contains_xy(10.5, 5) )
+
+class TestTransform(unittest.TestCase):
+
+	def setUp(self):
+		self.t = Transform.move(1, 2) * Transform.scale(2, 3)
+		self.square = Polygon.from_tuples([(0, 0), (1, 0), (1, 1), (0, 1)])
+		self.big = Polygon.regular(Vector(0, 0), 1, 200)
+
+	def assertTransformAlmostEqual(self, a, b):
+		for ca, cb in zip(a.coefficients, b.coefficients):
+			self.assertAlmostEqual(ca, cb)
+
+	def test_data(self):
+		self.assertEqual( [[2, 0, 1], [0, 3, 2], [0, 0, 1]], self.t.data )
+		self.assertEqual( [[1, 0, 0], [0, 1, 0], [0, 0, 1]], Transform().data )
+		self.assertEqual( [[1, 2, 3], [4, 5, 6], [0, 0, 1]], Transform([[1, 2, 3], [4, 5, 6], [0, 0, 1]]).data )
+
+	def test_mul_vector(self):
+		self.assertEqual( Vector(3, 5), self.t * Vector(1, 1) )
+
+	def test_mul_transform(self):
+		a = Transform([[1, 2, 3], [4, 5, 6], [0, 0, 1]])
+		b = Transform([[7, 8, 9], [10, 11, 12], [0, 0, 1]])
+		self.assertEqual( [[27, 30, 36], [78, 87, 102], [0, 0, 1]], (a * b).data )
+
+	def test_add_sub(self):
+		self.assertEqual( [[3, 0, 1], [0, 4, 2], [0, 0, 1]], (self.t + Transform.unit()).data )
+		self.assertEqual( [[1, 0, 1], [0, 2, 2], [0, 0, 1]], (self.t - Transform.unit()).data )
+
+	def test_inverse(self):
+		t = Transform.rotate_around(3, 4, 0.7) * self.t * Transform.shear(0.5)
+		self.assertTransformAlmostEqual( Transform.unit(), t * t.inverse )
+		self.assertTransformAlmostEqual( Transform.unit(), t.inverse * t )
+
+		self.assertTrue( t.inverse is t.inverse )
+		self.assertTrue( t.inverse.inverse is t )
+
+		self.assertRaises( ValueError, Transform.scale(0, 1).get_inverse )
+
+	def test_inverse_invalidation(self):
+		inv = self.t.inverse
+		self.t.data = Transform.move(5, 5).data
+
+		self.assertEqual( Vector(0, 0), self.t.inverse * Vector(5, 5) )
+		self.assertTrue( inv.inverse is not self.t )
+
+		# the coefficients can only be replaced through data
+		t = Transform.move(1, 2)
+		self.assertEqual( (1, 2), (t.x0, t.y0) )
+		self.assertEqual( -1, t.inverse.x0 )
+		self.assertRaises( AttributeError, setattr, t, "x0", 100 )
+		self.assertEqual( -1, t.inverse.x0 )
+
+	def test_decompose(self):
+		for t in (self.t, Transform.rotate_around(3, 4, 2.5), Transform.move(1, -2) * Transform.rotate(-0.3) * Transform.shear(0.25) * Transform.scale(2, -0.5)):
+			dx, dy, phi, sx, sy, k = t.decompose()
+			self.assertTransformAlmostEqual( t, Transform.move(dx, dy) * Transform.rotate(phi) * Transform.shear(k) * Transform.scale(sx, sy) )
+
+		self.assertEqual( (1, 2, 0, 2, 3, 0), self.t.decompose() )
+
+	def test_mul_polygon(self):
+		self.assertEqual( Polygon.from_tuples([(1, 2), (3, 2), (3, 5), (1, 5)]), self.t * self.square )
+		self.assertEqual( [self.t * v for v in self.big.points], (self.t * self.big).points )
+
+	def test_apply(self):
+		expected = [(1, 2), (3, 2), (3, 5), (1, 5)]
+		self.assertEqual( expected, self.t.apply(self.square).as_tuple_list() )
+		self.assertEqual( expected, (self.t * self.square.as_vector_array()).as_tuple_list() )
+
+	def test_apply_inplace(self):
+		pts = self.square.as_vector_array()
+		data = pts.data
+
+		self.assertTrue( self.t.apply_inplace(pts).data is data )
+		self.assertEqual( [(1, 2), (3, 2), (3, 5), (1, 5)], pts.as_tuple_list() )
+
+		self.assertRaises( ValueError, self.t.apply_inplace, self.square.points )
+
+		# arrays that would have to be copied can not be updated in-place
+		self.assertRaises( ValueError, self.t.apply_inplace, numpy.zeros((3, 4))[:, :2] )
+		self.assertRaises( ValueError, self.t.apply_inplace, numpy.zeros((3, 2), dtype=numpy.int64) )
+
+		data = numpy.zeros((3, 2))
+		self.t.apply_inplace(data)
+		self.assertEqual( [[1, 2]] * 3, data.tolist() )
+
+	def test_apply_polygons(self):
+		polys = [self.square, self.big, Polygon.regular(Vector(5, 5), 2, 3)]
+		self.assertEqual( [self.t * p for p in polys], self.t.apply_polygons(polys) )
 
 class TestIntersection(unittest.TestCase):
 	def setUp(self):
@@ -269,11 +704,567 @@ class TestIntersection(unittest.TestCase):
 	def test_intersect_poly_poly(self):
 		self.assertEqual( [Vector(2, 3), Vector(-2, 3), Vector(-3, 2), Vector(-3, -2), Vector(-2, -3), Vector(2, -3), Vector(3, 2), Vector(3, -2)], intersect_poly_poly(self.square.points, self.diamond.points) )
 
+	def test_intersect_segments(self):
+		pairs, points = intersect_segments(poly_segment_array(self.square), poly_segment_array(self.diamond))
+		self.assertEqual( [[0, 0], [0, 1], [1, 1], [1, 2], [2, 2], [2, 3], [3, 0], [3, 3]], pairs.tolist() )
+		self.assertEqual( intersect_poly_poly(self.square.points, self.diamond.points), points.as_vectors() )
+
+		# self-intersections of a bow tie, including the shared corners of neighbouring edges
+		bowtie = Polygon.from_tuples([(0, 0), (2, 2), (2, 0), (0, 2)])
+		pairs, points = intersect_segments(poly_segment_array(bowtie))
+		self.assertEqual( [[0, 1], [0, 2], [0, 3], [1, 2], [2, 3]], pairs.tolist() )
+		self.assertEqual( Vector(1, 1), points[1] )
+
+		pairs, points = intersect_segments(numpy.zeros((0, 4)), poly_segment_array(self.square))
+		self.assertEqual( (0, 2), pairs.shape )
+		self.assertEqual( 0, len(points) )
+
+		# stacked segments that overlap in x, but not in y
+		stacked = numpy.array([ (0, y, 100, y + 0.5) for y in range(500) ], dtype=numpy.float64)
+		self.assertEqual( (0, 2), intersect_segments(stacked)[0].shape )
+
+		# a grid of crossing segments
+		rows = numpy.array([ (0, y, 50, y) for y in range(50) ], dtype=numpy.float64)
+		cols = numpy.array([ (x + 0.5, -1, x + 0.5, 51) for x in range(50) ], dtype=numpy.float64)
+		self.assertEqual( 2500, len(intersect_segments(rows, cols)[0]) )
+		self.assertEqual( 2500, len(intersect_segments(numpy.vstack((rows, cols)))[0]) )
+
+		# long parallel diagonals with overlapping bounding boxes, crossed by two short segments, are found by the sweep
+		walls = numpy.array([ (0, y, 1000, y + 1000) for y in range(1000) ], dtype=numpy.float64)
+		cross = numpy.array([ (500, 600, 500, 620), (0, 1000, 10, 1000) ], dtype=numpy.float64)
+		pairs, points = intersect_segments(numpy.vstack((walls, cross)))
+		self.assertEqual( 31, len(pairs) )
+		self.assertEqual( [[100, 1000], [101, 1000]], pairs[:2].tolist() )
+		self.assertEqual( [999, 1001], pairs[-1].tolist() )
+		self.assertEqual( [Vector(500, 600), Vector(1, 1000)], [points[0], points[-1]] )
+		self.assertEqual( pairs.tolist(), (intersect_segments(walls, cross)[0] + [0, 1000]).tolist() )
+		self.assertEqual( (0, 2), intersect_segments(walls)[0].shape )
+
+	def test_intersect_linesegs_linesegs_sweep(self):
+		# many short segments, so that intersect_segments is used
+		segs1 = [ (Vector(i, 0), Vector(i + 0.5, 10)) for i in range(20) ]
+		segs2 = [ (Vector(0, j), Vector(25, j + 0.5)) for j in range(20) ]
+
+		expected = []
+		for a, b in segs1:
+			expected += intersect_linesegs_lineseg(segs2, a, b)
+
+		self.assertEqual( expected, intersect_linesegs_linesegs(segs1, segs2) )
+		self.assertEqual( expected, intersect_linesegs_linesegs(as_segment_array(segs1), as_segment_array(segs2)) )
+
+	def test_intersect_segments_lineseg(self):
+		segs = poly_segment_array(self.square)
+
+		indices, t, points = intersect_segments_lineseg(segs, self.origin - self.c, self.c)
+		self.assertEqual( [1, 3], indices.tolist() )
+		self.assertEqual( [0.125, 0.875], t.tolist() )
+		self.assertEqual( [ Vector(-3, -1.5), Vector(3, 1.5) ], points.as_vectors() )
+
+		self.assertEqual( (1, 0.125, Vector(-3, -1.5)), intersect_segments_lineseg(segs, self.origin - self.c, self.c, nearest=True) )
+		self.assertEqual( None, intersect_segments_lineseg(segs, self.origin, self.d, nearest=True) )
+
+	def test_intersect_segments_ray(self):
+		segs = poly_segment_array(self.square)
+
+		indices, t, points = intersect_segments_ray(segs, self.origin, self.c)
+		self.assertEqual( [3], indices.tolist() )
+		self.assertEqual( [ Vector(3, 1.5) ], points.as_vectors() )
+
+		# rays starting outside of the square hit it twice
+		index, t, point = intersect_segments_ray(segs, self.origin - self.c * 2, self.origin, nearest=True)
+		self.assertEqual( (1, 0.625, Vector(-3, -1.5)), (index, t, point) )
+		self.assertEqual( 3, intersect_segments_ray(segs, self.origin - self.c * 2, self.origin, nearest=True, t_min=1)[0] )
+
+		# the same segments as lists of vectors and as arrays
+		many = [ (Vector(i, -1), Vector(i, 1)) for i in range(50) ]
+		self.assertEqual( [ Vector(i, 0) for i in range(50) ], intersect_linesegs_ray(many, self.origin - self.x, self.origin) )
+		self.assertEqual( [ Vector(i, 0) for i in range(21) ], intersect_linesegs_lineseg(many, self.origin - self.x, self.x * 20.5) )
+
+	def test_intersect_segments_rays(self):
+		segs = poly_segment_array(self.square)
+		targets = VectorArray.from_vectors([ self.c, self.d, self.origin ])
+
+		indices, t, points = intersect_segments_rays(segs, self.origin, targets)
+		self.assertEqual( [3, 0, -1], indices.tolist() )
+		self.assertEqual( [0.75, 3.0, numpy.inf], t.tolist() )
+		self.assertEqual( [ Vector(3, 1.5), Vector(3, 3) ], points[:2].as_vectors() )
+		self.assertTrue( numpy.isnan(points.data[2]).all() )
+
+		rays, indices, t, points = intersect_segments_rays(segs, self.origin, targets, nearest=False)
+		self.assertEqual( [0, 1, 1], rays.tolist() )
+		self.assertEqual( [3, 0, 3], indices.tolist() )
+		self.assertEqual( [ Vector(3, 1.5), Vector(3, 3), Vector(3, 3) ], points.as_vectors() )
+
+
+	def test_point_orientation(self):
+		self.assertTrue( point_orientation(self.origin, self.x, self.y) )
+		self.assertFalse( point_orientation(self.origin, self.y, self.x) )
+		self.assertFalse( point_orientation(self.origin, self.x, self.x * 2) )
+
+		self.assertEqual( 1, orientation_determinant(self.origin, self.x, self.y) )
+		self.assertEqual( -1, orientation_determinant(self.origin, self.y, self.x) )
+		self.assertEqual( 0, orientation_determinant(self.origin, self.x, self.x * 2) )
+
+	def test_point_orientation_robust(self):
+		# points on a grid of the smallest representable steps around the line y = x
+		eps = 2.0 ** -53
+		b, c = Vector(12, 12), Vector(24, 24)
+
+		points = [ Vector(0.5 + i * eps, 0.5 + j * eps) for i in range(32) for j in range(32) ]
+		expected = [ (j > i) - (j < i) for i in range(32) for j in range(32) ]
+
+		self.assertEqual( expected, [ (d > 0) - (d < 0) for d in (orientation_determinant(p, b, c) for p in points) ] )
+		self.assertEqual( [e > 0 for e in expected], [ point_orientation(p, b, c) for p in points ] )
+		self.assertEqual( expected, list(point_orientations(points, b, c)) )
 
 	def test_distance_point_lineseg_squared(self):
 		self.assertEqual( 3.2, distance_point_lineseg_squared(self.d, self.a, self.b) )
 		self.assertEqual( 0, distance_point_lineseg_squared(Vector(2,4), Vector(0,3), Vector(4, 5)) )
 		self.assertNotEqual( 0, distance_point_lineseg_squared(Vector(2,2), Vector(3,2), Vector(1, 1)) )
 
+	def test_distance_points_segments(self):
+		segs = [(self.a, self.b), (Vector(0, 3), Vector(4, 5)), (Vector(2, 2), Vector(2, 2))]
+		points = [self.d, Vector(2, 4), Vector(2, 2), Vector(10, 10)]
+
+		d2 = distance_points_segments_squared(points, segs)
+		self.assertEqual( (4, 3), d2.shape )
+		for i, p in enumerate(points):
+			self.assertAlmostEqual( distance_point_lineseg_squared(p, self.a, self.b), d2[i, 0] )
+			self.assertAlmostEqual( distance_point_lineseg_squared(p, segs[1][0], segs[1][1]), d2[i, 1] )
+			self.assertAlmostEqual( (p - Vector(2, 2)).length_squared, d2[i, 2] )
+
+		self.assertEqual( list(d2[1]), list(distance_points_segments_squared(points[1], segs)) )
+
+	def test_nearest_segments(self):
+		segs = [(Vector(0, 0), Vector(10, 0)), (Vector(0, 5), Vector(10, 5))]
+
+		self.assertEqual( (0, 0.3, 1.0), nearest_segment(Vector(3, 1), segs) )
+		self.assertEqual( (1, 1.0, 5.0), nearest_segment(Vector(14, 8), segs) )
+		self.assertEqual( None, nearest_segment(Vector(3, 1), []) )
+
+		indices, t, distances = nearest_segments([Vector(3, 1), Vector(14, 8), Vector(-1, 2.5)], segs)
+		self.assertEqual( [0, 1, 0], list(indices) )
+		self.assertEqual( [0.3, 1.0, 0.0], list(t) )
+		self.assertEqual( [1.0, 5.0, math.sqrt(7.25)], list(distances) )
+
+		indices, t, distances = nearest_segments([Vector(3, 1)], [])
+		self.assertEqual( [-1], list(indices) )
+		self.assertEqual( [float('inf')], list(distances) )
+
+class TestSegmentBVH(unittest.TestCase):
+
+	def setUp(self):
+		# a comb of vertical segments at x = 0, 2, 4, ... and one horizontal segment below them
+		self.segs = [ (Vector(2 * i, 0), Vector(2 * i, 10)) for i in range(50) ] + [ (Vector(0, -1), Vector(100, -1)) ]
+		self.bvh = SegmentBVH(self.segs, leaf_size=4)
+		self.arr = as_segment_array(self.segs)
+
+	def test_build(self):
+		self.assertEqual( 51, len(self.bvh) )
+		self.assertEqual( 0, len(SegmentBVH([])) )
+		self.assertEqual( None, SegmentBVH([]).first_hit(Vector(0, 0), Vector(1, 0)) )
+
+		strips = SegmentBVH.from_strips([ [Vector(0, 0), Vector(1, 0), Vector(1, 1)], [Vector(5, 5), Vector(6, 6)] ])
+		self.assertEqual( 3, len(strips) )
+
+		polys = SegmentBVH.from_polygons([ Polygon.regular(Vector(0, 0), 1, 4), Polygon.regular(Vector(5, 0), 1, 3) ])
+		self.assertEqual( 7, len(polys) )
+
+	def test_first_hit(self):
+		self.assertEqual( (2, 0.5, Vector(4, 5)), self.bvh.first_hit(Vector(3, 5), Vector(5, 5)) )
+		self.assertEqual( (1, 0.5, Vector(2, 5)), self.bvh.first_hit(Vector(3, 5), Vector(1, 5)) )
+		self.assertEqual( 3, self.bvh.first_hit(Vector(3, 5), Vector(5, 5), t_min=1)[0] )
+		self.assertEqual( None, self.bvh.first_hit(Vector(3, 5), Vector(3.5, 5), t_max=1) )
+
+		# axis-parallel rays
+		self.assertEqual( (50, 6.0, Vector(3, -1)), self.bvh.first_hit(Vector(3, 5), Vector(3, 4)) )
+		self.assertEqual( None, self.bvh.first_hit(Vector(3, 5), Vector(3, 6)) )
+
+		# the same results as the linear scan
+		for p1, p2 in [ (Vector(-5, 3), Vector(20, 7)), (Vector(101, 11), Vector(50, -3)), (Vector(33, 2), Vector(32, 2)) ]:
+			self.assertEqual( intersect_segments_ray(self.arr, p1, p2, nearest=True), self.bvh.first_hit(p1, p2) )
+
+	def test_any_hit(self):
+		self.assertTrue( self.bvh.any_hit(Vector(3, 5), Vector(5, 5)) )
+		self.assertFalse( self.bvh.any_hit(Vector(3, 5), Vector(3.5, 5)) )
+		self.assertFalse( self.bvh.any_hit(Vector(3, 5), Vector(4, 10), skip=Vector(4, 10)) )
+		self.assertTrue( self.bvh.any_hit(Vector(3, 5), Vector(4, 10)) )
+
+	def test_query_box(self):
+		self.assertEqual( [1, 2, 50], self.bvh.query_box(1, -5, 5, 0) )
+		self.assertEqual( [1, 2], self.bvh.query_box(1, 0, 5, 5) )
+		self.assertEqual( [], self.bvh.query_box(1, 11, 5, 15) )
+
+class TestSpatialHash(unittest.TestCase):
+
+	def setUp(self):
+		self.grid = SpatialHash(10)
+		self.grid.insert("wall", (Vector(0, 0), Vector(0, 100)))
+		self.grid.insert("crate", Polygon.regular(Vector(50, 50), 5, 4))
+		self.grid.insert("coin", Vector(25, 75))
+
+	def test_insert_remove(self):
+		self.assertEqual( 3, len(self.grid) )
+		self.assertTrue( "coin" in self.grid )
+		self.assertRaises( ValueError, self.grid.insert, "bad", 42 )
+		self.assertRaises( ValueError, SpatialHash, 0 )
+
+		self.grid.remove("wall")
+		self.assertFalse( "wall" in self.grid )
+		self.assertEqual( [], self.grid.query_box(-5, 0, 5, 100) )
+		self.assertRaises( KeyError, self.grid.remove, "wall" )
+
+	def test_move(self):
+		self.grid.move("coin", Vector(26, 76))
+		self.assertEqual( Vector(26, 76), self.grid.get_shape("coin") )
+		self.assertEqual( ["coin"], self.grid.query_point(Vector(26, 76)) )
+
+		self.grid.move("coin", Vector(-50, -50))
+		self.assertEqual( [], self.grid.query_point(Vector(26, 76)) )
+		self.assertEqual( ["coin"], self.grid.query_box(-60, -60, -40, -40) )
+
+	def test_query(self):
+		self.assertEqual( ["crate"], self.grid.query_point(Vector(52, 51)) )
+		self.assertEqual( ["coin", "crate"], sorted(self.grid.query_box(20, 40, 50, 80)) )
+		self.assertEqual( ["coin", "crate", "wall"], sorted(self.grid.query_box(-1000, -1000, 1000, 1000)) )
+
+	def test_traverse_ray(self):
+		cells = [ cell for cell, t0, t1 in self.grid.traverse_ray(Vector(5, 5), Vector(25, 25)) ]
+		self.assertEqual( [(0, 0), (0, 1), (1, 1), (1, 2), (2, 2)], cells[:5] )
+
+	def test_first_hit(self):
+		self.assertEqual( ("wall", 3.0, Vector(0, 50)), self.grid.first_hit(Vector(30, 50), Vector(20, 50)) )
+		self.assertEqual( ("crate", 0.5, Vector(45, 50)), self.grid.first_hit(Vector(40, 50), Vector(50, 50)) )
+		self.assertEqual( None, self.grid.first_hit(Vector(30, 50), Vector(20, 50), t_max=1) )
+		self.assertEqual( None, self.grid.first_hit(Vector(30, 50), Vector(30, 60)) )
+
+	def test_nearest(self):
+		self.assertEqual( ("coin", 5.0), self.grid.nearest(Vector(25, 70)) )
+		self.assertEqual( ("crate", 0.0), self.grid.nearest(Vector(50, 51)) )
+		self.assertEqual( ("wall", 25.0), self.grid.nearest(Vector(25, 70), kinds="s") )
+		self.assertEqual( None, self.grid.nearest(Vector(500, 500), max_distance=10) )
+
+class TestRTree(unittest.TestCase):
+
+	def setUp(self):
+		# a 10x10 grid of diamonds with a radius of 1
+		self.polys = [ Polygon.regular(Vector(x * 2 + 1, y * 2 + 1), 1, 4) for y in range(10) for x in range(10) ]
+		self.tree = RTree(self.polys, values=range(100), node_capacity=4)
+
+	def test_build(self):
+		self.assertEqual( 100, len(self.tree) )
+		self.assertEqual( [], RTree([]).find(Vector(0, 0)) )
+		self.assertEqual( None, RTree([]).nearest(Vector(0, 0)) )
+		self.assertRaises( ValueError, RTree, self.polys, [1, 2, 3] )
+		self.assertRaises( ValueError, RTree, self.polys, None, 1 )
+
+	def test_query(self):
+		self.assertEqual( [0, 1, 10, 11], self.tree.query_box(0.5, 0.5, 2.5, 2.5) )
+		self.assertEqual( [55], self.tree.query_point(Vector(11, 11)) )
+		self.assertEqual( list(range(100)), self.tree.query_box(-1, -1, 21, 21) )
+
+	def test_find(self):
+		self.assertEqual( [55], self.tree.find(Vector(11, 11)) )
+		self.assertEqual( [], self.tree.find(Vector(10.1, 10.1)) )
+		self.assertEqual( [], self.tree.find(Vector(-5, 5)) )
+
+	def test_nearest(self):
+		self.assertEqual( (55, 0.0), self.tree.nearest(Vector(11, 11)) )
+
+		value, d = self.tree.nearest(Vector(-2, 1))
+		self.assertEqual( 0, value )
+		self.assertAlmostEqual( 2.0, d )
+
+		self.assertEqual( None, self.tree.nearest(Vector(-2, 1), max_distance=1) )
+
+class TestHull(unittest.TestCase):
+
+	def setUp(self):
+		# a 4x2 rectangle with points inside and on its edges
+		self.points = [Vector(1, 1), Vector(0, 0), Vector(4, 0), Vector(2, 0), Vector(4, 2), Vector(0, 2), Vector(3, 1), Vector(0, 0)]
+
+	def test_convex_hull(self):
+		self.assertEqual( [1, 2, 4, 5], list(convex_hull_indices(self.points)) )
+		self.assertEqual( Polygon.from_tuples([(0, 0), (4, 0), (4, 2), (0, 2)]), convex_hull(self.points) )
+		self.assertEqual( Polygon.regular(Vector(0, 0), 1, 8).is_clockwise(), convex_hull(self.points).is_clockwise() )
+
+		hull = convex_hull(VectorArray.from_vectors(self.points))
+		self.assertTrue( isinstance(hull, ArrayPolygon) )
+		self.assertEqual( [(0, 0), (4, 0), (4, 2), (0, 2)], hull.as_tuple_list() )
+
+		self.assertEqual( [], list(convex_hull_indices([])) )
+		self.assertEqual( [0], list(convex_hull_indices([Vector(1, 1), Vector(1, 1)])) )
+		self.assertEqual( [0, 2], list(convex_hull_indices([Vector(0, 0), Vector(1, 1), Vector(2, 2)])) )
+
+	def test_convex_hull_large(self):
+		circle = [ Vector(math.cos(k * 0.1), math.sin(k * 0.1)) for k in range(63) ]
+		inner = [ p * 0.5 for p in circle ]
+		self.assertEqual( 63, len(convex_hull(inner + circle + inner)) )
+
+	def test_convex_hulls(self):
+		sets = [self.points, [], [Vector(1, 1)], [Vector(0, 0), Vector(2, 2), Vector(1, 1)], Polygon.regular(Vector(5, 5), 2, 6)]
+		hulls = convex_hulls(sets)
+
+		self.assertEqual( len(sets), len(hulls) )
+		for s, h in zip(sets, hulls):
+			self.assertEqual( convex_hull(s).as_tuple_list() if len(s) else [], h.as_tuple_list() )
+
+		arr = numpy.array([[(0, 0), (1, 0), (0, 1), (0.2, 0.2)], [(0, 0), (2, 2), (2, 0), (0, 2)]])
+		self.assertEqual( [3, 4], [ len(h) for h in convex_hulls(arr) ] )
+
+		# batches without any set of more than one point
+		self.assertEqual( [[(1, 2)]], [ h.as_tuple_list() for h in convex_hulls([[(1, 2)]]) ] )
+		self.assertEqual( [[(1, 2)], [(3, 4)]], [ h.as_tuple_list() for h in convex_hulls([[(1, 2)], [(3, 4)]]) ] )
+		self.assertEqual( [[]], [ h.as_tuple_list() for h in convex_hulls([[]]) ] )
+		self.assertEqual( [[(1, 2)]], [ h.as_tuple_list() for h in convex_hulls(numpy.array([[(1, 2)]])) ] )
+
+	def test_calipers(self):
+		d, p, q = hull_diameter(self.points)
+		self.assertAlmostEqual( math.sqrt(20), d )
+		self.assertAlmostEqual( math.sqrt(20), (p - q).length )
+
+		self.assertEqual( 2, hull_width(self.points)[0] )
+		self.assertAlmostEqual( math.sqrt(2), hull_width(Polygon.regular(Vector(0, 0), 1, 4))[0] )
+		self.assertEqual( None, hull_width([Vector(0, 0), Vector(1, 1), Vector(2, 2)]) )
+
+		rect = minimum_area_rectangle(self.points)
+		self.assertAlmostEqual( 8, abs(rect.area) )
+
+		# a rotated rectangle is its own minimum area rectangle
+		diamond = Polygon.from_tuples([(0, 0), (2, 2), (1, 3), (-1, 1)])
+		self.assertAlmostEqual( 4, abs(minimum_area_rectangle(diamond).area) )
+		self.assertEqual( None, minimum_area_rectangle([Vector(0, 0)]) )
+
+class TestTriangulation(unittest.TestCase):
+
+	def setUp(self):
+		self.square = Polygon.from_tuples([(0, 0), (4, 0), (4, 4), (0, 4)])
+		self.hole = Polygon.from_tuples([(1, 1), (1, 3), (3, 3), (3, 1)])
+		self.comb = Polygon.from_tuples([(0, 0), (6, 0), (6, 3), (5, 1), (4, 3), (3, 1), (2, 3), (1, 1), (0, 3)])
+
+	def check(self, polygon, holes, tris):
+		pts = triangulation_points(polygon, holes).as_tuple_list()
+		area = abs(polygon.area) - sum(abs(h.area) for h in holes)
+
+		self.assertEqual( len(polygon) + sum(len(h) for h in holes) + 2 * len(holes) - 2, len(tris) )
+
+		tri_area = 0
+		for a, b, c in tris.tolist():
+			det = orientation_determinant(Vector(*pts[a]), Vector(*pts[b]), Vector(*pts[c]))
+			self.assertTrue( det > 0 )
+			tri_area += det / 2.0
+
+		self.assertAlmostEqual( area, tri_area )
+
+	def test_triangulate(self):
+		for method in ("auto", "monotone", "ear"):
+			self.check(self.comb, [], triangulate(self.comb, method=method))
+			self.check(self.square, [self.hole], triangulate(self.square, [self.hole], method=method))
+
+		# orientation of the input does not matter
+		self.check(self.comb.clone_ccw(), [], triangulate(self.comb.clone_ccw()))
+
+		self.assertEqual( numpy.uint32, triangulate(self.square, dtype=numpy.uint32).dtype )
+		self.assertEqual( (0, 3), triangulate(Polygon.from_tuples([(0, 0), (1, 1)])).shape )
+		self.assertRaises( ValueError, triangulate, self.square, [], "delaunay" )
+
+	def test_triangulation_points(self):
+		arr = ArrayPolygon.from_tuples([(0, 0), (4, 0), (4, 4), (0, 4)])
+		self.assertTrue( numpy.shares_memory(triangulation_points(arr).data, arr.data) )
+		self.assertEqual( 8, len(triangulation_points(self.square, [self.hole])) )
+
+	def test_polygon_triangulate(self):
+		tris = Polygon.triangulate(self.square, [self.hole])
+		self.assertEqual( 8, len(tris) )
+		self.assertAlmostEqual( 12, sum(abs(t.area) for t in tris) )
+		self.assertTrue( all(t.is_convex() for t in tris) )
+
+	def test_convex_partition(self):
+		for polygon, holes in ((self.comb, []), (self.square, [self.hole])):
+			pts = triangulation_points(polygon, holes).as_tuple_list()
+			pieces = convex_partition(polygon, holes)
+
+			self.assertTrue( len(pieces) < len(triangulate(polygon, holes)) )
+
+			area = 0
+			for piece in pieces:
+				poly = Polygon.from_tuples([ pts[i] for i in piece.tolist() ])
+				self.assertTrue( poly.is_clockwise() )
+				area += abs(poly.area)
+
+				# pieces are convex, but may keep collinear vertices where a neighbor touches them
+				for k in range(len(poly)):
+					self.assertTrue( orientation_determinant(poly[k - 1], poly[k], poly[(k + 1) % len(poly)]) >= 0 )
+
+			self.assertAlmostEqual( abs(polygon.area) - sum(abs(h.area) for h in holes), area )
+
+		self.assertEqual( 5, len(convex_partition(self.comb)) )
+		self.assertEqual( [], convex_partition(Polygon.from_tuples([(0, 0), (1, 1)])) )
+
+	def test_convex_decompose(self):
+		parts = Polygon.convex_decompose(self.square, [self.hole], method="hertel_mehlhorn")
+		self.assertEqual( 4, len(parts) )
+		self.assertTrue( all(p.is_convex() for p in parts) )
+		self.assertRaises( ValueError, Polygon.convex_decompose, self.square, [], None, "delaunay" )
+
+class TestBoolean(unittest.TestCase):
+
+	def setUp(self):
+		self.square = Polygon.regular( Vector( 10.0, 30.0 ), 3, 4 )
+		self.square2 = Polygon.regular( Vector( 5.0, 30.0), 4, 4 )
+		self.big = Polygon.from_tuples([(0, 0), (4, 0), (4, 4), (0, 4)])
+		self.small = Polygon.from_tuples([(1, 1), (3, 1), (3, 3), (1, 3)])
+		self.right = Polygon.from_tuples([(4, 0), (8, 0), (8, 4), (4, 4)])
+
+	def test_squares(self):
+		union = Polygon.union(self.square, self.square2, "sweep")
+		for p in union:
+			p.sort_around(Vector(8,30))
+
+		expected = [ Polygon.from_pointlist([Vector(13, 30), Vector(10,33), Vector(8,31), Vector(5,34), Vector(1,30), Vector(5,26), Vector(8,29), Vector(10,27) ]) ]
+		self.assertEqual(expected, union)
+
+		intersection = Polygon.intersect(self.square, self.square2, "sweep")
+		for p in intersection:
+			p.sort_around(Vector(8,30))
+
+		self.assertEqual([ Polygon.from_tuples([(9.00, 30.00), (8.00, 31.00), (7.00, 30.00), (8.00, 29.00)]) ], intersection)
+
+		# two points of the difference are at the same angle around the center, so compare the point sets
+		subtract = Polygon.subtract(self.square, self.square2, "sweep")
+		self.assertEqual( 1, len(subtract) )
+		self.assertEqual( sorted([(13.00, 30.00), (9.00, 30.00), (10.00, 33.00), (8.00, 31.00), (8.00, 29.00), (10.00, 27.00)]), sorted(subtract[0].as_tuple_list()) )
+
+	def test_holes(self):
+		island, hole = Polygon.subtract(self.big, self.small, "sweep")
+		self.assertFalse( island.is_clockwise() )
+		self.assertTrue( hole.is_clockwise() )
+		self.assertAlmostEqual( 16, island.area )
+		self.assertAlmostEqual( 4, hole.area )
+
+		# a ring inside of another ring of the same operand is a hole
+		self.assertEqual( [], Polygon.intersect([self.big, self.small], self.small, "sweep") )
+		result = polygon_boolean([self.big, self.small], [self.small], 'u')
+		self.assertEqual( 1, len(result) )
+		self.assertEqual( [], result[0][1] )
+
+	def test_shared_edges(self):
+		union = Polygon.union(self.big, self.right, "sweep")
+		self.assertEqual( 1, len(union) )
+		self.assertEqual( 4, len(union[0]) )
+		self.assertAlmostEqual( 32, abs(union[0].area) )
+
+		self.assertEqual( [], Polygon.intersect(self.big, self.right, "sweep") )
+		self.assertEqual( [], Polygon.subtract(self.big, self.big, "sweep") )
+
+		# shared edges within one operand
+		union = Polygon.union([self.big, self.right], [], "sweep")
+		self.assertEqual( 1, len(union) )
+		self.assertAlmostEqual( 32, union[0].area )
+		self.assertEqual( [], Polygon.subtract([self.big, self.right], [self.right, self.big], "sweep") )
+
+	def test_xor(self):
+		xor = Polygon.xor(self.square, self.square2)
+		self.assertEqual( 2, len(xor) )
+		self.assertAlmostEqual( abs(self.square.area) + abs(self.square2.area) - 4, sum(abs(p.area) for p in xor) )
+
+	def test_union_all(self):
+		tiles = [ Polygon.from_tuples([(x, y), (x + 3, y), (x + 3, y + 3), (x, y + 3)]) for x in range(0, 20, 2) for y in range(0, 20, 2) ]
+		tiles.append(Polygon.regular(Vector(40, 40), 2, 4))
+
+		union = Polygon.union_all(tiles)
+		self.assertEqual( 2, len(union) )
+		self.assertEqual( [8, 21 * 21], sorted(round(p.area, 6) for p in union) )
+		self.assertFalse( any(p.is_clockwise() for p in union) )
+
+		# a ring of tiles around a hole
+		frame = [ Polygon.from_tuples([(x, y), (x + 1, y), (x + 1, y + 1), (x, y + 1)]) for x in range(3) for y in range(3) if (x, y) != (1, 1) ]
+		island, hole = Polygon.union_all(frame)
+		self.assertEqual( (9, 1), (island.area, hole.area) )
+		self.assertTrue( hole.is_clockwise() )
+
+		self.assertEqual( [ p.as_tuple_list() for p in union ], [ p.as_tuple_list() for p in Polygon.union_all(tiles, processes=2) ] )
+		self.assertEqual( [], Polygon.union_all([]) )
+
+	def test_errors(self):
+		self.assertRaises( ValueError, Polygon.boolean_operation, self.big, self.small, 'u', "clipper" )
+		self.assertRaises( ValueError, polygon_boolean, [self.big], [self.small], 'a' )
+		self.assertRaises( ValueError, polygon_boolean, [self.big], [self.small], 'u', "winding" )
+
+	def test_fill_rules(self):
+		# the same square twice has winding number 2, its reverse cancels it out
+		twice = [self.big, self.big.clone_ccw(), self.small]
+		self.assertAlmostEqual( 4, sum(abs(Polygon.from_pointlist(o).area) for o, holes in polygon_boolean(twice, [], 'u')) )
+		self.assertEqual( [], polygon_boolean([self.big, self.big], [], 'u') )
+
+		big, small = self.big.clone_ccw(), self.small.clone_ccw()
+		for rule in ("nonzero", "positive"):
+			result = polygon_boolean([big, big, small], [], 'u', rule)
+			self.assertEqual( 1, len(result) )
+			self.assertEqual( [], result[0][1] )
+
+		# clockwise rings count negatively
+		self.assertEqual( [], polygon_boolean([self.big], [], 'u', "positive") )
+		self.assertEqual( 1, len(polygon_boolean([self.big], [], 'u', "nonzero")) )
+
+class TestMultiPolygon(unittest.TestCase):
+
+	def setUp(self):
+		square = lambda x, y, s: Polygon.from_tuples([(x, y), (x + s, y), (x + s, y + s), (x, y + s)])
+		self.frame = square(0, 0, 10)
+		self.hole = square(1, 1, 8)
+		self.inner = square(2, 2, 2)
+		self.far = square(20, 0, 1)
+		self.multi = MultiPolygon.from_polygons([self.inner, self.far, self.hole, self.frame])
+
+	def test_from_polygons(self):
+		self.assertEqual( 3, len(self.multi) )
+		self.assertEqual( [1, 0, 0], [ len(holes) for shell, holes in self.multi ] )
+		self.assertFalse( any(p.is_clockwise() for p in self.multi.shells) )
+		self.assertTrue( all(p.is_clockwise() for p in self.multi.holes) )
+		self.assertEqual( 100 - 64 + 4 + 1, self.multi.area )
+		self.assertEqual( (0, 0, 21, 10), self.multi.bounds )
+
+	def test_contains_point(self):
+		self.assertEqual( [1, 0, 1, 1, 2, 0], [ self.multi.contains_point(Vector(*p)) for p in [(0.5, 0.5), (1.5, 1.5), (3, 3), (20.5, 0.5), (1, 5), (15, 5)] ] )
+
+	def test_boolean(self):
+		result = Polygon.subtract(self.multi, self.far)
+		self.assertTrue( isinstance(result, MultiPolygon) )
+		self.assertEqual( 2, len(result) )
+		self.assertAlmostEqual( 40, result.area )
+
+		result = Polygon.union(self.multi, Polygon.from_tuples([(0, 0), (5, 0), (5, 5), (0, 5)]))
+		self.assertEqual( 2, len(result) )
+		self.assertAlmostEqual( 100 - 64 + 16 + 1, result.area )
+
+		self.assertTrue( isinstance(Polygon.union_all([self.multi, self.far]), MultiPolygon) )
+		self.assertEqual( 2, len(Polygon.union_all([[self.frame, self.hole]])) )
+
+	def test_decompose(self):
+		for parts in (Polygon.triangulate(self.multi), Polygon.convex_decompose(self.multi, method="hertel_mehlhorn"), Polygon.convex_decompose(self.multi)):
+			self.assertAlmostEqual( self.multi.area, sum(p.area for p in parts) )
+
+		# holes are subtracted from the islands
+		parts = Polygon.triangulate(self.multi, [self.far])
+		self.assertAlmostEqual( 40, sum(p.area for p in parts) )
+
+	def test_offset(self):
+		multi = MultiPolygon.from_polygons([self.frame, self.hole])
+
+		grown = Polygon.offset(multi, 1)
+		self.assertTrue( isinstance(grown, MultiPolygon) )
+		self.assertEqual( 144 - 36, grown.area )
+		self.assertAlmostEqual( 90.25 - 72.25, Polygon.offset(multi, -0.25).area )
+		self.assertEqual( 0, len(Polygon.offset(multi, -0.5)) )
+
+		island, hole = Polygon.offset(multi.get_polygons(), 3)
+		self.assertEqual( (256, 4), (island.area, hole.area) )
+		self.assertTrue( hole.is_clockwise() )
+
+		results = Polygon.offset_many(multi, [1, -0.5])
+		self.assertTrue( all(isinstance(r, MultiPolygon) for r in results) )
+		self.assertEqual( [108, 0], [ r.area for r in results ] )
+
 if __name__ == '__main__':
 	unittest.main()
@@ -0,0 +1,63 @@
+import math
+import unittest
+from py2d.Math import *
+from py2d.Scene import SceneNode
+
+class TestSceneNode(unittest.TestCase):
+
+	def setUp(self):
+		self.square = Polygon.from_tuples([(0, 0), (1, 0), (1, 1), (0, 1)])
+
+		self.root = SceneNode(Transform.move(10, 0))
+		self.arm = SceneNode(Transform.rotate(math.pi / 2))
+		self.hand = SceneNode(Transform.scale(2, 2), [self.square])
+
+		self.root.add_child(self.arm)
+		self.arm.add_child(self.hand)
+
+	def test_world_transform(self):
+		self.assertEqual( Vector(10, 2), self.hand.world_transform * Vector(1, 0) )
+
+	def test_world_polygons(self):
+		expected = Polygon.from_tuples([(10, 0), (10, 2), (8, 2), (8, 0)])
+		self.assertEqual( [expected], self.hand.world_polygons )
+		self.assertEqual( [expected], self.root.get_all_world_polygons() )
+
+	def test_caching(self):
+		world = self.hand.world_transform
+		polys = self.hand.world_polygons
+
+		self.assertTrue( world is self.hand.world_transform )
+		self.assertTrue( polys is self.hand.world_polygons )
+
+		# changing a sibling subtree must not invalidate the cache
+		self.root.add_child(SceneNode(Transform.move(1, 1)))
+		self.assertTrue( world is self.hand.world_transform )
+
+	def test_invalidation(self):
+		polys = self.hand.world_polygons
+
+		self.root.transform = Transform.move(0, 5)
+		self.assertEqual( Vector(0, 7), self.hand.world_transform * Vector(1, 0) )
+		self.assertTrue( polys is not self.hand.world_polygons )
+
+		self.arm.remove_child(self.hand)
+		self.assertEqual( Vector(2, 0), self.hand.world_transform * Vector(1, 0) )
+
+		self.hand.polygons = []
+		self.assertEqual( [], self.hand.world_polygons )
+
+	def test_reparent(self):
+		other = SceneNode(Transform.move(0, 100))
+		self.hand.world_transform
+
+		other.add_child(self.hand)
+		self.assertEqual( [], self.arm.children )
+		self.assertTrue( self.hand.parent is other )
+		self.assertEqual( Vector(2, 100), self.hand.world_transform * Vector(1, 0) )
+
+	def test_walk(self):
+		self.assertEqual( [self.root, self.arm, self.hand], list(self.root.walk()) )
+
+if __name__ == '__main__':
+	unittest.main()
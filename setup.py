@@ -10,6 +10,9 @@ setup(
 	author_email='mail@semicolonsoftware.de',
 
 	packages=['py2d', 'py2d.Math'],
+	install_requires=[
+		'numpy',
+	],
 	setup_requires=[
 		# Setuptools 18.0 properly handles Cython extensions.
 		'setuptools>=18.0',
@@ -21,11 +24,22 @@ setup(
 		Extension("py2d.FOV", ["py2d/FOV.py"]),
 		Extension("py2d.FOVConverter", ["py2d/FOVConverter.py"]),
 		Extension("py2d.Navigation", ["py2d/Navigation.py"]),
+		Extension("py2d.Scene", ["py2d/Scene.py"]),
 		Extension("py2d.SVG", ["py2d/SVG.py"]),
 		Extension("py2d.Math", ["py2d/Math/__init__.py"]),
+		Extension("py2d.Math.ArrayPolygon", ["py2d/Math/ArrayPolygon.py"]),
+		Extension("py2d.Math.Boolean", ["py2d/Math/Boolean.py"]),
+		Extension("py2d.Math.Hull", ["py2d/Math/Hull.py"]),
 		Extension("py2d.Math.Operations", ["py2d/Math/Operations.py"]),
 		Extension("py2d.Math.Polygon", ["py2d/Math/Polygon.py"]),
+		Extension("py2d.Math.PreparedPolygon", ["py2d/Math/PreparedPolygon.py"]),
+		Extension("py2d.Math.RTree", ["py2d/Math/RTree.py"]),
+		Extension("py2d.Math.SegmentBVH", ["py2d/Math/SegmentBVH.py"]),
+		Extension("py2d.Math.Segments", ["py2d/Math/Segments.py"]),
+		Extension("py2d.Math.SpatialHash", ["py2d/Math/SpatialHash.py"]),
 		Extension("py2d.Math.Transform", ["py2d/Math/Transform.py"]),
+		Extension("py2d.Math.Triangulation", ["py2d/Math/Triangulation.py"]),
 		Extension("py2d.Math.Vector", ["py2d/Math/Vector.py"]),
+		Extension("py2d.Math.VectorArray", ["py2d/Math/VectorArray.py"]),
 	]
 )